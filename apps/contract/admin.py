@@ -1,3 +1,39 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.shortcuts import redirect
 
-# Register your models here.
+from apps.contract.models import PendingTransaction, RegistryUser, UserDataRegistry
+
+
+@admin.register(UserDataRegistry)
+class UserDataRegistryAdmin(admin.ModelAdmin):
+    list_display = ['name', 'network', 'address', 'deployed', 'admin']
+    list_filter = ['network', 'deployed']
+    search_fields = ['name', 'address']
+
+
+@admin.register(RegistryUser)
+class RegistryUserAdmin(admin.ModelAdmin):
+    list_display = ['wallet_address', 'registry', 'user', 'is_authorized', 'last_updated']
+    list_filter = ['is_authorized', 'registry__network']
+    search_fields = ['wallet_address', 'user__email', 'registry__name']
+    list_select_related = ['registry', 'user']
+    actions = ['revoke_on_chain']
+
+    @admin.action(description='Revoke selected wallets on chain')
+    def revoke_on_chain(self, request, queryset):
+        registry_ids = set(queryset.values_list('registry_id', flat=True))
+        if len(registry_ids) != 1:
+            self.message_user(request, 'Select wallets from a single registry to revoke.', messages.ERROR)
+            return None
+
+        # The revocation view signs the batched deauthorizeUsers transactions
+        request.session['revoke_wallets'] = list(queryset.values_list('wallet_address', flat=True))
+        return redirect('registry_revoke_users', pk=registry_ids.pop())
+
+
+@admin.register(PendingTransaction)
+class PendingTransactionAdmin(admin.ModelAdmin):
+    list_display = ['transaction_hash', 'kind', 'status', 'network', 'registry', 'block_number', 'created_at']
+    list_filter = ['status', 'kind', 'network']
+    search_fields = ['transaction_hash', 'sender']
+    list_select_related = ['registry']
@@ -6,3 +6,11 @@ class ContractConfig(AppConfig):
     name = 'apps.contract'
     label = 'contract'
     verbose_name = 'Contract Management'
+
+    def ready(self):
+        from apps.contract.artifacts import artifact_store
+
+        # Load shipped contract artifacts once per process instead of on first request,
+        # and refuse to boot when they are missing and cannot be compiled at runtime
+        artifact_store.preload()
+        artifact_store.verify()
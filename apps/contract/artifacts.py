@@ -0,0 +1,255 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+SOLC_VERSION = '0.8.15'
+ARTIFACT_FORMAT_VERSION = 1
+
+
+def ensure_solc_installed(version=SOLC_VERSION):
+    # Imported lazily so production workers never need the compiler toolchain
+    import solcx
+
+    try:
+        # Check if already installed
+        if version not in [str(v) for v in solcx.get_installed_solc_versions()]:
+            solcx.install_solc(version)
+
+        # Set as the version to use
+        solcx.set_solc_version(version)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to install solc: {str(e)}")
+        return False
+
+
+def hash_source(source):
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    return hashlib.sha256(source).hexdigest()
+
+
+def compile_source_file(path, solc_version=SOLC_VERSION):
+    """Compile a Solidity file and return {contract_name: artifact} for every contract it defines"""
+    import solcx
+
+    # Ensure the compiler is installed
+    ensure_solc_installed(solc_version)
+
+    with open(path, 'rb') as file:
+        raw_source = file.read()
+
+    compiled_sol = solcx.compile_source(
+        raw_source.decode('utf-8'),
+        output_values=['abi', 'bin'],
+        solc_version=solc_version
+    )
+
+    source_hash = hash_source(raw_source)
+    artifacts = {}
+    for contract_id, contract_interface in compiled_sol.items():
+        contract_name = contract_id.split(':')[-1]
+        artifacts[contract_name] = {
+            'formatVersion': ARTIFACT_FORMAT_VERSION,
+            'contractName': contract_name,
+            'sourcePath': os.path.relpath(path, settings.BASE_DIR),
+            'sourceHash': source_hash,
+            'compilerVersion': solc_version,
+            'abi': contract_interface['abi'],
+            'bin': contract_interface['bin'],
+        }
+    return artifacts
+
+
+def source_paths():
+    return sorted(glob.glob(os.path.join(settings.BASE_DIR, 'contracts', '*.sol')))
+
+
+def stale_artifacts(output_dir, solc_version=SOLC_VERSION):
+    """Problems with the shipped artifacts in output_dir, one readable entry per contract that needs rebuilding"""
+    stale = []
+    for path in source_paths():
+        contract_name = os.path.splitext(os.path.basename(path))[0]
+        artifact_path = os.path.join(output_dir, f'{contract_name}.json')
+        with open(path, 'rb') as file:
+            source_hash = hash_source(file.read())
+
+        try:
+            with open(artifact_path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            stale.append(f'{contract_name}: missing')
+            continue
+
+        if data.get('sourceHash') != source_hash:
+            stale.append(f'{contract_name}: source changed')
+        elif data.get('compilerVersion') != solc_version:
+            stale.append(f"{contract_name}: built with solc {data.get('compilerVersion')}")
+    return stale
+
+
+def write_artifact(path, data):
+    """Atomically write an artifact so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+        file.write('\n')
+    os.replace(tmp_path, path)
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for compiled contracts.
+
+    Precompiled artifacts shipped in CONTRACT_PRECOMPILED_DIR (built with
+    ``manage.py compile_contracts``) are loaded once at startup. When
+    CONTRACT_RUNTIME_COMPILE is enabled, a source file that no longer matches
+    its shipped artifact is compiled once and cached by source hash and
+    compiler version, in memory and under CONTRACT_ARTIFACT_CACHE_DIR.
+    """
+    def __init__(self, cache_dir=None, precompiled_dir=None, solc_version=SOLC_VERSION):
+        self._cache_dir = cache_dir
+        self._precompiled_dir = precompiled_dir
+        self.solc_version = solc_version
+        self._artifacts = {}
+        self._precompiled = None
+        self._source_hashes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir or settings.CONTRACT_ARTIFACT_CACHE_DIR
+
+    @property
+    def precompiled_dir(self):
+        return self._precompiled_dir or settings.CONTRACT_PRECOMPILED_DIR
+
+    def source_path(self, contract_name):
+        return os.path.join(settings.BASE_DIR, 'contracts', f'{contract_name}.sol')
+
+    def source_hash(self, contract_name):
+        """Hash the contract source, re-reading the file only when it changed on disk"""
+        path = self.source_path(contract_name)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._source_hashes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        with open(path, 'rb') as file:
+            digest = hash_source(file.read())
+        self._source_hashes[path] = (signature, digest)
+        return digest
+
+    def artifact_path(self, contract_name, source_hash):
+        return os.path.join(self.cache_dir, f'{contract_name}-{source_hash}-{self.solc_version}.json')
+
+    def precompiled_path(self, contract_name):
+        return os.path.join(self.precompiled_dir, f'{contract_name}.json')
+
+    def preload(self):
+        """Load every shipped artifact into memory; called once from AppConfig.ready()"""
+        precompiled = {}
+        for path in sorted(glob.glob(os.path.join(self.precompiled_dir, '*.json'))):
+            try:
+                with open(path, 'r') as file:
+                    data = json.load(file)
+                precompiled[data['contractName']] = data
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable artifact {path}: {str(e)}")
+        self._precompiled = precompiled
+        logger.debug(f"Loaded {len(precompiled)} precompiled contract artifact(s)")
+        return precompiled
+
+    def verify(self):
+        """
+        Refuse to run with runtime compilation off unless every contract has an
+        up-to-date shipped artifact; otherwise every chain request would fail.
+        Called from AppConfig.ready() so a misconfigured worker never boots.
+        """
+        if settings.CONTRACT_RUNTIME_COMPILE:
+            return
+        stale = stale_artifacts(self.precompiled_dir, self.solc_version)
+        if stale:
+            raise ImproperlyConfigured(
+                'Contract artifacts are missing or out of date:\n  ' + '\n  '.join(stale) + '\n'
+                "Run 'CONTRACT_RUNTIME_COMPILE=true python manage.py compile_contracts' where solc "
+                f'{self.solc_version} is available and ship {self.precompiled_dir}, '
+                'or enable CONTRACT_RUNTIME_COMPILE.'
+            )
+
+    def get_precompiled(self, contract_name):
+        if self._precompiled is None:
+            self.preload()
+        return self._precompiled.get(contract_name)
+
+    def get(self, contract_name):
+        """Return {'abi': ..., 'bin': ...} for the contract without touching solc on the hot path"""
+        if not settings.CONTRACT_RUNTIME_COMPILE:
+            data = self.get_precompiled(contract_name)
+            if data is None:
+                raise ImproperlyConfigured(
+                    f"No precompiled artifact for {contract_name}. "
+                    f"Run 'python manage.py compile_contracts' and ship {self.precompiled_path(contract_name)}."
+                )
+            return {'abi': data['abi'], 'bin': data['bin']}
+
+        key = (contract_name, self.source_hash(contract_name), self.solc_version)
+        artifact = self._artifacts.get(key)
+        if artifact is not None:
+            return artifact
+
+        with self._lock:
+            # Another thread may have filled the slot while we waited
+            artifact = self._artifacts.get(key)
+            if artifact is None:
+                artifact = self._load(key) or self._compile(key)
+                self._artifacts[key] = artifact
+        return artifact
+
+    def _load(self, key):
+        contract_name, source_hash, solc_version = key
+
+        data = self.get_precompiled(contract_name)
+        if data and data['sourceHash'] == source_hash and data['compilerVersion'] == solc_version:
+            return {'abi': data['abi'], 'bin': data['bin']}
+
+        path = self.artifact_path(contract_name, source_hash)
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable artifact {path}: {str(e)}")
+            return None
+        return {'abi': data['abi'], 'bin': data['bin']}
+
+    def _compile(self, key):
+        contract_name, source_hash, solc_version = key
+        logger.info(f"Compiling {contract_name} ({source_hash[:12]}) with solc {solc_version}")
+
+        data = compile_source_file(self.source_path(contract_name), solc_version)[contract_name]
+
+        path = self.artifact_path(contract_name, source_hash)
+        try:
+            write_artifact(path, data)
+        except OSError as e:
+            logger.warning(f"Could not persist artifact {path}: {str(e)}")
+
+        return {'abi': data['abi'], 'bin': data['bin']}
+
+
+artifact_store = ArtifactStore()
@@ -0,0 +1,196 @@
+import logging
+
+from django.core.cache import cache
+from web3 import Web3
+
+from apps.contract.chain import METADATA_METHODS, chain_metadata
+from apps.contract.clients import get_async_web3
+from apps.contract.encoding import get_encoder
+from apps.contract.gas import gas_estimates
+from apps.contract.health import provider_health
+from apps.contract.reads import user_data_cache
+from apps.contract.rpc import RPCError, async_batch_request, to_int
+from apps.contract.services import UPDATE_USER_DATA_SELECTOR, RegistryDeploymentService, deploy_gas_limit, split_whitelist
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRegistryDeploymentService:
+    """
+    AsyncWeb3 counterpart of RegistryDeploymentService for async views.
+
+    Calls are encoded and decoded locally from the cached ABI and sent over the
+    event loop's shared aiohttp session, so no worker thread is blocked on RPC.
+    """
+    def __init__(self, network='sepolia'):
+        self.network = network
+        # Shared per-loop client with a keep-alive aiohttp session
+        self.w3 = get_async_web3(network)
+
+    @classmethod
+    async def create(cls, network='sepolia'):
+        """Build a service once the provider is known to be up; any probe runs off the event loop"""
+        await provider_health.acheck(network)
+        return cls(network=network)
+
+    @property
+    def encoder(self):
+        """Local calldata encoder for the UserDataRegistry ABI"""
+        return get_encoder('UserDataRegistry')
+
+    async def call(self, contract_address, function_name, args):
+        """eth_call a registry view function and decode its return values"""
+        result = await self.w3.eth.call({
+            'to': Web3.to_checksum_address(contract_address),
+            'data': self.encoder.encode_function(function_name, args),
+        })
+        return self.encoder.decode_function_result(function_name, len(args), result)
+
+    async def get_code_hash(self, contract_address):
+        """keccak256 of the runtime code at an address, cached since deployed code never changes"""
+        contract_address = Web3.to_checksum_address(contract_address)
+        cache_key = f'contract-code-hash:{self.network}:{contract_address}'
+        code_hash = await cache.aget(cache_key)
+        if code_hash is None:
+            code = await self.w3.eth.get_code(contract_address)
+            if not code:
+                return None
+            code_hash = Web3.keccak(code).hex()
+            await cache.aset(cache_key, code_hash, timeout=None)
+        return code_hash
+
+    async def get_user_data(self, contract_address, user_address, use_cache=True):
+        """Get a user's data from the registry, through the user data cache unless use_cache is False"""
+        try:
+            if use_cache:
+                cached = await user_data_cache.aget(self.network, contract_address, user_address)
+                if cached is not None:
+                    return cached
+
+            result = await self.call(contract_address, 'getUserData', [Web3.to_checksum_address(user_address)])
+            user_data = {'success': True, **RegistryDeploymentService._format_user_data(*result)}
+            await user_data_cache.aset(self.network, contract_address, user_address, user_data)
+            return user_data
+
+        except ValueError as e:
+            # More specific error handling for contract-related errors
+            if "execution reverted" in str(e):
+                return {'success': False, 'error': 'Contract execution reverted. You may not be authorized.'}
+            else:
+                return {'success': False, 'error': f'Invalid input: {str(e)}'}
+        except Exception as e:
+            # General error
+            return {'success': False, 'error': f'Blockchain error: {str(e)}'}
+
+    async def verify_registry(self, contract_address, wallet_address):
+        """Check that a UserDataRegistry exists at the address and looks usable by the wallet"""
+        contract_address = Web3.to_checksum_address(contract_address)
+
+        # Check contract code exists at the address (confirms it's a contract)
+        code = await self.w3.eth.get_code(contract_address)
+        if not code:
+            return {'success': False, 'error': 'No contract found at this address'}
+
+        # Calling a view function helps confirm it's our contract type
+        try:
+            await self.call(contract_address, 'admin', [])
+        except Exception:
+            (is_authorized,) = await self.call(contract_address, 'isAuthorized', [Web3.to_checksum_address(wallet_address)])
+            if not is_authorized:
+                return {'success': False, 'error': 'Contract exists but you don\'t appear to be authorized'}
+
+        return {'success': True, 'contract_address': contract_address}
+
+    async def prepare_registry_deployment(self, owner_address, initial_users):
+        """Prepare data for deploying registry contract via MetaMask; see RegistryDeploymentService.prepare_registry_deployment"""
+        try:
+            # Constructor chunk only; the rest of the whitelist is authorized in batches after deployment
+            owner_address, initial_users, batches = split_whitelist(owner_address, initial_users)
+
+            data = self.encoder.encode_constructor([initial_users])
+            gas_price, gas_limit, chain_id = await self._fetch_transaction_params(
+                {'from': owner_address, 'data': data},
+                default_gas=deploy_gas_limit(len(initial_users))
+            )
+
+            return {
+                'success': True,
+                'transaction_data': {
+                    'from': owner_address,
+                    'gas': hex(gas_limit),
+                    'gasPrice': hex(gas_price),
+                    'data': data,
+                    'chainId': hex(chain_id)
+                },
+                'constructor_users': initial_users,
+                'batches': batches
+            }
+
+        except Exception as e:
+            logger.exception(f"Failed to prepare deployment: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    async def prepare_update_user_data(self, contract_address, wallet_address, image_reference, overwrite=None):
+        """Prepare data for updating user data via MetaMask; see RegistryDeploymentService.prepare_update_user_data"""
+        try:
+            wallet_address = Web3.to_checksum_address(wallet_address)
+            data = self.encoder.encode_function('updateUserData', [image_reference])
+
+            learned_gas = None
+            if overwrite is not None:
+                code_hash = await self.get_code_hash(contract_address)
+                if code_hash:
+                    learned_gas = await gas_estimates.aget(code_hash, UPDATE_USER_DATA_SELECTOR, image_reference, overwrite)
+
+            gas_price, gas_limit, chain_id = await self._fetch_transaction_params(
+                {'from': wallet_address, 'to': Web3.to_checksum_address(contract_address), 'data': data},
+                default_gas=200000,
+                gas_limit=learned_gas
+            )
+
+            return {
+                'success': True,
+                'transaction_data': {
+                    'from': wallet_address,
+                    'to': contract_address,
+                    'gas': hex(gas_limit),
+                    'gasPrice': hex(gas_price),
+                    'data': data,
+                    'chainId': hex(chain_id)
+                }
+            }
+
+        except Exception as e:
+            logger.exception(f"Failed to prepare user data update: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    async def _fetch_transaction_params(self, transaction, default_gas, gas_limit=None):
+        """Async version of RegistryDeploymentService._fetch_transaction_params"""
+        params = {
+            'gas_price': await chain_metadata.aget(self.network, 'gas_price'),
+            'chain_id': await chain_metadata.aget(self.network, 'chain_id'),
+        }
+        missing = [name for name, value in params.items() if value is None]
+
+        calls = [(METADATA_METHODS[name], []) for name in missing]
+        if gas_limit is None:
+            calls.append(('eth_estimateGas', [transaction]))
+        results = await async_batch_request(self.w3, calls)
+
+        for name, result in zip(missing, results):
+            if isinstance(result, RPCError):
+                raise result
+            params[name] = to_int(result)
+            await chain_metadata.aset(self.network, name, params[name])
+
+        if gas_limit is not None:
+            return params['gas_price'], gas_limit, params['chain_id']
+
+        gas_estimate = results[-1]
+        if isinstance(gas_estimate, RPCError):
+            logger.info(f"Gas estimation failed, using default of {default_gas}: {gas_estimate}")
+            gas_limit = default_gas
+        else:
+            gas_limit = int(to_int(gas_estimate) * 1.2)  # Add 20% buffer
+
+        return params['gas_price'], gas_limit, params['chain_id']
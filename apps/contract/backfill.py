@@ -0,0 +1,255 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections, connection
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from apps.contract.clients import get_web3
+from apps.contract.indexer import event_indexer
+from apps.contract.models import BackfillSegment, RegistryEvent
+from apps.contract.rpc import RPCError
+
+logger = logging.getLogger(__name__)
+
+# Provider messages that mean "ask for a smaller block range". Rate-limit
+# errors ("rate limit exceeded", "too many requests") must not match: halving
+# the range would multiply requests while the provider is throttling.
+RANGE_TOO_LARGE_MESSAGES = (
+    'block range',
+    'blocks range',
+    'range is too large',
+    'range too large',
+    'range is too wide',
+    'too many blocks',
+    'returned more than',
+    'response size',
+    'max results',
+)
+
+# Provider messages that mean "slow down"
+RATE_LIMIT_MESSAGES = (
+    'rate limit',
+    'rate-limit',
+    'too many requests',
+    'request count exceeded',
+    'compute units',
+    'capacity',
+)
+
+# Events applied to RegistryUser per query when materializing a registry
+MATERIALIZE_CHUNK = 2000
+
+
+def is_rate_limited(error):
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code == 429
+    if isinstance(error, RPCError) and error.code == 429:
+        return True
+    message = str(error).lower()
+    return any(text in message for text in RATE_LIMIT_MESSAGES)
+
+
+def is_range_too_large(error):
+    if is_rate_limited(error):
+        return False
+    if isinstance(error, requests.exceptions.Timeout):
+        return True
+    message = str(error).lower()
+    return any(text in message for text in RANGE_TOO_LARGE_MESSAGES)
+
+
+def retry_after(error):
+    """Seconds a 429 response asked us to wait, if it said"""
+    response = getattr(error, 'response', None)
+    value = response.headers.get('Retry-After') if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class RangeTooLarge(Exception):
+    """The provider refused a block range as too large, after ``requests`` eth_getLogs calls"""
+    def __init__(self, requests):
+        super().__init__(f'Block range refused after {requests} request(s)')
+        self.requests = requests
+
+
+class EventBackfill:
+    """
+    Reconstructs the event history of registries that were deployed or
+    imported before the indexer was following them.
+
+    Each registry's history, from its deployment block to the indexer's safe
+    head, is cut into BackfillSegment rows that a bounded thread pool scans
+    with eth_getLogs, halving any range the provider rejects as too large.
+    Events are written with bulk_create as each segment finishes, and member
+    rows are rebuilt from the stored events once all of a registry's segments
+    are done. Segment state lives in the database, so an interrupted run
+    resumes where it stopped.
+    """
+    def __init__(self, workers=None, segment_size=None, retries=None, backoff=None):
+        self.workers = workers or settings.EVENT_BACKFILL_WORKERS
+        self.segment_size = segment_size or settings.EVENT_BACKFILL_SEGMENT_SIZE
+        self.retries = settings.EVENT_BACKFILL_RETRIES if retries is None else retries
+        self.backoff = settings.EVENT_BACKFILL_BACKOFF if backoff is None else backoff
+
+    def find_deployment_block(self, w3, registry, head):
+        """Block the registry was created in, from its deployment receipt or by bisecting eth_getCode"""
+        if registry.deployment_block is not None:
+            return registry.deployment_block
+
+        if registry.transaction_hash:
+            try:
+                receipt = w3.eth.get_transaction_receipt(registry.transaction_hash)
+            except TransactionNotFound:
+                # Pruned by the node, or a hash from another network: bisect instead
+                receipt = None
+            if receipt and receipt['contractAddress'] and receipt['contractAddress'].lower() == registry.address.lower():
+                return receipt['blockNumber']
+
+        # Needs an archive node for historical state
+        address = Web3.to_checksum_address(registry.address)
+        if not w3.eth.get_code(address, head):
+            raise ValueError(f'No contract at {address} on {registry.network}')
+        low, high = 0, head
+        while low < high:
+            middle = (low + high) // 2
+            if w3.eth.get_code(address, middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def plan(self, registry, from_block=None):
+        """Create the missing segments for a registry up to the safe head; returns how many were added"""
+        w3 = get_web3(registry.network)
+        head = event_indexer.safe_head(w3)
+
+        last_segment = registry.backfill_segments.order_by('-to_block').first()
+        if last_segment:
+            start = last_segment.to_block + 1
+        else:
+            if from_block is None:
+                from_block = self.find_deployment_block(w3, registry, head)
+            if registry.deployment_block is None:
+                registry.deployment_block = from_block
+                registry.save(update_fields=['deployment_block', 'updated_at'])
+            start = from_block
+
+        segments = [
+            BackfillSegment(registry=registry, from_block=block, to_block=min(block + self.segment_size - 1, head))
+            for block in range(start, head + 1, self.segment_size)
+        ]
+        BackfillSegment.objects.bulk_create(segments, ignore_conflicts=True)
+        return len(segments)
+
+    def fetch_logs(self, w3, address, from_block, to_block):
+        """
+        eth_getLogs for one registry, splitting the range in half whenever the
+        provider refuses it as too large. Returns ``(logs, request_count)``.
+        """
+        try:
+            return self.get_logs(w3, address, from_block, to_block)
+        except RangeTooLarge as e:
+            middle = (from_block + to_block) // 2
+            logger.debug(f"Splitting {from_block}-{to_block} for {address}: {str(e.__cause__)}")
+            first_logs, first_requests = self.fetch_logs(w3, address, from_block, middle)
+            second_logs, second_requests = self.fetch_logs(w3, address, middle + 1, to_block)
+            return first_logs + second_logs, e.requests + first_requests + second_requests
+
+    def get_logs(self, w3, address, from_block, to_block):
+        """
+        One range, retried with exponential backoff (or the provider's
+        Retry-After) while it is rate-limited. Raises RangeTooLarge when the
+        range should be split. Returns ``(logs, request_count)``.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                return event_indexer.get_logs(w3, [address], from_block, to_block), attempt + 1
+            except Exception as e:
+                if is_rate_limited(e) and attempt < self.retries:
+                    delay = retry_after(e) or self.backoff * 2 ** attempt
+                    logger.info(f"Rate limited on {from_block}-{to_block} for {address}; retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                if from_block < to_block and is_range_too_large(e):
+                    raise RangeTooLarge(attempt + 1) from e
+                raise
+
+    def process_segment(self, segment_id):
+        close_old_connections()
+        try:
+            segment = BackfillSegment.objects.select_related('registry').get(pk=segment_id)
+            registry = segment.registry
+            try:
+                logs, request_count = self.fetch_logs(
+                    get_web3(registry.network),
+                    registry.address,
+                    segment.from_block,
+                    segment.to_block
+                )
+                events = event_indexer.build_events({registry.address.lower(): registry}, logs)
+                RegistryEvent.objects.bulk_create(events, ignore_conflicts=True)
+            except Exception as e:
+                segment.status = BackfillSegment.STATUS_FAILED
+                segment.error = str(e)
+                segment.save(update_fields=['status', 'error', 'updated_at'])
+                raise
+
+            segment.status = BackfillSegment.STATUS_DONE
+            segment.events = len(events)
+            segment.requests = request_count
+            segment.error = ''
+            segment.save(update_fields=['status', 'events', 'requests', 'error', 'updated_at'])
+            return segment
+        finally:
+            # Worker threads each hold their own connection
+            connection.close()
+
+    def run(self, registries, from_block=None):
+        """Plan and scan every outstanding segment of the given registries; returns a summary dict"""
+        registries = list(registries)
+        for registry in registries:
+            self.plan(registry, from_block=from_block)
+
+        segment_ids = list(BackfillSegment.objects.filter(
+            registry__in=registries,
+        ).exclude(status=BackfillSegment.STATUS_DONE).order_by('registry_id', 'from_block').values_list('pk', flat=True))
+
+        summary = {'segments': len(segment_ids), 'failed': 0, 'events': 0, 'requests': 0}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='backfill') as executor:
+            futures = [executor.submit(self.process_segment, segment_id) for segment_id in segment_ids]
+            for future in as_completed(futures):
+                try:
+                    segment = future.result()
+                except Exception as e:
+                    summary['failed'] += 1
+                    logger.error(f"Backfill segment failed: {str(e)}")
+                    continue
+                summary['events'] += segment.events
+                summary['requests'] += segment.requests
+
+        for registry in registries:
+            if not registry.backfill_segments.exclude(status=BackfillSegment.STATUS_DONE).exists():
+                self.materialize(registry)
+        return summary
+
+    def materialize(self, registry):
+        """Replay a registry's stored events, oldest first, onto its member rows"""
+        events = registry.events.order_by('block_number', 'log_index')
+        chunk = []
+        for event in events.iterator(chunk_size=MATERIALIZE_CHUNK):
+            chunk.append(event)
+            if len(chunk) == MATERIALIZE_CHUNK:
+                event_indexer.apply(chunk)
+                chunk = []
+        if chunk:
+            event_indexer.apply(chunk)
+
+
+event_backfill = EventBackfill()
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.contract.clients import get_web3
+
+logger = logging.getLogger(__name__)
+
+# RPC method used to (re)fetch each piece of metadata
+METADATA_METHODS = {
+    'chain_id': 'eth_chainId',
+    'gas_price': 'eth_gasPrice',
+}
+
+
+class ChainMetadataCache:
+    """
+    Per-network chain id and gas price shared across workers via Django's cache.
+
+    A value younger than its TTL is served as-is. Once older, it is still served
+    for a further stale window while a single background refresh fetches a new
+    one, so hot endpoints never wait on these round trips.
+    """
+    def cache_key(self, network, name):
+        return f'chain-metadata:{network}:{name}'
+
+    def ttl(self, name):
+        return settings.CHAIN_METADATA_TTLS[name]
+
+    def stale_ttl(self, name):
+        return settings.CHAIN_METADATA_STALE_TTLS[name]
+
+    def get(self, network, name):
+        """Return a cached value, or None when the caller has to fetch it"""
+        entry = cache.get(self.cache_key(network, name))
+        if entry is None:
+            return None
+
+        age = time.time() - entry['fetched_at']
+        if age >= self.ttl(name):
+            self.refresh_in_background(network, name)
+        return entry['value']
+
+    async def aget(self, network, name):
+        return await sync_to_async(self.get, thread_sensitive=False)(network, name)
+
+    def set(self, network, name, value):
+        cache.set(
+            self.cache_key(network, name),
+            {'value': value, 'fetched_at': time.time()},
+            timeout=self.ttl(name) + self.stale_ttl(name),
+        )
+
+    async def aset(self, network, name, value):
+        await sync_to_async(self.set, thread_sensitive=False)(network, name, value)
+
+    def fetch(self, network, name):
+        w3 = get_web3(network)
+        value = getattr(w3.eth, name)
+        self.set(network, name, value)
+        return value
+
+    def get_or_fetch(self, network, name):
+        value = self.get(network, name)
+        if value is None:
+            value = self.fetch(network, name)
+        return value
+
+    def refresh_in_background(self, network, name):
+        # Only one worker refreshes a given value at a time
+        lock_key = f'{self.cache_key(network, name)}:refreshing'
+        if not cache.add(lock_key, True, timeout=settings.WEB3_REQUEST_TIMEOUT):
+            return
+
+        def refresh():
+            try:
+                self.fetch(network, name)
+            except Exception as e:
+                logger.warning(f"Failed to refresh {name} for {network}: {str(e)}")
+            finally:
+                cache.delete(lock_key)
+
+        threading.Thread(target=refresh, name=f'refresh-{network}-{name}', daemon=True).start()
+
+
+chain_metadata = ChainMetadataCache()
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+
+import aiohttp
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from web3 import AsyncWeb3, Web3
+from web3._utils.http_session_manager import HTTPSessionManager
+
+logger = logging.getLogger(__name__)
+
+
+def get_provider_url(network):
+    """Return the JSON-RPC endpoint for a network, defaulting to a local node"""
+    return settings.WEB3_PROVIDER_URLS.get(network, settings.WEB3_DEFAULT_PROVIDER_URL)
+
+
+class PooledSessionManager(HTTPSessionManager):
+    """
+    web3's session manager keeps one ``requests.Session`` per thread. This one
+    hands every thread the same pooled session, so keep-alive connections are
+    reused across requests and worker threads and capped by the pool size.
+    """
+    def __init__(self, session):
+        super().__init__(cache_size=1, session_pool_max_workers=1)
+        self.session = session
+
+    def cache_and_return_session(self, endpoint_uri, session=None, request_timeout=None):
+        return self.session
+
+
+class Web3ClientRegistry:
+    """Process-wide Web3 clients, one per network, sharing a keep-alive HTTP pool"""
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, network):
+        client = self._clients.get(network)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(network)
+            if client is None:
+                client = self._build(network)
+                self._clients[network] = client
+        return client
+
+    def _build(self, network):
+        endpoint_uri = get_provider_url(network)
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.WEB3_POOL_CONNECTIONS,
+            pool_maxsize=settings.WEB3_POOL_MAXSIZE,
+            pool_block=True,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        provider = Web3.HTTPProvider(
+            endpoint_uri,
+            request_kwargs={'timeout': settings.WEB3_REQUEST_TIMEOUT},
+        )
+        provider._request_session_manager = PooledSessionManager(session)
+
+        logger.debug(f"Created pooled Web3 client for {network} ({settings.WEB3_POOL_MAXSIZE} connections)")
+        return Web3(provider)
+
+    def close_all(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.provider._request_session_manager.session.close()
+            self._clients = {}
+
+
+web3_clients = Web3ClientRegistry()
+
+
+def get_web3(network):
+    return web3_clients.get(network)
+
+
+class PooledAsyncSessionManager(HTTPSessionManager):
+    """Async counterpart of PooledSessionManager: one keep-alive aiohttp session for every caller"""
+    def __init__(self, session):
+        super().__init__(cache_size=1, session_pool_max_workers=1)
+        self.session = session
+
+    async def async_cache_and_return_session(self, endpoint_uri, session=None, request_timeout=None):
+        return self.session
+
+
+class AsyncWeb3ClientRegistry:
+    """
+    AsyncWeb3 clients per event loop and network. aiohttp sessions are bound to
+    the loop that created them, so each loop gets its own pooled session,
+    which all coroutines on that loop share.
+    """
+    def __init__(self):
+        self._clients = weakref.WeakKeyDictionary()
+
+    def get(self, network):
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        client = clients.get(network)
+        if client is None:
+            client = self._build(network)
+            clients[network] = client
+        return client
+
+    def _build(self, network):
+        timeout = aiohttp.ClientTimeout(total=settings.WEB3_REQUEST_TIMEOUT)
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings.WEB3_POOL_MAXSIZE),
+            timeout=timeout,
+            raise_for_status=True,
+        )
+
+        provider = AsyncWeb3.AsyncHTTPProvider(get_provider_url(network), request_kwargs={'timeout': timeout})
+        provider._request_session_manager = PooledAsyncSessionManager(session)
+
+        logger.debug(f"Created pooled AsyncWeb3 client for {network} ({settings.WEB3_POOL_MAXSIZE} connections)")
+        return AsyncWeb3(provider)
+
+    async def aclose(self):
+        """Close the sessions owned by the running loop"""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.provider._request_session_manager.session.close()
+
+
+async_web3_clients = AsyncWeb3ClientRegistry()
+
+
+def get_async_web3(network):
+    return async_web3_clients.get(network)
+
+
+class ContractCache:
+    """
+    Bounded LRU of bound contract instances keyed by (network, address, ABI hash).
+
+    Building a contract object parses the ABI and generates function and event
+    classes, so hot registries reuse one instance instead of rebuilding it on
+    every call.
+    """
+    def __init__(self, maxsize=None):
+        self._maxsize = maxsize
+        self._contracts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize or settings.CONTRACT_CACHE_SIZE
+
+    def get(self, w3, network, address, abi, abi_hash):
+        key = (network, address, abi_hash)
+        with self._lock:
+            contract = self._contracts.get(key)
+            if contract is not None:
+                self._contracts.move_to_end(key)
+                self.hits += 1
+                return contract
+            self.misses += 1
+
+        # Build outside the lock; a racing thread may build the same contract once
+        contract = w3.eth.contract(address=address, abi=abi)
+
+        with self._lock:
+            self._contracts[key] = contract
+            self._contracts.move_to_end(key)
+            while len(self._contracts) > self.maxsize:
+                self._contracts.popitem(last=False)
+        return contract
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._contracts),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._contracts.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+contract_cache = ContractCache()
@@ -0,0 +1,94 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from web3 import Web3
+
+from apps.contract.clients import get_web3
+from apps.contract.encoding import get_encoder
+from apps.contract.models import RegistryUser
+from apps.contract.multicall import aggregate3, get_multicall_address
+from apps.contract.services import RegistryDeploymentService
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardService:
+    """
+    Gathers a user's data from every registry they belong to.
+
+    Memberships come from one query; on-chain data for all registries on a
+    network is read with Multicall3 aggregate3 calls, and networks are read in
+    parallel.
+    """
+    @property
+    def encoder(self):
+        return get_encoder('UserDataRegistry')
+
+    def get_user_dashboard(self, user):
+        memberships = list(
+            RegistryUser.objects.filter(user=user, registry__deployed=True, registry__address__isnull=False)
+            .select_related('registry')
+            .order_by('registry__network', 'registry__name')
+        )
+
+        by_network = {}
+        for membership in memberships:
+            by_network.setdefault(membership.registry.network, []).append(membership)
+
+        onchain = {}
+        errors = {}
+        if by_network:
+            with ThreadPoolExecutor(max_workers=len(by_network), thread_name_prefix='dashboard') as executor:
+                futures = {
+                    network: executor.submit(self.fetch_network, network, network_memberships)
+                    for network, network_memberships in by_network.items()
+                }
+                for network, future in futures.items():
+                    try:
+                        onchain.update(future.result())
+                    except Exception as e:
+                        logger.warning(f"Dashboard read failed for {network}: {str(e)}")
+                        errors[network] = str(e)
+
+        return {
+            'success': True,
+            'registries': [self.format_membership(membership, onchain.get(membership.pk)) for membership in memberships],
+            'errors': errors,
+        }
+
+    def fetch_network(self, network, memberships, w3=None):
+        """getUserData for each membership on one network; returns {membership pk: data or None}"""
+        w3 = w3 or get_web3(network)
+        calls = [
+            (
+                membership.registry.address,
+                self.encoder.encode_function('getUserData', [Web3.to_checksum_address(membership.wallet_address)])
+            )
+            for membership in memberships
+        ]
+        results = aggregate3(w3, get_multicall_address(network), calls)
+
+        data = {}
+        for membership, (success, return_data) in zip(memberships, results):
+            if not success or not return_data:
+                # Reverted, or no contract at the registry address
+                data[membership.pk] = None
+                continue
+            result = self.encoder.decode_function_result('getUserData', 1, return_data)
+            data[membership.pk] = RegistryDeploymentService._format_user_data(*result)
+        return data
+
+    def format_membership(self, membership, onchain):
+        registry = membership.registry
+        return {
+            'registry_id': registry.pk,
+            'name': registry.name,
+            'network': registry.network,
+            'address': registry.address,
+            'wallet_address': membership.wallet_address,
+            'is_authorized': membership.is_authorized,
+            'onchain': onchain,
+        }
+
+
+dashboard_service = DashboardService()
@@ -0,0 +1,96 @@
+import logging
+
+from django.db import transaction
+
+from apps.contract.models import DeploymentPlan, PendingTransaction
+from apps.contract.services import split_whitelist
+
+logger = logging.getLogger(__name__)
+
+# Batch status before any transaction has been recorded for it
+STATUS_UNSENT = 'unsent'
+
+# Batches in these states still have to be (re)sent
+RESEND_STATUSES = [STATUS_UNSENT, PendingTransaction.STATUS_FAILED, PendingTransaction.STATUS_DROPPED]
+
+
+class DeploymentPlanner:
+    """
+    Deploys registries whose initial whitelist is too large for one
+    constructor call.
+
+    The constructor gets as many addresses as fit the deployment gas budget
+    and the rest are split into authorizeUsers batches, stored on a
+    DeploymentPlan. Each batch is tracked as a PendingTransaction, so progress
+    comes from the receipt tracker. Batches are signed in the browser, so one
+    that failed or was dropped is sent again when the admin resumes the flow.
+    """
+    def plan(self, registry, owner_address, whitelist):
+        """Split a whitelist and store it as the registry's plan, replacing any plan from an earlier attempt"""
+        owner_address, constructor_users, batches = split_whitelist(owner_address, whitelist)
+        plan, _ = DeploymentPlan.objects.update_or_create(
+            registry=registry,
+            defaults={
+                'owner_address': owner_address,
+                'constructor_users': constructor_users,
+                'batches': batches,
+                'batch_transactions': {},
+            }
+        )
+        return plan
+
+    def batch_statuses(self, plan):
+        """Status of every batch, from its PendingTransaction, or 'unsent'"""
+        hashes = plan.batch_transactions
+        statuses = dict(PendingTransaction.objects.filter(
+            transaction_hash__in=hashes.values()
+        ).values_list('transaction_hash', 'status'))
+        return [statuses.get(hashes.get(str(index)), STATUS_UNSENT) for index in range(len(plan.batches))]
+
+    def outstanding_batches(self, plan):
+        return [index for index, status in enumerate(self.batch_statuses(plan)) if status in RESEND_STATUSES]
+
+    def progress(self, plan):
+        """Summary of a plan for the deployment flow"""
+        statuses = self.batch_statuses(plan)
+        batches = [
+            {
+                'index': index,
+                'size': len(addresses),
+                'status': status,
+                'transaction_hash': plan.batch_transactions.get(str(index)),
+            }
+            for index, (addresses, status) in enumerate(zip(plan.batches, statuses))
+        ]
+        total = len(plan.constructor_users) + sum(batch['size'] for batch in batches)
+        authorized = len(plan.constructor_users) if plan.registry.deployed else 0
+        authorized += sum(batch['size'] for batch in batches if batch['status'] == PendingTransaction.STATUS_CONFIRMED)
+        return {
+            'deployed': plan.registry.deployed,
+            'constructor_users': len(plan.constructor_users),
+            'total_users': total,
+            'authorized_users': authorized,
+            'batches': batches,
+            'outstanding': sum(1 for batch in batches if batch['status'] in RESEND_STATUSES),
+            'complete': plan.registry.deployed and authorized == total,
+        }
+
+    def record_batch(self, plan, index, transaction_hash, user, sender=None, nonce=None):
+        """Track a sent authorizeUsers batch; the receipt tracker creates its members once mined"""
+        with transaction.atomic():
+            pending_tx = PendingTransaction.objects.create(
+                registry=plan.registry,
+                user=user,
+                network=plan.registry.network,
+                kind=PendingTransaction.KIND_AUTHORIZE_USERS,
+                transaction_hash=transaction_hash,
+                sender=sender or plan.owner_address,
+                nonce=nonce,
+                payload={'addresses': plan.batches[index], 'batch': index},
+            )
+            plan.batch_transactions[str(index)] = transaction_hash
+            plan.save(update_fields=['batch_transactions', 'updated_at'])
+        return pending_tx
+
+
+deployment_planner = DeploymentPlanner()
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import threading
+
+from eth_abi import decode, encode
+from eth_utils.abi import event_abi_to_log_topic, function_abi_to_4byte_selector, get_abi_input_types, get_abi_output_types
+
+from apps.contract.artifacts import artifact_store
+
+
+class CalldataEncoder:
+    """
+    Encodes constructor and function calldata straight from a compiled ABI.
+
+    Selectors and argument types are worked out once per ABI, so encoding is
+    pure CPU work with no Web3 instance, contract object or provider involved.
+    """
+    def __init__(self, abi, bytecode=None):
+        self.abi = abi
+        self.abi_hash = hashlib.sha256(json.dumps(abi, sort_keys=True).encode('utf-8')).hexdigest()
+        self.bytecode = bytecode
+        self.constructor_types = []
+        self.functions = {}
+        # log topic0 -> decoding info for each event
+        self.events = {}
+
+        for element in abi:
+            if element.get('type') == 'constructor':
+                self.constructor_types = get_abi_input_types(element)
+            elif element.get('type') == 'function':
+                self.functions.setdefault(element['name'], []).append({
+                    'selector': function_abi_to_4byte_selector(element),
+                    'input_types': get_abi_input_types(element),
+                    'output_types': get_abi_output_types(element),
+                })
+            elif element.get('type') == 'event' and not element.get('anonymous'):
+                self.events[event_abi_to_log_topic(element)] = {
+                    'name': element['name'],
+                    'indexed': [(arg['name'], arg['type']) for arg in element['inputs'] if arg['indexed']],
+                    'data': [(arg['name'], arg['type']) for arg in element['inputs'] if not arg['indexed']],
+                }
+
+    def _function(self, name, argument_count):
+        candidates = [fn for fn in self.functions.get(name, []) if len(fn['input_types']) == argument_count]
+        if not candidates:
+            raise ValueError(f"No function '{name}' taking {argument_count} argument(s) in ABI")
+        if len(candidates) > 1:
+            raise ValueError(f"Ambiguous overload for '{name}' with {argument_count} argument(s)")
+        return candidates[0]
+
+    def selector(self, name, argument_count):
+        return '0x' + self._function(name, argument_count)['selector'].hex()
+
+    def encode_function(self, name, args):
+        """Return 0x-prefixed calldata for ``name(*args)``"""
+        function = self._function(name, len(args))
+        return '0x' + (function['selector'] + encode(function['input_types'], list(args))).hex()
+
+    def encode_constructor(self, args):
+        """Return 0x-prefixed deployment data: bytecode followed by the encoded constructor arguments"""
+        if self.bytecode is None:
+            raise ValueError('Bytecode is required to encode a deployment')
+        bytecode = self.bytecode[2:] if self.bytecode.startswith('0x') else self.bytecode
+        encoded_args = encode(self.constructor_types, list(args)).hex() if self.constructor_types else ''
+        return '0x' + bytecode + encoded_args
+
+    def decode_function_result(self, name, argument_count, data):
+        """Decode the return data of an eth_call to ``name``"""
+        return decode(self._function(name, argument_count)['output_types'], to_bytes(data))
+
+    def event_topic(self, name):
+        """Return the 0x-prefixed topic0 of an event"""
+        for topic, event in self.events.items():
+            if event['name'] == name:
+                return '0x' + topic.hex()
+        raise ValueError(f"No event '{name}' in ABI")
+
+    def decode_log(self, log):
+        """
+        Decode a log entry (raw JSON-RPC or web3-formatted) into ``(event_name, args)``.
+        Returns ``None`` for logs this ABI does not declare.
+        """
+        topics = [to_bytes(topic) for topic in log['topics']]
+        if not topics or topics[0] not in self.events:
+            return None
+
+        event = self.events[topics[0]]
+        args = {}
+        for (name, type_str), topic in zip(event['indexed'], topics[1:]):
+            # Dynamic indexed values are only available as their hash
+            dynamic = type_str in ('string', 'bytes') or type_str.endswith(']')
+            args[name] = topic if dynamic else decode([type_str], topic)[0]
+        data_values = decode([type_str for _, type_str in event['data']], to_bytes(log['data']))
+        args.update(zip([name for name, _ in event['data']], data_values))
+        return event['name'], args
+
+
+def to_bytes(value):
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    return bytes(value)
+
+
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(contract_name):
+    """Return a cached encoder for a contract's current artifact"""
+    artifact = artifact_store.get(contract_name)
+    encoder = _encoders.get(contract_name)
+    if encoder is not None and encoder.abi is artifact['abi']:
+        return encoder
+
+    with _encoders_lock:
+        encoder = _encoders.get(contract_name)
+        if encoder is None or encoder.abi is not artifact['abi']:
+            encoder = CalldataEncoder(artifact['abi'], artifact['bin'])
+            _encoders[contract_name] = encoder
+    return encoder
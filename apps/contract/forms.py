@@ -44,6 +44,26 @@ class UserAdditionForm(forms.Form):
         label="Select Users to Add"
     )
 
+class UserRevocationForm(forms.Form):
+    wallet_addresses = forms.CharField(
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 10,
+            'placeholder': '0x1234567890abcdef1234567890abcdef12345678\n0xabcdef1234567890abcdef1234567890abcdef12\n...'
+        }),
+        help_text="Enter the Ethereum addresses (one per line) whose access should be revoked."
+    )
+    
+    def clean_wallet_addresses(self):
+        addresses = self.cleaned_data.get('wallet_addresses', '')
+        address_list = list(dict.fromkeys(addr.strip() for addr in addresses.split('\n') if addr.strip()))
+        
+        for addr in address_list:
+            if not addr.startswith('0x') or len(addr) != 42:
+                raise forms.ValidationError(f"'{addr}' is not a valid Ethereum address. It should start with '0x' and be 42 characters long.")
+        
+        return address_list
+
 class UserDataUpdateForm(forms.Form):
     image_reference = forms.CharField(
         widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
@@ -0,0 +1,53 @@
+import logging
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Learned values never expire on their own; a new contract version gets a new code hash
+LEARNED_GAS_TIMEOUT = None
+
+
+def length_bucket(value):
+    """Number of 32-byte words an ABI-encoded string/bytes argument occupies"""
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return math.ceil(len(value) / 32)
+
+
+class GasEstimateCache:
+    """
+    Gas limits learned from mined receipts instead of eth_estimateGas.
+
+    Entries are keyed by the contract's runtime code hash, the function
+    selector, the argument size in 32-byte words and whether the call writes a
+    fresh storage slot or overwrites an existing one, which together determine
+    almost all of the gas a call uses. The largest gasUsed seen for a key plus
+    GAS_ESTIMATE_BUFFER becomes its limit.
+    """
+    def cache_key(self, code_hash, selector, bucket, overwrite):
+        return f"gas-estimate:{code_hash}:{selector}:{bucket}:{'overwrite' if overwrite else 'first-write'}"
+
+    def get(self, code_hash, selector, argument, overwrite):
+        gas_used = cache.get(self.cache_key(code_hash, selector, length_bucket(argument), overwrite))
+        if gas_used is None:
+            return None
+        return int(gas_used * settings.GAS_ESTIMATE_BUFFER)
+
+    async def aget(self, code_hash, selector, argument, overwrite):
+        gas_used = await cache.aget(self.cache_key(code_hash, selector, length_bucket(argument), overwrite))
+        if gas_used is None:
+            return None
+        return int(gas_used * settings.GAS_ESTIMATE_BUFFER)
+
+    def record(self, code_hash, selector, argument, overwrite, gas_used):
+        key = self.cache_key(code_hash, selector, length_bucket(argument), overwrite)
+        current = cache.get(key)
+        if current is None or gas_used > current:
+            cache.set(key, gas_used, timeout=LEARNED_GAS_TIMEOUT)
+            logger.debug(f"Learned gas {gas_used} for {key}")
+
+
+gas_estimates = GasEstimateCache()
@@ -0,0 +1,202 @@
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from apps.contract.clients import get_provider_url, web3_clients
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderUnavailable(ConnectionError):
+    """Raised without touching the network while a provider's circuit is open"""
+
+
+def redact_provider_url(network, error):
+    """Error text safe to log: the provider URL (which may carry an API key) is masked"""
+    return str(error).replace(get_provider_url(network), '<provider url>')[:200]
+
+
+class ProviderHealth:
+    """Cached health of one network's JSON-RPC provider, with a simple circuit breaker"""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, network):
+        self.network = network
+        self.state = self.CLOSED
+        self.healthy = None
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.latency_ms = None
+        self.block_number = None
+        self.checked_at = None
+        self.opened_at = None
+        self._checked_monotonic = None
+        self._opened_monotonic = None
+
+    def is_fresh(self):
+        return (
+            self._checked_monotonic is not None
+            and time.monotonic() - self._checked_monotonic < settings.WEB3_HEALTH_TTL
+        )
+
+    def as_dict(self):
+        return {
+            'network': self.network,
+            'state': self.state,
+            'healthy': self.healthy,
+            'consecutive_failures': self.consecutive_failures,
+            'last_error': self.last_error,
+            'latency_ms': self.latency_ms,
+            'block_number': self.block_number,
+            'checked_at': self.checked_at,
+            'opened_at': self.opened_at,
+        }
+
+
+class HealthMonitor:
+    """
+    Probes each provider in a background thread and caches the result, so
+    building a service costs no RPC round trip. After
+    WEB3_HEALTH_FAILURE_THRESHOLD consecutive failures the circuit opens and
+    callers fail immediately until WEB3_HEALTH_OPEN_SECONDS have passed.
+    """
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def get_state(self, network):
+        health = self._states.get(network)
+        if health is None:
+            with self._lock:
+                health = self._states.setdefault(network, ProviderHealth(network))
+        return health
+
+    def check(self, network):
+        """Fail fast if the provider is known to be down; never blocks on the network when state is fresh"""
+        self.ensure_started()
+        health = self.get_state(network)
+
+        if health.state == ProviderHealth.OPEN:
+            if time.monotonic() - health._opened_monotonic < settings.WEB3_HEALTH_OPEN_SECONDS:
+                raise ProviderUnavailable(
+                    f"Cannot connect to {network} network. Check your provider."
+                )
+            # Cool-down elapsed: let traffic through while the next probe decides
+            with self._lock:
+                if health.state == ProviderHealth.OPEN:
+                    health.state = ProviderHealth.HALF_OPEN
+
+        if not health.is_fresh() and not self.is_running():
+            # No background prober (e.g. management commands), so refresh inline
+            self.probe(network)
+            if health.state == ProviderHealth.OPEN:
+                raise ProviderUnavailable(
+                    f"Cannot connect to {network} network. Check your provider."
+                )
+        return health
+
+    async def acheck(self, network):
+        """check() for coroutines: an inline probe runs in a worker thread, never on the event loop"""
+        if self.is_running() or self.get_state(network).is_fresh():
+            return self.check(network)
+        return await sync_to_async(self.check, thread_sensitive=False)(network)
+
+    def probe(self, network):
+        """Issue a single eth_blockNumber with a short timeout and record the outcome"""
+        client = web3_clients.get(network)
+        session = client.provider._request_session_manager.session
+        payload = {'jsonrpc': '2.0', 'method': 'eth_blockNumber', 'params': [], 'id': 1}
+
+        started = time.monotonic()
+        try:
+            response = session.post(
+                get_provider_url(network),
+                json=payload,
+                timeout=settings.WEB3_HEALTH_PROBE_TIMEOUT,
+            )
+            response.raise_for_status()
+            result = response.json()
+            if 'error' in result:
+                raise ConnectionError(result['error'].get('message', 'RPC error'))
+            block_number = int(result['result'], 16)
+        except Exception as e:
+            self.record_failure(network, e)
+            return False
+
+        self.record_success(network, (time.monotonic() - started) * 1000, block_number)
+        return True
+
+    def record_success(self, network, latency_ms=None, block_number=None):
+        health = self.get_state(network)
+        with self._lock:
+            if health.state != ProviderHealth.CLOSED:
+                logger.info(f"Provider for {network} recovered; closing circuit")
+            health.state = ProviderHealth.CLOSED
+            health.healthy = True
+            health.consecutive_failures = 0
+            health.last_error = None
+            health.latency_ms = round(latency_ms, 1) if latency_ms is not None else None
+            health.block_number = block_number
+            health.opened_at = None
+            self._mark_checked(health)
+
+    def record_failure(self, network, error):
+        health = self.get_state(network)
+        with self._lock:
+            health.healthy = False
+            health.consecutive_failures += 1
+            # Only the exception class is kept: messages can embed the provider URL and its API key
+            health.last_error = type(error).__name__
+            threshold_reached = health.consecutive_failures >= settings.WEB3_HEALTH_FAILURE_THRESHOLD
+            if health.state == ProviderHealth.OPEN:
+                # Still down: restart the cool-down so traffic keeps failing fast
+                health._opened_monotonic = time.monotonic()
+            elif health.state == ProviderHealth.HALF_OPEN or (health.state == ProviderHealth.CLOSED and threshold_reached):
+                logger.warning(f"Opening circuit for {network} after {health.consecutive_failures} failure(s): {redact_provider_url(network, error)}")
+                health.state = ProviderHealth.OPEN
+                health.opened_at = time.time()
+                health._opened_monotonic = time.monotonic()
+            self._mark_checked(health)
+
+    def _mark_checked(self, health):
+        health.checked_at = time.time()
+        health._checked_monotonic = time.monotonic()
+
+    def snapshot(self):
+        return {network: health.as_dict() for network, health in list(self._states.items())}
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def ensure_started(self):
+        if not settings.WEB3_HEALTH_BACKGROUND or self.is_running():
+            return
+        with self._lock:
+            if self.is_running():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='web3-health-monitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            networks = set(settings.WEB3_PROVIDER_URLS) | set(self._states)
+            for network in networks:
+                try:
+                    self.probe(network)
+                except Exception:
+                    logger.exception(f"Health probe for {network} crashed")
+            self._stop.wait(settings.WEB3_HEALTH_CHECK_INTERVAL)
+
+
+provider_health = HealthMonitor()
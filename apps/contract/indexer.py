@@ -0,0 +1,236 @@
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from web3 import Web3
+
+from apps.contract.clients import get_web3
+from apps.contract.encoding import get_encoder, to_bytes
+from apps.contract.models import IndexerCheckpoint, RegistryEvent, RegistryUser, UserDataRegistry
+from apps.contract.reads import user_data_cache
+from apps.contract.rpc import RPCError, batch_request, to_int
+from apps.user.models import User
+
+logger = logging.getLogger(__name__)
+
+INDEXED_EVENTS = [
+    RegistryEvent.EVENT_USER_DATA_UPDATED,
+    RegistryEvent.EVENT_USER_AUTHORIZED,
+    RegistryEvent.EVENT_USER_DEAUTHORIZED,
+]
+
+# Registry addresses per eth_getLogs address filter
+ADDRESS_FILTER_CHUNK = 500
+
+
+def applied_position(registry_user):
+    """
+    (block, log index) of the last event applied to a member row. Rows indexed
+    before log indexes were recorded sort ahead of every event in their block.
+    """
+    if registry_user.indexed_block is None:
+        return (-1, -1)
+    if registry_user.indexed_log_index is None:
+        return (registry_user.indexed_block, -1)
+    return (registry_user.indexed_block, registry_user.indexed_log_index)
+
+
+class EventIndexer:
+    """
+    Follows UserDataRegistry events for every deployed registry on a network
+    with eth_getLogs address filters, stores them as RegistryEvent rows and
+    applies them to RegistryUser in bulk, so membership and user data can be
+    read from the database instead of per-request eth_calls.
+
+    Progress is checkpointed per network after each block range, in the same
+    database transaction as the rows it produced.
+    """
+    def __init__(self, block_range=None, confirmations=None):
+        self.block_range = block_range or settings.EVENT_INDEXER_BLOCK_RANGE
+        self.confirmations = settings.EVENT_INDEXER_CONFIRMATIONS if confirmations is None else confirmations
+
+    @property
+    def encoder(self):
+        return get_encoder('UserDataRegistry')
+
+    @property
+    def topics(self):
+        return [self.encoder.event_topic(name) for name in INDEXED_EVENTS]
+
+    def safe_head(self, w3):
+        """Latest block considered final enough to index"""
+        return max(w3.eth.block_number - self.confirmations, 0)
+
+    def deployed_registries(self, network):
+        registries = UserDataRegistry.objects.filter(network=network, deployed=True, address__isnull=False)
+        return {registry.address.lower(): registry for registry in registries}
+
+    def indexed_networks(self):
+        return sorted(set(UserDataRegistry.objects.filter(deployed=True).values_list('network', flat=True)))
+
+    def index_network(self, network, from_block=None, to_block=None):
+        """
+        Ingest events from the checkpoint (or ``from_block``) up to ``to_block``,
+        bounded by the safe head. Without either a checkpoint or ``from_block``
+        indexing starts at the current head; history is left to backfills.
+        Returns the number of events ingested.
+        """
+        w3 = get_web3(network)
+        head = self.safe_head(w3)
+        to_block = head if to_block is None else min(to_block, head)
+
+        if from_block is None:
+            checkpoint = IndexerCheckpoint.objects.filter(network=network).first()
+            from_block = checkpoint.last_block + 1 if checkpoint else to_block
+
+        registries = self.deployed_registries(network)
+        ingested = 0
+        for range_start in range(from_block, to_block + 1, self.block_range):
+            range_end = min(range_start + self.block_range - 1, to_block)
+            logs = self.get_logs(w3, list(registries), range_start, range_end) if registries else []
+            with transaction.atomic():
+                ingested += self.ingest(registries, logs)
+                IndexerCheckpoint.objects.update_or_create(network=network, defaults={'last_block': range_end})
+        return ingested
+
+    def get_logs(self, w3, addresses, from_block, to_block):
+        """Fetch registry logs for a block range, one batched eth_getLogs per address chunk"""
+        calls = []
+        for start in range(0, len(addresses), ADDRESS_FILTER_CHUNK):
+            calls.append(('eth_getLogs', [{
+                'address': [Web3.to_checksum_address(address) for address in addresses[start:start + ADDRESS_FILTER_CHUNK]],
+                'topics': [self.topics],
+                'fromBlock': hex(from_block),
+                'toBlock': hex(to_block),
+            }]))
+
+        logs = []
+        for result in batch_request(w3, calls):
+            if isinstance(result, RPCError):
+                raise result
+            logs.extend(result)
+        return logs
+
+    def ingest_logs(self, network, logs):
+        """Ingest logs that arrived some other way, e.g. in a transaction receipt"""
+        addresses = {log['address'].lower() for log in logs}
+        registries = {
+            registry.address.lower(): registry
+            for registry in UserDataRegistry.objects.filter(network=network, address__isnull=False)
+            if registry.address.lower() in addresses
+        }
+        return self.ingest(registries, logs)
+
+    def ingest(self, registries, logs):
+        events = self.build_events(registries, logs)
+        if not events:
+            return 0
+
+        with transaction.atomic():
+            RegistryEvent.objects.bulk_create(events, ignore_conflicts=True)
+            self.apply(events)
+        return len(events)
+
+    def build_events(self, registries, logs):
+        """Decode logs emitted by the given registries into unsaved RegistryEvent rows, oldest first"""
+        events = []
+        for log in logs:
+            registry = registries.get(log['address'].lower())
+            decoded = self.encoder.decode_log(log) if registry else None
+            if decoded is None:
+                continue
+
+            name, args = decoded
+            event = RegistryEvent(
+                registry=registry,
+                event=name,
+                wallet_address=Web3.to_checksum_address(args['user']),
+                block_number=to_int(log['blockNumber']),
+                transaction_hash='0x' + to_bytes(log['transactionHash']).hex(),
+                log_index=to_int(log['logIndex']),
+            )
+            if name == RegistryEvent.EVENT_USER_DATA_UPDATED:
+                event.image_reference = args['imageReference']
+                event.timestamp = datetime.fromtimestamp(args['timestamp'], tz=dt_timezone.utc)
+            events.append(event)
+
+        events.sort(key=lambda event: (event.block_number, event.log_index))
+        return events
+
+    def apply(self, events):
+        """Upsert the RegistryUser rows touched by a block-ordered list of events"""
+        # Wallet columns are stored lowercase, so keys use that form too
+        wallets = {event.wallet_address.lower() for event in events}
+
+        existing = {
+            (registry_user.registry_id, registry_user.wallet_address): registry_user
+            for registry_user in RegistryUser.objects.filter(
+                registry_id__in={event.registry_id for event in events},
+                wallet_address__in=wallets,
+            )
+        }
+        users = {
+            user.wallet_address: user
+            for user in User.objects.filter(wallet_address__in=wallets)
+        }
+
+        created = {}
+        for event in events:
+            key = (event.registry_id, event.wallet_address.lower())
+            registry_user = existing.get(key) or created.get(key)
+            if registry_user is None:
+                registry_user = RegistryUser(
+                    registry_id=event.registry_id,
+                    user=users.get(key[1]),
+                    wallet_address=event.wallet_address,
+                )
+                created[key] = registry_user
+            elif (event.block_number, event.log_index) <= applied_position(registry_user):
+                # This event, or a newer one, has already been applied to this row
+                continue
+
+            if event.event == RegistryEvent.EVENT_USER_DATA_UPDATED:
+                registry_user.image_reference = event.image_reference
+                registry_user.last_updated = event.timestamp
+            else:
+                registry_user.is_authorized = event.event == RegistryEvent.EVENT_USER_AUTHORIZED
+            registry_user.indexed_block = event.block_number
+            registry_user.indexed_log_index = event.log_index
+
+        if created:
+            RegistryUser.objects.bulk_create(created.values(), ignore_conflicts=True)
+        if existing:
+            RegistryUser.objects.bulk_update(
+                existing.values(),
+                ['is_authorized', 'image_reference', 'last_updated', 'indexed_block', 'indexed_log_index'],
+            )
+
+        # Cached reads for these members are now out of date, whichever event touched them
+        registries = {
+            pk: (network, address)
+            for pk, network, address in UserDataRegistry.objects.filter(
+                pk__in={event.registry_id for event in events}
+            ).values_list('pk', 'network', 'address')
+        }
+        user_data_cache.invalidate_many([
+            (*registries[event.registry_id], event.wallet_address) for event in events
+        ])
+
+    def run(self, interval=None, network=None):
+        interval = interval or settings.EVENT_INDEXER_INTERVAL
+        logger.info(f"Event indexer started (every {interval}s)")
+        while True:
+            networks = [network] if network else self.indexed_networks()
+            for tx_network in networks:
+                try:
+                    ingested = self.index_network(tx_network)
+                    if ingested:
+                        logger.info(f"Indexed {ingested} event(s) on {tx_network}")
+                except Exception as e:
+                    logger.error(f"Event indexing failed for {tx_network}: {str(e)}")
+            time.sleep(interval)
+
+
+event_indexer = EventIndexer()
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.contract.backfill import EventBackfill
+from apps.contract.models import BackfillSegment, UserDataRegistry
+
+
+class Command(BaseCommand):
+    help = 'Scan the event history of deployed registries into the database; safe to interrupt and rerun'
+
+    def add_arguments(self, parser):
+        parser.add_argument('registry_ids', nargs='*', type=int, help='Registries to backfill (default: all not yet backfilled)')
+        parser.add_argument('--network', default=None, help='Only backfill registries on this network')
+        parser.add_argument('--workers', type=int, default=None, help='Concurrent eth_getLogs workers')
+        parser.add_argument('--segment-size', type=int, default=None, help='Blocks per resumable segment')
+        parser.add_argument(
+            '--from-block',
+            type=int,
+            default=None,
+            help='Start block for registries without segments, instead of looking up the deployment block'
+        )
+
+    def handle(self, *args, **options):
+        registries = UserDataRegistry.objects.filter(deployed=True, address__isnull=False)
+        if options['registry_ids']:
+            registries = registries.filter(pk__in=options['registry_ids'])
+        else:
+            # Registries never planned, plus those with segments left to scan
+            registries = registries.exclude(
+                pk__in=BackfillSegment.objects.values('registry_id')
+            ) | registries.filter(
+                pk__in=BackfillSegment.objects.exclude(status=BackfillSegment.STATUS_DONE).values('registry_id')
+            )
+        if options['network']:
+            registries = registries.filter(network=options['network'])
+
+        registries = list(registries)
+        if not registries:
+            self.stdout.write('Nothing to backfill')
+            return
+
+        backfill = EventBackfill(workers=options['workers'], segment_size=options['segment_size'])
+        self.stdout.write(f'Backfilling {len(registries)} registr{"y" if len(registries) == 1 else "ies"} with {backfill.workers} workers...')
+
+        started = time.perf_counter()
+        try:
+            summary = backfill.run(registries, from_block=options['from_block'])
+        except Exception as e:
+            raise CommandError(f'Backfill failed: {str(e)}')
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{summary['segments']} segment(s), {summary['events']} event(s), "
+            f"{summary['requests']} eth_getLogs request(s) in {elapsed:.1f}s"
+        )
+        if summary['failed']:
+            raise CommandError(f"{summary['failed']} segment(s) failed; rerun to retry them")
+        self.stdout.write(self.style.SUCCESS('Backfill complete'))
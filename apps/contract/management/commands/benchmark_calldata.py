@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from web3 import Web3
+
+from apps.contract.artifacts import artifact_store
+from apps.contract.encoding import get_encoder
+
+
+def time_per_call(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+class Command(BaseCommand):
+    help = 'Microbenchmark local calldata encoding against web3 contract encoding (no provider needed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--whitelist-size', type=int, default=100, help='Addresses passed to the constructor')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        artifact = artifact_store.get('UserDataRegistry')
+        encoder = get_encoder('UserDataRegistry')
+
+        # A Web3 instance with no provider: only used for its ABI codec
+        w3 = Web3()
+        Contract = w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bin'])
+        contract = w3.eth.contract(address='0x' + '11' * 20, abi=artifact['abi'])
+
+        whitelist = [Web3.to_checksum_address(f'0x{i:040x}') for i in range(1, options['whitelist_size'] + 1)]
+        image_reference = 'ipfs://bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi'
+
+        # Both paths must produce identical calldata
+        assert encoder.encode_function('updateUserData', [image_reference]) == contract.encode_abi('updateUserData', args=[image_reference])
+        assert encoder.encode_constructor([whitelist]) == Contract._encode_constructor_data(whitelist)
+
+        results = [
+            ('updateUserData(string) local', time_per_call(
+                lambda: encoder.encode_function('updateUserData', [image_reference]), iterations)),
+            ('updateUserData(string) web3', time_per_call(
+                lambda: contract.encode_abi('updateUserData', args=[image_reference]), iterations)),
+            (f'constructor({len(whitelist)} addresses) local', time_per_call(
+                lambda: encoder.encode_constructor([whitelist]), max(iterations // 10, 1))),
+            (f'constructor({len(whitelist)} addresses) web3', time_per_call(
+                lambda: Contract._encode_constructor_data(whitelist), max(iterations // 10, 1))),
+            ('contract object + encode (old path)', time_per_call(
+                lambda: w3.eth.contract(address='0x' + '11' * 20, abi=artifact['abi']).encode_abi(
+                    'updateUserData', args=[image_reference]), max(iterations // 10, 1))),
+        ]
+
+        width = max(len(name) for name, _ in results)
+        for name, micros in results:
+            self.stdout.write(f'{name.ljust(width)}  {micros:10.1f} us/call')
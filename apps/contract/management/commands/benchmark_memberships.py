@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from web3 import Web3
+
+from apps.contract.memberships import materialize_memberships
+from apps.contract.models import RegistryUser, UserDataRegistry
+from apps.user.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts statements without keeping them"""
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def create_members_one_by_one(registry, wallet_addresses):
+    """The per-address path deployment confirmation used before materialize_memberships"""
+    for address in wallet_addresses:
+        if not registry.users.filter(wallet_address=address).exists():
+            user = User.objects.filter(wallet_address=address).first()
+            RegistryUser.objects.create(registry=registry, user=user, wallet_address=address, is_authorized=True)
+
+
+class Command(BaseCommand):
+    help = 'Time member creation for a large deployment whitelist, per address vs in bulk (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--whitelist-size', type=int, default=10000)
+        parser.add_argument('--with-accounts', type=int, default=1000, help='Whitelisted wallets that have a User row')
+
+    def handle(self, *args, **options):
+        wallets = [Web3.to_checksum_address(f'0x{i:040x}') for i in range(1, options['whitelist_size'] + 1)]
+
+        results = []
+        for name, func in [('per address', create_members_one_by_one), ('bulk', materialize_memberships)]:
+            elapsed, queries, members = self.measure(func, wallets, options['with_accounts'])
+            results.append((name, elapsed, queries, members))
+
+        for name, elapsed, queries, members in results:
+            self.stdout.write(f'{name.ljust(12)} {elapsed * 1000:10.1f} ms  {queries:6d} queries  {members} members')
+
+    def measure(self, func, wallets, with_accounts):
+        try:
+            with transaction.atomic():
+                admin = User.objects.create(email='benchmark-admin@example.com', username='benchmark-admin')
+                User.objects.bulk_create([
+                    User(email=f'benchmark-{i}@example.com', username=f'benchmark-{i}', wallet_address=address)
+                    for i, address in enumerate(wallets[:with_accounts])
+                ])
+                registry = UserDataRegistry.objects.create(name='Benchmark', admin=admin, network='sepolia')
+
+                # Savepoint so both paths pay for a transaction, as the confirm views do
+                queries = QueryCounter()
+                with connection.execute_wrapper(queries):
+                    start = time.perf_counter()
+                    with transaction.atomic():
+                        func(registry, wallets)
+                    elapsed = time.perf_counter() - start
+
+                members = registry.users.count()
+                raise Rollback()
+        except Rollback:
+            pass
+        return elapsed, queries.count, members
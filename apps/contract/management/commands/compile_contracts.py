@@ -0,0 +1,51 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.contract.artifacts import SOLC_VERSION, compile_source_file, source_paths, stale_artifacts, write_artifact
+
+
+class Command(BaseCommand):
+    help = 'Compile contracts/*.sol into versioned JSON artifacts that are shipped with the app'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solc-version', default=SOLC_VERSION, help='Compiler version to build with')
+        parser.add_argument('--output', default=None, help='Directory for the artifacts (defaults to CONTRACT_PRECOMPILED_DIR)')
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Do not compile; exit with an error if any shipped artifact is missing or out of date'
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output'] or settings.CONTRACT_PRECOMPILED_DIR
+        solc_version = options['solc_version']
+        sources = source_paths()
+
+        if not sources:
+            raise CommandError('No Solidity sources found in contracts/')
+
+        if options['check']:
+            self.check_artifacts(output_dir, solc_version)
+            return
+
+        for path in sources:
+            self.stdout.write(f'Compiling {os.path.relpath(path, settings.BASE_DIR)} with solc {solc_version}...')
+            try:
+                artifacts = compile_source_file(path, solc_version)
+            except Exception as e:
+                raise CommandError(f'Failed to compile {path}: {str(e)}')
+
+            for contract_name, data in artifacts.items():
+                artifact_path = os.path.join(output_dir, f'{contract_name}.json')
+                write_artifact(artifact_path, data)
+                self.stdout.write(f'  wrote {os.path.relpath(artifact_path, settings.BASE_DIR)}')
+
+        self.stdout.write(self.style.SUCCESS('Contract artifacts are up to date.'))
+
+    def check_artifacts(self, output_dir, solc_version):
+        stale = stale_artifacts(output_dir, solc_version)
+        if stale:
+            raise CommandError('Stale contract artifacts, run compile_contracts:\n  ' + '\n  '.join(stale))
+        self.stdout.write(self.style.SUCCESS('Contract artifacts are up to date.'))
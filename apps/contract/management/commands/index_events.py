@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.contract.indexer import event_indexer
+
+
+class Command(BaseCommand):
+    help = 'Ingest UserDataRegistry events for all deployed registries into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Index up to the current safe head and exit')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.EVENT_INDEXER_INTERVAL,
+            help='Seconds between polls for new blocks'
+        )
+        parser.add_argument('--network', default=None, help='Only index this network')
+        parser.add_argument(
+            '--from-block',
+            type=int,
+            default=None,
+            help='Start here instead of at the checkpoint (requires --once and --network)'
+        )
+
+    def handle(self, *args, **options):
+        if options['from_block'] is not None and not (options['once'] and options['network']):
+            raise CommandError('--from-block requires --once and --network')
+
+        if options['once']:
+            networks = [options['network']] if options['network'] else event_indexer.indexed_networks()
+            for network in networks:
+                ingested = event_indexer.index_network(network, from_block=options['from_block'])
+                self.stdout.write(self.style.SUCCESS(f'Indexed {ingested} event(s) on {network}'))
+            return
+
+        self.stdout.write(f"Indexing registry events every {options['interval']}s (Ctrl+C to stop)")
+        try:
+            event_indexer.run(interval=options['interval'], network=options['network'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.contract.tracker import receipt_tracker
+
+
+class Command(BaseCommand):
+    help = 'Poll receipts for pending server-sent transactions and apply them once mined'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Poll a single time and exit')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.RECEIPT_TRACKER_INTERVAL,
+            help='Seconds between polls'
+        )
+        parser.add_argument('--network', default=None, help='Only track transactions on this network')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            settled = receipt_tracker.poll_once(network=options['network'])
+            self.stdout.write(self.style.SUCCESS(f'Settled {settled} transaction(s)'))
+            return
+
+        self.stdout.write(f"Tracking receipts every {options['interval']}s (Ctrl+C to stop)")
+        try:
+            receipt_tracker.run(interval=options['interval'], network=options['network'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
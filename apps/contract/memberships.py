@@ -0,0 +1,40 @@
+import logging
+
+from django.db import transaction
+from web3 import Web3
+
+from apps.contract.models import RegistryUser
+from apps.user.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def materialize_memberships(registry, wallet_addresses, is_authorized=True):
+    """
+    Add RegistryUser rows for a list of wallets with one IN query resolving
+    wallets to accounts and one bulk_create, in a single transaction. Wallets
+    that are already members are left untouched. Returns the
+    checksummed addresses that were submitted.
+    """
+    wallet_addresses = list(dict.fromkeys(Web3.to_checksum_address(address) for address in wallet_addresses))
+    if not wallet_addresses:
+        return []
+
+    with transaction.atomic():
+        users = {
+            user.wallet_address: user
+            for user in User.objects.filter(wallet_address__in=wallet_addresses)
+        }
+        RegistryUser.objects.bulk_create(
+            [
+                RegistryUser(
+                    registry=registry,
+                    user=users.get(address.lower()),  # None for wallets with no account yet
+                    wallet_address=address,
+                    is_authorized=is_authorized,
+                )
+                for address in wallet_addresses
+            ],
+            ignore_conflicts=True
+        )
+    return wallet_addresses
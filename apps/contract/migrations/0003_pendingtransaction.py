@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-17 21:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0002_alter_userdataregistry_network'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('network', models.CharField(max_length=50)),
+                ('kind', models.CharField(choices=[('deploy', 'Registry deployment'), ('update_user_data', 'User data update')], max_length=32)),
+                ('transaction_hash', models.CharField(max_length=66, unique=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('failed', 'Failed'), ('dropped', 'Dropped')], default='pending', max_length=16)),
+                ('block_number', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('gas_used', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('contract_address', models.CharField(blank=True, max_length=42, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True)),
+                ('registry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='contract.userdataregistry')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'network'], name='contract_pe_status_b17162_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-17 21:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0003_pendingtransaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingtransaction',
+            name='nonce',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pendingtransaction',
+            name='sender',
+            field=models.CharField(blank=True, max_length=42),
+        ),
+        migrations.CreateModel(
+            name='NonceCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('network', models.CharField(max_length=50)),
+                ('address', models.CharField(max_length=42)),
+                ('next_nonce', models.PositiveBigIntegerField()),
+                ('gaps', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('network', 'address')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.2 on 2026-10-17 21:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0004_noncecursor'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('network', models.CharField(max_length=50, unique=True)),
+                ('last_block', models.PositiveBigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='registryuser',
+            name='indexed_block',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='registryuser',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='registry_memberships', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='RegistryEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('UserDataUpdated', 'User data updated'), ('UserAuthorized', 'User authorized'), ('UserDeauthorized', 'User deauthorized')], max_length=32)),
+                ('wallet_address', models.CharField(max_length=42)),
+                ('image_reference', models.TextField(blank=True, null=True)),
+                ('timestamp', models.DateTimeField(blank=True, null=True)),
+                ('block_number', models.PositiveBigIntegerField()),
+                ('transaction_hash', models.CharField(max_length=66)),
+                ('log_index', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('registry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='contract.userdataregistry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['registry', 'block_number'], name='contract_re_registr_e7f1bd_idx')],
+                'unique_together': {('transaction_hash', 'log_index')},
+            },
+        ),
+    ]
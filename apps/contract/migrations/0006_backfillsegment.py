@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-17 21:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0005_registryevent_indexercheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userdataregistry',
+            name='deployment_block',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='BackfillSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_block', models.PositiveBigIntegerField()),
+                ('to_block', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('events', models.PositiveIntegerField(default=0)),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('registry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='backfill_segments', to='contract.userdataregistry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'registry'], name='contract_ba_status_fc7ed4_idx')],
+                'unique_together': {('registry', 'from_block')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-17 21:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0007_pendingtransaction_authorize_users'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pendingtransaction',
+            name='kind',
+            field=models.CharField(choices=[('deploy', 'Registry deployment'), ('update_user_data', 'User data update'), ('authorize_users', 'User authorization'), ('deauthorize_users', 'User revocation')], max_length=32),
+        ),
+    ]
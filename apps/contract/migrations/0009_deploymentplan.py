@@ -0,0 +1,27 @@
+# Generated by Django 5.0.2 on 2026-10-17 21:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0008_pendingtransaction_deauthorize_users'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeploymentPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner_address', models.CharField(max_length=42)),
+                ('constructor_users', models.JSONField(blank=True, default=list)),
+                ('batches', models.JSONField(blank=True, default=list)),
+                ('batch_transactions', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('registry', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='deployment_plan', to='contract.userdataregistry')),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.2 on 2026-10-17 21:41
+
+import apps.user.fields
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import Lower
+
+
+def lowercase_wallet_addresses(apps, schema_editor):
+    RegistryUser = apps.get_model('contract', 'RegistryUser')
+    RegistryEvent = apps.get_model('contract', 'RegistryEvent')
+    members = RegistryUser.objects.annotate(canonical=Lower('wallet_address'))
+
+    # Rows for the same wallet in different case would collide on (registry, wallet_address);
+    # keep the one linked to an account with the most recent indexed event
+    duplicates = members.values('registry_id', 'canonical').annotate(count=Count('pk')).filter(count__gt=1)
+    for duplicate in list(duplicates):
+        pks = list(members.filter(
+            registry_id=duplicate['registry_id'],
+            canonical=duplicate['canonical'],
+        ).order_by(
+            F('user_id').desc(nulls_last=True),
+            F('indexed_block').desc(nulls_last=True),
+            'pk'
+        ).values_list('pk', flat=True))
+        RegistryUser.objects.filter(pk__in=pks[1:]).delete()
+
+    RegistryUser.objects.update(wallet_address=Lower('wallet_address'))
+    RegistryEvent.objects.update(wallet_address=Lower('wallet_address'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0009_deploymentplan'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='registryevent',
+            name='wallet_address',
+            field=apps.user.fields.WalletAddressField(max_length=42),
+        ),
+        migrations.AlterField(
+            model_name='registryuser',
+            name='wallet_address',
+            field=apps.user.fields.WalletAddressField(max_length=42),
+        ),
+        migrations.AddIndex(
+            model_name='registryuser',
+            index=models.Index(fields=['registry', 'user'], name='contract_ru_registry_user_idx'),
+        ),
+        migrations.RunPython(lowercase_wallet_addresses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-17 22:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0010_canonical_wallet_address'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registryuser',
+            name='indexed_log_index',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from apps.user.fields import WalletAddressField
 from apps.user.models import User
 
 class UserDataRegistry(models.Model):
@@ -19,6 +20,7 @@ class UserDataRegistry(models.Model):
     network = models.CharField(max_length=50, default='sepolia', choices=NETWORK_CHOICES)
     deployed = models.BooleanField(default=False)
     deployment_date = models.DateTimeField(null=True, blank=True)
+    deployment_block = models.PositiveBigIntegerField(null=True, blank=True)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -34,20 +36,210 @@ class UserDataRegistry(models.Model):
 
 class RegistryUser(models.Model):
     registry = models.ForeignKey(UserDataRegistry, on_delete=models.CASCADE, related_name='users')
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='registry_memberships')
-    wallet_address = models.CharField(max_length=42)
+    # Null for whitelisted wallets that have no account yet
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='registry_memberships')
+    wallet_address = WalletAddressField()
     is_authorized = models.BooleanField(default=True)
     
     # User data (duplicated from blockchain for quick access)
     image_reference = models.TextField(blank=True, null=True)
     last_updated = models.DateTimeField(null=True, blank=True)
+    # Block and log index of the last contract event applied to this row by the event indexer
+    indexed_block = models.PositiveBigIntegerField(null=True, blank=True)
+    indexed_log_index = models.PositiveIntegerField(null=True, blank=True)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
-        return f"{self.user.email} in {self.registry.name}"
+        return f"{self.user.email if self.user else self.wallet_address} in {self.registry.name}"
     
     class Meta:
         unique_together = ['registry', 'wallet_address']
+        indexes = [
+            # Membership checks by account: the detail page, registry list and update views
+            models.Index(fields=['registry', 'user'], name='contract_ru_registry_user_idx'),
+        ]
+
+
+class PendingTransaction(models.Model):
+    """A server-sent transaction whose receipt is picked up by the background receipt tracker"""
+
+    KIND_DEPLOY = 'deploy'
+    KIND_UPDATE_USER_DATA = 'update_user_data'
+    KIND_AUTHORIZE_USERS = 'authorize_users'
+    KIND_DEAUTHORIZE_USERS = 'deauthorize_users'
+    KIND_CHOICES = [
+        (KIND_DEPLOY, 'Registry deployment'),
+        (KIND_UPDATE_USER_DATA, 'User data update'),
+        (KIND_AUTHORIZE_USERS, 'User authorization'),
+        (KIND_DEAUTHORIZE_USERS, 'User revocation'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_FAILED = 'failed'
+    STATUS_DROPPED = 'dropped'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_CONFIRMED, 'Confirmed'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_DROPPED, 'Dropped'),
+    ]
+
+    registry = models.ForeignKey(UserDataRegistry, on_delete=models.CASCADE, related_name='transactions')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='transactions')
+    network = models.CharField(max_length=50)
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    transaction_hash = models.CharField(max_length=66, unique=True)
+    # Signing account and nonce, for transactions whose nonce came from the NonceManager
+    sender = models.CharField(max_length=42, blank=True)
+    nonce = models.PositiveBigIntegerField(null=True, blank=True)
+    # Whatever the tracker needs to apply the transaction's effects once mined
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    block_number = models.PositiveBigIntegerField(null=True, blank=True)
+    gas_used = models.PositiveBigIntegerField(null=True, blank=True)
+    contract_address = models.CharField(max_length=42, blank=True, null=True)
+    error = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.transaction_hash} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'network']),
+        ]
+
+
+class NonceCursor(models.Model):
+    """
+    Next nonce to hand out for a server-side signing account on a network.
+
+    Rows are locked with select_for_update while allocating, so concurrent
+    threads and processes never receive the same nonce.
+    """
+    network = models.CharField(max_length=50)
+    address = models.CharField(max_length=42)
+    next_nonce = models.PositiveBigIntegerField()
+    # Nonces given back by failed sends or dropped transactions, reused before next_nonce
+    gaps = models.JSONField(default=list, blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.address} on {self.network}: next nonce {self.next_nonce}"
+
+    class Meta:
+        unique_together = ['network', 'address']
+
+
+class RegistryEvent(models.Model):
+    """A UserDataRegistry contract event ingested by the event indexer"""
+
+    EVENT_USER_DATA_UPDATED = 'UserDataUpdated'
+    EVENT_USER_AUTHORIZED = 'UserAuthorized'
+    EVENT_USER_DEAUTHORIZED = 'UserDeauthorized'
+    EVENT_CHOICES = [
+        (EVENT_USER_DATA_UPDATED, 'User data updated'),
+        (EVENT_USER_AUTHORIZED, 'User authorized'),
+        (EVENT_USER_DEAUTHORIZED, 'User deauthorized'),
+    ]
+
+    registry = models.ForeignKey(UserDataRegistry, on_delete=models.CASCADE, related_name='events')
+    event = models.CharField(max_length=32, choices=EVENT_CHOICES)
+    wallet_address = WalletAddressField()
+    image_reference = models.TextField(blank=True, null=True)
+    timestamp = models.DateTimeField(null=True, blank=True)
+
+    block_number = models.PositiveBigIntegerField()
+    transaction_hash = models.CharField(max_length=66)
+    log_index = models.PositiveIntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.event} for {self.wallet_address} at block {self.block_number}"
+
+    class Meta:
+        unique_together = ['transaction_hash', 'log_index']
+        indexes = [
+            models.Index(fields=['registry', 'block_number']),
+        ]
+
+
+class IndexerCheckpoint(models.Model):
+    """Last block whose registry events have been ingested, per network"""
+    network = models.CharField(max_length=50, unique=True)
+    last_block = models.PositiveBigIntegerField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.network} indexed to block {self.last_block}"
+
+
+class BackfillSegment(models.Model):
+    """A block range of one registry's history to be scanned by the event backfill"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    registry = models.ForeignKey(UserDataRegistry, on_delete=models.CASCADE, related_name='backfill_segments')
+    from_block = models.PositiveBigIntegerField()
+    to_block = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    events = models.PositiveIntegerField(default=0)
+    # Number of eth_getLogs requests the range took after adaptive splitting
+    requests = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.registry.name} blocks {self.from_block}-{self.to_block} ({self.status})"
+
+    class Meta:
+        unique_together = ['registry', 'from_block']
+        indexes = [
+            models.Index(fields=['status', 'registry']),
+        ]
+
+
+class DeploymentPlan(models.Model):
+    """
+    How a registry's initial whitelist is split between the constructor and
+    the authorizeUsers batches sent once the contract is deployed.
+    """
+    registry = models.OneToOneField(UserDataRegistry, on_delete=models.CASCADE, related_name='deployment_plan')
+    owner_address = models.CharField(max_length=42)
+    # Addresses passed to the constructor, sized to fit the deployment gas budget
+    constructor_users = models.JSONField(default=list, blank=True)
+    # Remaining addresses, one list per authorizeUsers transaction
+    batches = models.JSONField(default=list, blank=True)
+    # Batch index (as a string) -> hash of the last transaction sent for it
+    batch_transactions = models.JSONField(default=dict, blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Deployment plan for {self.registry.name}: {len(self.constructor_users)} + {len(self.batches)} batch(es)"
@@ -0,0 +1,47 @@
+import logging
+
+from django.conf import settings
+from eth_abi import decode, encode
+from web3 import Web3
+
+from apps.contract.encoding import to_bytes
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE3_SELECTOR = Web3.keccak(text='aggregate3((address,bool,bytes)[])')[:4]
+
+
+def get_multicall_address(network):
+    return Web3.to_checksum_address(settings.MULTICALL3_ADDRESSES.get(network, settings.MULTICALL3_DEFAULT_ADDRESS))
+
+
+def encode_aggregate3(calls):
+    """Calldata for Multicall3.aggregate3 over ``(target, calldata)`` pairs, each allowed to fail"""
+    encoded = encode(
+        ['(address,bool,bytes)[]'],
+        [[(Web3.to_checksum_address(target), True, to_bytes(data)) for target, data in calls]]
+    )
+    return '0x' + (AGGREGATE3_SELECTOR + encoded).hex()
+
+
+def decode_aggregate3(data):
+    """Return the ``(success, return_data)`` pairs of an aggregate3 call"""
+    (results,) = decode(['(bool,bytes)[]'], to_bytes(data))
+    return list(results)
+
+
+def aggregate3(w3, multicall_address, calls, chunk_size=None):
+    """
+    Run view calls through Multicall3, one eth_call per chunk of ``chunk_size``.
+
+    ``calls`` is a list of ``(target, calldata)`` pairs; returns one
+    ``(success, return_data)`` pair per call, in order. A reverting call only
+    fails its own entry.
+    """
+    chunk_size = chunk_size or settings.MULTICALL_CHUNK_SIZE
+    results = []
+    for start in range(0, len(calls), chunk_size):
+        chunk = calls[start:start + chunk_size]
+        data = w3.eth.call({'to': multicall_address, 'data': encode_aggregate3(chunk)})
+        results.extend(decode_aggregate3(data))
+    return results
@@ -0,0 +1,150 @@
+import logging
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from web3 import Web3
+from web3.exceptions import ProviderConnectionError, RequestTimedOut
+
+from apps.contract.models import NonceCursor, PendingTransaction
+
+logger = logging.getLogger(__name__)
+
+# Statuses whose transactions used up their nonce on chain
+NONCE_CONSUMING_STATUSES = [
+    PendingTransaction.STATUS_PENDING,
+    PendingTransaction.STATUS_CONFIRMED,
+    PendingTransaction.STATUS_FAILED,
+]
+
+
+# Failures after which a sent transaction may still have reached the node:
+# timeouts and dropped connections (requests' exceptions are OSErrors)
+AMBIGUOUS_SEND_ERRORS = (OSError, ProviderConnectionError, RequestTimedOut)
+
+
+def is_nonce_too_low(error):
+    message = str(error).lower()
+    return 'nonce too low' in message or 'already known' in message
+
+
+def is_ambiguous_send_error(error):
+    return isinstance(error, AMBIGUOUS_SEND_ERRORS)
+
+
+class NonceManager:
+    """
+    Hands out nonces for server-side signing accounts without asking the chain
+    each time, so many transactions from one key can be in flight at once.
+
+    The cursor for a (network, address) is seeded from the pending transaction
+    count and then advanced under a row lock. Nonces that never made it on
+    chain (failed sends, dropped transactions, or gaps found by the receipt
+    tracker) are handed out again before the cursor moves on. Nothing re-signs
+    on its own: transactions queued behind a gap are unblocked by the
+    account's next send, which takes the freed nonce.
+    """
+    def allocate(self, w3, network, address):
+        address = Web3.to_checksum_address(address)
+        self.ensure_seeded(w3, network, address)
+
+        with transaction.atomic():
+            cursor = NonceCursor.objects.select_for_update().get(network=network, address=address)
+            if cursor.gaps:
+                gaps = sorted(cursor.gaps)
+                nonce = gaps.pop(0)
+                cursor.gaps = gaps
+            else:
+                nonce = cursor.next_nonce
+                cursor.next_nonce += 1
+            cursor.save(update_fields=['next_nonce', 'gaps', 'updated_at'])
+        return nonce
+
+    def ensure_seeded(self, w3, network, address):
+        if NonceCursor.objects.filter(network=network, address=address).exists():
+            return
+        chain_nonce = w3.eth.get_transaction_count(address, 'pending')
+        try:
+            with transaction.atomic():
+                NonceCursor.objects.create(network=network, address=address, next_nonce=chain_nonce)
+        except IntegrityError:
+            # Another worker seeded it first
+            pass
+
+    def release(self, network, address, nonce):
+        """Give back a nonce that will never be mined so the next allocation reuses it"""
+        address = Web3.to_checksum_address(address)
+        with transaction.atomic():
+            cursor = NonceCursor.objects.select_for_update().filter(network=network, address=address).first()
+            if cursor is None or nonce >= cursor.next_nonce or nonce in cursor.gaps:
+                return
+            cursor.gaps = sorted(cursor.gaps + [nonce])
+            cursor.save(update_fields=['gaps', 'updated_at'])
+        logger.info(f"Released nonce {nonce} for {address} on {network}")
+
+    def resync(self, w3, network, address):
+        """Drop gaps the chain has already used and catch up with transactions sent elsewhere"""
+        address = Web3.to_checksum_address(address)
+        mined_nonce = w3.eth.get_transaction_count(address, 'latest')
+        pending_nonce = w3.eth.get_transaction_count(address, 'pending')
+        with transaction.atomic():
+            cursor = NonceCursor.objects.select_for_update().filter(network=network, address=address).first()
+            if cursor is None:
+                NonceCursor.objects.create(network=network, address=address, next_nonce=pending_nonce)
+                return
+            cursor.gaps = [nonce for nonce in cursor.gaps if nonce >= mined_nonce]
+            cursor.next_nonce = max(cursor.next_nonce, pending_nonce)
+            cursor.save(update_fields=['next_nonce', 'gaps', 'updated_at'])
+
+    def detect_gaps(self, network, address, mined_nonce, stuck_nonce):
+        """
+        Find nonces between the chain's mined count and a stuck transaction that
+        no tracked transaction holds, and queue them for reuse. Only transactions
+        older than NONCE_GAP_GRACE should be reported as stuck, so nonces still
+        being signed elsewhere are not mistaken for gaps.
+        """
+        address = Web3.to_checksum_address(address)
+        held = set(PendingTransaction.objects.filter(
+            network=network,
+            sender=address,
+            nonce__gte=mined_nonce,
+            nonce__lt=stuck_nonce,
+            status__in=NONCE_CONSUMING_STATUSES,
+        ).values_list('nonce', flat=True))
+
+        gaps = [nonce for nonce in range(mined_nonce, stuck_nonce) if nonce not in held]
+        for nonce in gaps:
+            self.release(network, address, nonce)
+        return gaps
+
+    def stuck_before(self):
+        return timezone.now() - timedelta(seconds=settings.NONCE_GAP_GRACE)
+
+    @contextmanager
+    def reserve(self, w3, network, address):
+        """
+        Allocate a nonce for one send. If the block raises, the cursor is
+        resynced when the node says the nonce was already used, and the nonce
+        is given back only when the transaction was certainly rejected. After a
+        timeout or dropped connection the node may have accepted it, so the
+        nonce stays reserved and resync or gap detection settles it later.
+        """
+        nonce = self.allocate(w3, network, address)
+        try:
+            yield nonce
+        except Exception as e:
+            if is_nonce_too_low(e):
+                try:
+                    self.resync(w3, network, address)
+                except Exception as resync_error:
+                    logger.warning(f"Failed to resync nonce for {address}: {str(resync_error)}")
+            elif is_ambiguous_send_error(e):
+                logger.warning(f"Keeping nonce {nonce} for {address} reserved after an ambiguous send failure: {str(e)}")
+            else:
+                self.release(network, address, nonce)
+            raise
+
+
+nonce_manager = NonceManager()
@@ -0,0 +1,28 @@
+def parse_cursor(value):
+    """A keyset cursor from a query parameter, or None when missing or malformed"""
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, after=None, page_size=50, descending=False):
+    """
+    One page of a queryset in primary key order, starting after the ``after``
+    cursor. Unlike OFFSET pagination every page costs the same, however deep.
+    One extra row is fetched to tell whether another page follows. Returns
+    ``(rows, next_cursor)``, with next_cursor None on the last page.
+    """
+    if descending:
+        queryset = queryset.order_by('-pk')
+        if after is not None:
+            queryset = queryset.filter(pk__lt=after)
+    else:
+        queryset = queryset.order_by('pk')
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+
+    rows = list(queryset[:page_size + 1])
+    if len(rows) > page_size:
+        return rows[:page_size], rows[page_size - 1].pk
+    return rows, None
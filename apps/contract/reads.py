@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class UserDataCache:
+    """
+    Read-through cache of getUserData results keyed by (network, registry
+    address, wallet), shared across workers via Django's cache.
+
+    Entries expire after USER_DATA_CACHE_TTL and are deleted when the event
+    indexer (fed by the receipt tracker or its own polling) applies a mined
+    UserDataUpdated event, not when the write is submitted, so a read between
+    submit and mining cannot re-cache the old value. The TTL only bounds
+    staleness from writes the app never saw. Hit, miss and
+    age counters are kept per process for the health endpoint.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.total_age = 0.0
+        self.max_age = 0.0
+
+    @property
+    def ttl(self):
+        return settings.USER_DATA_CACHE_TTL
+
+    def cache_key(self, network, contract_address, wallet_address):
+        return f'user-data:{network}:{contract_address.lower()}:{wallet_address.lower()}'
+
+    def get(self, network, contract_address, wallet_address):
+        """Return cached user data, or None when the caller has to read the chain"""
+        entry = cache.get(self.cache_key(network, contract_address, wallet_address))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            age = time.time() - entry['fetched_at']
+            self.hits += 1
+            self.total_age += age
+            self.max_age = max(self.max_age, age)
+        return entry['value']
+
+    async def aget(self, network, contract_address, wallet_address):
+        return await sync_to_async(self.get, thread_sensitive=False)(network, contract_address, wallet_address)
+
+    def set(self, network, contract_address, wallet_address, value):
+        cache.set(
+            self.cache_key(network, contract_address, wallet_address),
+            {'value': value, 'fetched_at': time.time()},
+            timeout=self.ttl,
+        )
+
+    async def aset(self, network, contract_address, wallet_address, value):
+        await sync_to_async(self.set, thread_sensitive=False)(network, contract_address, wallet_address, value)
+
+    def invalidate(self, network, contract_address, wallet_address):
+        self.invalidate_many([(network, contract_address, wallet_address)])
+
+    def invalidate_many(self, entries):
+        """Delete cached data for ``(network, contract_address, wallet_address)`` tuples"""
+        keys = {self.cache_key(*entry) for entry in entries if entry[1]}
+        if not keys:
+            return
+        cache.delete_many(list(keys))
+        with self._lock:
+            self.invalidations += len(keys)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            # Seconds since the served entries were read from the chain
+            'average_age': round(self.total_age / self.hits, 3) if self.hits else None,
+            'max_age': round(self.max_age, 3),
+        }
+
+    def clear_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+            self.total_age = 0.0
+            self.max_age = 0.0
+
+
+user_data_cache = UserDataCache()
@@ -0,0 +1,58 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RPCError(ValueError):
+    """A JSON-RPC error returned for one entry of a batch"""
+    def __init__(self, error):
+        if isinstance(error, dict):
+            self.code = error.get('code')
+            message = error.get('message', 'RPC error')
+        else:
+            self.code = None
+            message = str(error)
+        super().__init__(message)
+
+
+def batch_request(w3, calls):
+    """
+    Send independent JSON-RPC calls as one HTTP batch.
+
+    ``calls`` is a list of ``(method, params)`` tuples. Returns the raw results
+    in the same order; an entry that failed is returned as an ``RPCError``
+    instance instead of raising, so callers can fall back per call.
+    """
+    if not calls:
+        return []
+
+    return _parse_batch_responses(w3.provider.make_batch_request(list(calls)), calls)
+
+
+async def async_batch_request(w3, calls):
+    """``batch_request`` for an AsyncWeb3 instance"""
+    if not calls:
+        return []
+
+    return _parse_batch_responses(await w3.provider.make_batch_request(list(calls)), calls)
+
+
+def _parse_batch_responses(responses, calls):
+    if not isinstance(responses, list):
+        # The provider rejected the whole batch with a single error object
+        raise RPCError(responses.get('error', responses))
+
+    results = []
+    for response in responses:
+        if response.get('error'):
+            results.append(RPCError(response['error']))
+        else:
+            results.append(response.get('result'))
+
+    if len(results) != len(calls):
+        raise RPCError(f'Expected {len(calls)} batch responses, got {len(results)}')
+    return results
+
+
+def to_int(value):
+    return int(value, 16) if isinstance(value, str) else int(value)
@@ -1,66 +1,95 @@
 import logging
 import json
-import os
-import solcx
 from web3 import Web3
 from django.conf import settings
+from django.core.cache import cache
 from datetime import datetime
 from django.utils import timezone
 
+from apps.contract.artifacts import artifact_store
+from apps.contract.chain import METADATA_METHODS, chain_metadata
+from apps.contract.clients import contract_cache, get_web3
+from apps.contract.encoding import get_encoder
+from apps.contract.gas import gas_estimates
+from apps.contract.health import provider_health
+from apps.contract.nonces import is_nonce_too_low, nonce_manager
+from apps.contract.reads import user_data_cache
+from apps.contract.rpc import RPCError, batch_request, to_int
+
 logger = logging.getLogger(__name__)
 
-# Instead of installing at import time, use a function
-def ensure_solc_installed():
-    try:
-        # Check if already installed
-        if '0.8.15' not in solcx.get_installed_solc_versions():
-            solcx.install_solc('0.8.15')
-        
-        # Set as the version to use
-        solcx.set_solc_version('0.8.15')
-        return True
-    except Exception as e:
-        logger.error(f"Failed to install solc: {str(e)}")
-        return False
+# 4-byte selector of updateUserData(string)
+UPDATE_USER_DATA_SELECTOR = Web3.keccak(text='updateUserData(string)')[:4].hex()
+
+def normalize_initial_users(owner_address, initial_users):
+    """Checksum and deduplicate a whitelist, keeping its order and making sure the owner is authorized first"""
+    initial_users = list(dict.fromkeys([
+        Web3.to_checksum_address(addr) 
+        for addr in initial_users 
+        if addr.startswith('0x') and len(addr) == 42
+    ]))
+    
+    owner_address = Web3.to_checksum_address(owner_address)
+    if owner_address in initial_users:
+        initial_users.remove(owner_address)
+    initial_users.insert(0, owner_address)
+    return owner_address, initial_users
+
+def authorize_chunk_size():
+    """Addresses per authorizeUsers/deauthorizeUsers transaction that keep its gas under AUTHORIZE_USERS_MAX_GAS"""
+    return max((settings.AUTHORIZE_USERS_MAX_GAS - settings.AUTHORIZE_USERS_BASE_GAS) // settings.AUTHORIZE_USERS_GAS_PER_USER, 1)
+
+def authorize_gas_limit(address_count):
+    return settings.AUTHORIZE_USERS_BASE_GAS + settings.AUTHORIZE_USERS_GAS_PER_USER * address_count
+
+def constructor_chunk_size():
+    """Whitelist addresses the constructor can authorize while the deployment stays under AUTHORIZE_USERS_MAX_GAS"""
+    return max((settings.AUTHORIZE_USERS_MAX_GAS - settings.DEPLOY_BASE_GAS) // settings.AUTHORIZE_USERS_GAS_PER_USER, 1)
+
+def deploy_gas_limit(address_count):
+    return settings.DEPLOY_BASE_GAS + settings.AUTHORIZE_USERS_GAS_PER_USER * address_count
+
+def split_whitelist(owner_address, initial_users):
+    """
+    Split a whitelist into the addresses passed to the constructor and the
+    authorizeUsers batches that follow the deployment. Returns
+    ``(owner_address, constructor_users, batches)``.
+    """
+    owner_address, initial_users = normalize_initial_users(owner_address, initial_users)
+    constructor_size = constructor_chunk_size()
+    remaining = initial_users[constructor_size:]
+    batch_size = authorize_chunk_size()
+    batches = [remaining[start:start + batch_size] for start in range(0, len(remaining), batch_size)]
+    return owner_address, initial_users[:constructor_size], batches
 
 class RegistryDeploymentService:
     def __init__(self, network='sepolia'):
         self.network = network
-        # Set up web3 provider
-        if network == 'sepolia':
-            self.w3 = Web3(Web3.HTTPProvider(settings.WEB3_PROVIDER_URL))
-        else:
-            # Default to local development network
-            self.w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+        # Shared per-network client; reuses keep-alive connections across requests
+        self.w3 = get_web3(network)
         
-        # Verify connection
-        if not self.w3.is_connected():
-            raise ConnectionError(f"Cannot connect to {network} network. Check your provider.")
+        # Fail fast on a provider known to be down instead of probing on every request
+        provider_health.check(network)
     
     def compile_contract(self):
-        """Compile the UserDataRegistry contract and return bytecode and ABI"""
-        # Ensure the compiler is installed
-        ensure_solc_installed()
-        
-        contract_path = os.path.join(settings.BASE_DIR, 'contracts', 'UserDataRegistry.sol')
-        with open(contract_path, 'r') as file:
-            contract_source = file.read()
-        
-        compiled_sol = solcx.compile_source(
-            contract_source,
-            output_values=['abi', 'bin'],
-            solc_version='0.8.15'
-        )
-        
-        # Extract contract data
-        contract_id, contract_interface = compiled_sol.popitem()
-        bytecode = contract_interface['bin']
-        abi = contract_interface['abi']
-        
-        return {'bin': bytecode,'abi': abi}
+        """Return bytecode and ABI for the UserDataRegistry contract, compiling only when the source changed"""
+        return artifact_store.get('UserDataRegistry')
+    
+    @property
+    def encoder(self):
+        """Local calldata encoder for the UserDataRegistry ABI"""
+        return get_encoder('UserDataRegistry')
     
     def deploy_registry(self, owner_address, private_key, initial_users):
-        """Deploy UserDataRegistry contract with initial authorized users list"""
+        """
+        Deploy UserDataRegistry contract with initial authorized users list.
+
+        Only as many users as fit the deployment gas budget go to the
+        constructor. Plan larger whitelists with DeploymentPlanner.plan first
+        and authorize the rest in batches once the deployment is mined. The transaction hash is returned as soon as
+        the transaction is sent; the caller records it as a PendingTransaction
+        so the receipt tracker settles it and its nonce is never taken for a gap.
+        """
         try:
             compiled_contract = self.compile_contract()
             
@@ -69,42 +98,32 @@ class RegistryDeploymentService:
                 bytecode=compiled_contract['bin'] 
             )
             
-            initial_users = list(set([
-                self.w3.to_checksum_address(addr) 
-                for addr in initial_users 
-                if addr.startswith('0x') and len(addr) == 42
-            ]))
-            
-            owner_address = self.w3.to_checksum_address(owner_address)
-            if owner_address not in initial_users:
-                initial_users.insert(0, owner_address)
-            
-            constructor_args = [initial_users]
+            owner_address, initial_users, _ = split_whitelist(owner_address, initial_users)
             
-            nonce = self.w3.eth.get_transaction_count(owner_address)
             gas_price = self.w3.eth.gas_price
             
-            gas_estimate = Contract.constructor(initial_users).estimateGas({'from': owner_address})
-            
-            transaction = {
-                'from': owner_address,
-                'gas': int(gas_estimate * 1.2),
-                'gasPrice': gas_price,
-                'nonce': nonce,
-            }
-            
-            tx_data = Contract.constructor(initial_users).build_transaction(transaction)
-            
-            signed_tx = self.w3.eth.account.sign_transaction(tx_data, private_key)
+            gas_estimate = Contract.constructor(initial_users).estimate_gas({'from': owner_address})
             
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            # Nonce comes from the local allocator so sends from one key can be pipelined
+            with nonce_manager.reserve(self.w3, self.network, owner_address) as nonce:
+                transaction = {
+                    'from': owner_address,
+                    'gas': int(gas_estimate * 1.2),
+                    'gasPrice': gas_price,
+                    'nonce': nonce,
+                }
+                
+                tx_data = Contract.constructor(initial_users).build_transaction(transaction)
+                
+                signed_tx = self.w3.eth.account.sign_transaction(tx_data, private_key)
+                
+                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
             
             return {
                 'success': True,
-                'contract_address': tx_receipt.contractAddress,
-                'transaction_hash': tx_hash.hex(),
+                'transaction_hash': tx_hash.to_0x_hex(),
+                'sender': owner_address,
+                'nonce': nonce
             }
         
         except ValueError as e:
@@ -117,53 +136,79 @@ class RegistryDeploymentService:
             # General error
             return {'success': False, 'error': f'Blockchain error: {str(e)}'}
     
+    def get_code_hash(self, contract_address):
+        """keccak256 of the runtime code at an address, cached since deployed code never changes"""
+        contract_address = self.w3.to_checksum_address(contract_address)
+        cache_key = f'contract-code-hash:{self.network}:{contract_address}'
+        code_hash = cache.get(cache_key)
+        if code_hash is None:
+            code = self.w3.eth.get_code(contract_address)
+            if not code:
+                return None
+            code_hash = Web3.keccak(code).hex()
+            cache.set(cache_key, code_hash, timeout=None)
+        return code_hash
+    
     def get_registry_contract(self, contract_address):
-        """Get a contract instance at the specified address"""
-        compiled_contract = self.compile_contract()
-        contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(contract_address),
-            abi=compiled_contract['abi']
+        """Get a contract instance at the specified address, reusing a cached one when possible"""
+        encoder = self.encoder
+        return contract_cache.get(
+            self.w3,
+            self.network,
+            self.w3.to_checksum_address(contract_address),
+            encoder.abi,
+            encoder.abi_hash
         )
-        return contract
     
-    def update_user_data(self, contract_address, user_address, private_key, image_reference):
-        """Update a user's data in the registry"""
+    def update_user_data(self, contract_address, user_address, private_key, image_reference, overwrite=None):
+        """
+        Update a user's data in the registry.
+
+        The transaction hash (and the code hash used for gas learning) is
+        returned as soon as the transaction is sent; the caller records it as a
+        PendingTransaction for the receipt tracker.
+        """
         try:
             # Get contract
             contract = self.get_registry_contract(contract_address)
             
-            # Build transaction
-            nonce = self.w3.eth.get_transaction_count(user_address)
+            user_address = Web3.to_checksum_address(user_address)
             gas_price = self.w3.eth.gas_price
             
-            # Estimate gas
-            gas_estimate = contract.functions.updateUserData(image_reference).estimateGas({
-                'from': user_address
-            }) * 12 // 10  # Add 20% buffer
-            
-            transaction = {
-                'from': user_address,
-                'gas': gas_estimate,
-                'gasPrice': gas_price,
-                'nonce': nonce,
-            }
-            
-            # Build transaction
-            tx_data = contract.functions.updateUserData(image_reference).build_transaction(transaction)
-            
-            # Sign transaction
-            signed_tx = self.w3.eth.account.sign_transaction(tx_data, private_key)
-            
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            
-            # Wait for transaction receipt
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            # Use a gas limit learned from earlier receipts when we have one
+            code_hash = self.get_code_hash(contract_address) if overwrite is not None else None
+            gas_estimate = None
+            if code_hash:
+                gas_estimate = gas_estimates.get(code_hash, UPDATE_USER_DATA_SELECTOR, image_reference, overwrite)
+            if gas_estimate is None:
+                gas_estimate = contract.functions.updateUserData(image_reference).estimate_gas({
+                    'from': user_address
+                }) * 12 // 10  # Add 20% buffer
+            
+            # Nonce comes from the local allocator so sends from one key can be pipelined
+            with nonce_manager.reserve(self.w3, self.network, user_address) as nonce:
+                transaction = {
+                    'from': user_address,
+                    'gas': gas_estimate,
+                    'gasPrice': gas_price,
+                    'nonce': nonce,
+                }
+                
+                # Build transaction
+                tx_data = contract.functions.updateUserData(image_reference).build_transaction(transaction)
+                
+                # Sign transaction
+                signed_tx = self.w3.eth.account.sign_transaction(tx_data, private_key)
+                
+                # Send transaction
+                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
             
             return {
                 'success': True,
-                'transaction_hash': tx_hash.hex(),
-                'gas_used': tx_receipt.gasUsed
+                'transaction_hash': tx_hash.to_0x_hex(),
+                'code_hash': code_hash,
+                'sender': user_address,
+                'nonce': nonce
             }
             
         except ValueError as e:
@@ -176,23 +221,149 @@ class RegistryDeploymentService:
             # General error
             return {'success': False, 'error': f'Blockchain error: {str(e)}'}
     
-    def get_user_data(self, contract_address, user_address):
-        """Get a user's data from the registry"""
+    def authorize_users(self, contract_address, admin_address, private_key, addresses, chunk_size=None):
+        """Authorize many addresses with batched authorizeUsers transactions; see send_address_batches"""
+        return self.send_address_batches('authorizeUsers', contract_address, admin_address, private_key, addresses, chunk_size)
+    
+    def deauthorize_users(self, contract_address, admin_address, private_key, addresses, chunk_size=None):
+        """Revoke many addresses with batched deauthorizeUsers transactions; see send_address_batches"""
+        return self.send_address_batches('deauthorizeUsers', contract_address, admin_address, private_key, addresses, chunk_size)
+    
+    def send_address_batches(self, function_name, contract_address, admin_address, private_key, addresses, chunk_size=None):
+        """
+        Call an admin function taking an address[] over many addresses, split
+        into chunks that fit the block gas limit.
+
+        Every chunk is signed up front with consecutive nonces and all of them
+        are sent in one JSON-RPC batch, so they can land in the same block. A
+        chunk rejected ahead of accepted ones is re-sent with its nonce.
+        Returns the sent transactions; receipts are left to the tracker.
+        """
+        try:
+            addresses = list(dict.fromkeys(Web3.to_checksum_address(address) for address in addresses))
+            chunk_size = chunk_size or authorize_chunk_size()
+            chunks = [addresses[start:start + chunk_size] for start in range(0, len(addresses), chunk_size)]
+        except ValueError as e:
+            return {'success': False, 'error': f'Invalid input: {str(e)}'}
+        return self.send_batches(function_name, contract_address, admin_address, private_key, chunks)
+    
+    def send_batches(self, function_name, contract_address, admin_address, private_key, chunks):
+        """send_address_batches for address lists that are already split, e.g. by a DeploymentPlan"""
+        try:
+            admin_address = Web3.to_checksum_address(admin_address)
+            contract_address = Web3.to_checksum_address(contract_address)
+            chunks = [list(chunk) for chunk in chunks if chunk]
+            if not chunks:
+                return {'success': True, 'transactions': [], 'errors': []}
+            
+            # Gas limits come from the per-address budget, so this is at most one batch for price and chain id
+            gas_price, _, chain_id = self._fetch_transaction_params(
+                {'from': admin_address, 'to': contract_address},
+                default_gas=authorize_gas_limit(len(chunks[0])),
+                gas_limit=authorize_gas_limit(len(chunks[0]))
+            )
+            
+            signed = []
+            for chunk in chunks:
+                nonce = nonce_manager.allocate(self.w3, self.network, admin_address)
+                try:
+                    signed_tx = self.w3.eth.account.sign_transaction({
+                        'to': contract_address,
+                        'value': 0,
+                        'data': self.encoder.encode_function(function_name, [chunk]),
+                        'gas': authorize_gas_limit(len(chunk)),
+                        'gasPrice': gas_price,
+                        'nonce': nonce,
+                        'chainId': chain_id,
+                    }, private_key)
+                except Exception:
+                    nonce_manager.release(self.network, admin_address, nonce)
+                    for _, sent_nonce, _ in signed:
+                        nonce_manager.release(self.network, admin_address, sent_nonce)
+                    raise
+                signed.append((signed_tx, nonce, chunk))
+            
+            results = batch_request(self.w3, [
+                ('eth_sendRawTransaction', [signed_tx.raw_transaction.to_0x_hex()]) for signed_tx, _, _ in signed
+            ])
+            results = self._fill_nonce_gaps(signed, results)
+            
+            transactions = []
+            errors = []
+            for (signed_tx, nonce, chunk), result in zip(signed, results):
+                if isinstance(result, Exception):
+                    # Anything but an RPCError is an ambiguous re-send, whose nonce stays reserved
+                    if isinstance(result, RPCError) and is_nonce_too_low(result):
+                        nonce_manager.resync(self.w3, self.network, admin_address)
+                    elif isinstance(result, RPCError):
+                        nonce_manager.release(self.network, admin_address, nonce)
+                    errors.append({'addresses': chunk, 'error': str(result)})
+                    continue
+                transactions.append({
+                    'transaction_hash': signed_tx.hash.to_0x_hex(),
+                    'sender': admin_address,
+                    'nonce': nonce,
+                    'addresses': chunk,
+                })
+            
+            return {'success': bool(transactions), 'transactions': transactions, 'errors': errors}
+            
+        except ValueError as e:
+            return {'success': False, 'error': f'Invalid input: {str(e)}'}
+        except Exception as e:
+            # General error
+            return {'success': False, 'error': f'Blockchain error: {str(e)}'}
+    
+    def _fill_nonce_gaps(self, signed, results):
+        """
+        A chunk rejected below an accepted one leaves a nonce gap that holds the
+        later chunks in the node's queue, so it is re-sent once with the same
+        nonce. If it is rejected again its nonce is released and the next
+        transaction from the account fills the gap.
+        """
+        accepted = [index for index, result in enumerate(results) if not isinstance(result, RPCError)]
+        gaps = [
+            index for index, result in enumerate(results)
+            if isinstance(result, RPCError) and not is_nonce_too_low(result) and accepted and index < accepted[-1]
+        ]
+        if not gaps:
+            return results
+        
+        results = list(results)
+        try:
+            retried = batch_request(self.w3, [
+                ('eth_sendRawTransaction', [signed[index][0].raw_transaction.to_0x_hex()]) for index in gaps
+            ])
+        except Exception as e:
+            # The re-send may have reached the node, so these nonces stay reserved
+            logger.warning(f"Re-sending {len(gaps)} rejected chunk(s) failed: {str(e)}")
+            for index in gaps:
+                results[index] = e
+            return results
+        for index, result in zip(gaps, retried):
+            if isinstance(result, RPCError):
+                logger.warning(f"Chunk with nonce {signed[index][1]} rejected twice; later chunks wait for its nonce to be reused")
+            results[index] = result
+        return results
+    
+    def get_user_data(self, contract_address, user_address, use_cache=True):
+        """Get a user's data from the registry, through the user data cache unless use_cache is False"""
         try:
+            if use_cache:
+                cached = user_data_cache.get(self.network, contract_address, user_address)
+                if cached is not None:
+                    return cached
+            
             # Get contract
             contract = self.get_registry_contract(contract_address)
             
             # Call function
-            result = contract.functions.getUserData(user_address).call()
+            result = contract.functions.getUserData(Web3.to_checksum_address(user_address)).call()
             
             # Parse result
-            return {
-                'success': True,
-                'image_reference': result[0],
-                'timestamp': result[1],
-                'exists': result[2],
-                'timestamp_readable': datetime.fromtimestamp(result[1]).strftime('%Y-%m-%d %H:%M:%S') if result[1] > 0 else None
-            }
+            user_data = {'success': True, **self._format_user_data(*result)}
+            user_data_cache.set(self.network, contract_address, user_address, user_data)
+            return user_data
             
         except ValueError as e:
             # More specific error handling for contract-related errors
@@ -204,99 +375,150 @@ class RegistryDeploymentService:
             # General error
             return {'success': False, 'error': f'Blockchain error: {str(e)}'}
     
-    def prepare_registry_deployment(self, owner_address, initial_users):
-        """Prepare data for deploying registry contract via MetaMask"""
+    def get_users_data(self, contract_address, user_addresses, chunk_size=None):
+        """Get many users' data from the registry with chunked getUsersData calls"""
         try:
-            compiled_contract = self.compile_contract()
+            contract = self.get_registry_contract(contract_address)
+            chunk_size = chunk_size or settings.REGISTRY_READ_CHUNK_SIZE
             
-            # Create contract instance
-            Contract = self.w3.eth.contract(
-                abi=compiled_contract['abi'],
-                bytecode=compiled_contract['bin']
-            )
+            # Deduplicate while keeping the caller's order
+            addresses = list(dict.fromkeys(
+                self.w3.to_checksum_address(addr) for addr in user_addresses
+            ))
             
-            # Process initial users list with proper checksum
-            initial_users = list(set([
-                self.w3.to_checksum_address(addr) 
-                for addr in initial_users 
-                if addr.startswith('0x') and len(addr) == 42
-            ]))
+            users = {}
+            for start in range(0, len(addresses), chunk_size):
+                chunk = addresses[start:start + chunk_size]
+                image_references, timestamps, data_exists = contract.functions.getUsersData(chunk).call()
+                for address, image_reference, timestamp, exists in zip(chunk, image_references, timestamps, data_exists):
+                    users[address] = self._format_user_data(image_reference, timestamp, exists)
             
-            # Ensure owner is included in authorized users
-            owner_address = self.w3.to_checksum_address(owner_address)
-            if owner_address not in initial_users:
-                initial_users.insert(0, owner_address)
+            return {'success': True, 'users': users}
             
-            # Get gas price
-            gas_price = self.w3.eth.gas_price
+        except ValueError as e:
+            # More specific error handling for contract-related errors
+            if "execution reverted" in str(e):
+                return {'success': False, 'error': 'Contract execution reverted. You may not be authorized.'}
+            else:
+                return {'success': False, 'error': f'Invalid input: {str(e)}'}
+        except Exception as e:
+            # General error
+            return {'success': False, 'error': f'Blockchain error: {str(e)}'}
+    
+    @staticmethod
+    def _format_user_data(image_reference, timestamp, exists):
+        return {
+            'image_reference': image_reference,
+            'timestamp': timestamp,
+            'exists': exists,
+            'timestamp_readable': datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp > 0 else None
+        }
+    
+    def prepare_registry_deployment(self, owner_address, initial_users):
+        """
+        Prepare data for deploying registry contract via MetaMask.
+        
+        The constructor only gets the first chunk of the whitelist that fits
+        the deployment gas budget; the remaining addresses are returned as
+        ``batches`` to be authorized once the contract is deployed.
+        """
+        try:
+            # Checksum and deduplicate the whitelist, making sure the owner is included
+            owner_address, initial_users, batches = split_whitelist(owner_address, initial_users)
             
-            # Estimate gas
-            try:
-                gas_estimate = Contract.constructor(initial_users).estimateGas({'from': owner_address})
-                gas_limit = int(gas_estimate * 1.2)  # Add 20% buffer
-            except Exception as e:
-                # Fallback to a reasonable default if estimation fails
-                gas_limit = 5000000
+            # Encode the deployment data locally; no provider call needed
+            data = self.encoder.encode_constructor([initial_users])
             
-            # Build dummy transaction to get data field
-            dummy_tx = Contract.constructor(initial_users).build_transaction({
-                'from': owner_address,
-                'gas': 0,  # MetaMask will estimate
-                'gasPrice': 0,  # MetaMask will set this
-                'nonce': 0  # MetaMask will set this
-            })
+            # Gas estimate plus any uncached gas price / chain id in one batched round trip
+            # (falls back to the per-address budget if estimation fails)
+            gas_price, gas_limit, chain_id = self._fetch_transaction_params(
+                {'from': owner_address, 'data': data},
+                default_gas=deploy_gas_limit(len(initial_users))
+            )
                 
             # Build transaction data for MetaMask
             transaction_data = {
                 'from': owner_address,
                 'gas': hex(gas_limit),  # MetaMask requires hex values
                 'gasPrice': hex(gas_price),
-                'data': dummy_tx['data'],
-                'chainId': hex(self.w3.eth.chain_id)  # Add chain ID
+                'data': data,
+                'chainId': hex(chain_id)  # Add chain ID
             }
             
             return {
                 'success': True,
-                'transaction_data': transaction_data
+                'transaction_data': transaction_data,
+                'constructor_users': initial_users,
+                'batches': batches
             }
         
         except Exception as e:
-            import traceback
-            print(traceback.format_exc())  # Add detailed logging
+            logger.exception(f"Failed to prepare deployment: {str(e)}")
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def prepare_update_user_data(self, contract_address, wallet_address, image_reference):
-        """Prepare data for updating user data via MetaMask"""
+    def prepare_authorize_users(self, contract_address, admin_address, addresses):
+        """Prepare one authorizeUsers transaction for MetaMask, with gas from the per-address budget"""
         try:
-            # Get contract instance
-            contract = self.get_registry_contract(contract_address)
-            wallet_address = self.w3.to_checksum_address(wallet_address)
+            admin_address = Web3.to_checksum_address(admin_address)
+            contract_address = Web3.to_checksum_address(contract_address)
+            addresses = [Web3.to_checksum_address(address) for address in addresses]
+            gas_limit = authorize_gas_limit(len(addresses))
+            
+            gas_price, gas_limit, chain_id = self._fetch_transaction_params(
+                {'from': admin_address, 'to': contract_address},
+                default_gas=gas_limit,
+                gas_limit=gas_limit
+            )
             
-            # Get gas price
-            gas_price = self.w3.eth.gas_price
+            return {
+                'success': True,
+                'transaction_data': {
+                    'from': admin_address,
+                    'to': contract_address,
+                    'gas': hex(gas_limit),
+                    'gasPrice': hex(gas_price),
+                    'data': self.encoder.encode_function('authorizeUsers', [addresses]),
+                    'chainId': hex(chain_id)
+                }
+            }
+        
+        except Exception as e:
+            logger.exception(f"Failed to prepare authorizeUsers: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def prepare_update_user_data(self, contract_address, wallet_address, image_reference, overwrite=None):
+        """
+        Prepare data for updating user data via MetaMask.
+        
+        Pass overwrite=True/False when the caller knows whether the user already
+        has data stored; a gas limit learned from earlier receipts is then used
+        instead of calling eth_estimateGas.
+        """
+        try:
+            wallet_address = self.w3.to_checksum_address(wallet_address)
             
-            # Estimate gas
-            try:
-                # Create function call object
-                function_call = contract.functions.updateUserData(image_reference)
-                
-                # Estimate gas
-                gas_estimate = function_call.estimateGas({'from': wallet_address})
-                gas_limit = int(gas_estimate * 1.2)  # Add 20% buffer
-            except Exception as e:
-                # Fallback to a reasonable default if estimation fails
-                gas_limit = 200000  # More conservative default for a simple update
-            
-            # Build dummy transaction to get data field
-            dummy_tx = contract.functions.updateUserData(image_reference).build_transaction({
-                'from': wallet_address,
-                'gas': 0,  # MetaMask will estimate
-                'gasPrice': 0,  # MetaMask will set this
-                'nonce': 0  # MetaMask will set this
-            })
+            # Encode the call data locally; no contract object or provider call needed
+            data = self.encoder.encode_function('updateUserData', [image_reference])
+            
+            learned_gas = None
+            if overwrite is not None:
+                code_hash = self.get_code_hash(contract_address)
+                if code_hash:
+                    learned_gas = gas_estimates.get(code_hash, UPDATE_USER_DATA_SELECTOR, image_reference, overwrite)
+            
+            # Gas estimate plus any uncached gas price / chain id in one batched round trip
+            # (more conservative default for a simple update if estimation fails)
+            gas_price, gas_limit, chain_id = self._fetch_transaction_params(
+                {'from': wallet_address, 'to': self.w3.to_checksum_address(contract_address), 'data': data},
+                default_gas=200000,
+                gas_limit=learned_gas
+            )
                 
             # Build transaction data for MetaMask
             transaction_data = {
@@ -304,8 +526,8 @@ class RegistryDeploymentService:
                 'to': contract_address,  # Important: include the "to" address
                 'gas': hex(gas_limit),  # MetaMask requires hex values
                 'gasPrice': hex(gas_price),
-                'data': dummy_tx['data'],
-                'chainId': hex(self.w3.eth.chain_id)  # Add chain ID
+                'data': data,
+                'chainId': hex(chain_id)  # Add chain ID
             }
             
             return {
@@ -319,4 +541,39 @@ class RegistryDeploymentService:
             return {
                 'success': False,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+    
+    def _fetch_transaction_params(self, transaction, default_gas, gas_limit=None):
+        """
+        Return gas price, a buffered gas limit and chain id, batching whatever
+        is not cached into one JSON-RPC request. A known gas_limit skips
+        eth_estimateGas entirely.
+        """
+        params = {
+            'gas_price': chain_metadata.get(self.network, 'gas_price'),
+            'chain_id': chain_metadata.get(self.network, 'chain_id'),
+        }
+        missing = [name for name, value in params.items() if value is None]
+        
+        calls = [(METADATA_METHODS[name], []) for name in missing]
+        if gas_limit is None:
+            calls.append(('eth_estimateGas', [transaction]))
+        results = batch_request(self.w3, calls)
+        
+        for name, result in zip(missing, results):
+            if isinstance(result, RPCError):
+                raise result
+            params[name] = to_int(result)
+            chain_metadata.set(self.network, name, params[name])
+        
+        if gas_limit is not None:
+            return params['gas_price'], gas_limit, params['chain_id']
+        
+        gas_estimate = results[-1]
+        if isinstance(gas_estimate, RPCError):
+            logger.info(f"Gas estimation failed, using default of {default_gas}: {gas_estimate}")
+            gas_limit = default_gas
+        else:
+            gas_limit = int(to_int(gas_estimate) * 1.2)  # Add 20% buffer
+        
+        return params['gas_price'], gas_limit, params['chain_id']
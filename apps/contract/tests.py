@@ -1,3 +1,1466 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.db.models import Exists, OuterRef
+from django.urls import reverse
+from django.utils import timezone
+from eth_abi import decode, encode
+from eth_account import Account
+from web3 import EthereumTesterProvider, Web3
+from web3.exceptions import RequestTimedOut, TransactionNotFound
+
+from apps.contract.artifacts import (
+    ArtifactStore, SOLC_VERSION, artifact_store, compile_source_file, hash_source, source_paths, stale_artifacts
+)
+from apps.contract.backfill import EventBackfill, is_range_too_large, is_rate_limited
+from apps.contract.async_services import AsyncRegistryDeploymentService
+from apps.contract.clients import AsyncWeb3ClientRegistry
+from apps.contract.dashboard import DashboardService
+from apps.contract.deployment import DeploymentPlanner
+from apps.contract.encoding import CalldataEncoder
+from apps.contract.gas import gas_estimates
+from apps.contract.health import HealthMonitor, ProviderHealth, ProviderUnavailable
+from apps.contract.indexer import EventIndexer
+from apps.contract.memberships import materialize_memberships
+from apps.contract.models import BackfillSegment, DeploymentPlan, IndexerCheckpoint, NonceCursor, PendingTransaction, RegistryEvent, UserDataRegistry, RegistryUser
+from apps.contract.multicall import AGGREGATE3_SELECTOR, aggregate3, decode_aggregate3, encode_aggregate3
+from apps.contract.nonces import NonceManager
+from apps.contract.reads import UserDataCache
+from apps.contract.rpc import RPCError
+from apps.contract.services import (
+    UPDATE_USER_DATA_SELECTOR, RegistryDeploymentService, authorize_chunk_size, constructor_chunk_size, split_whitelist
+)
+from apps.contract.tracker import ReceiptTracker
+from apps.user.models import User
+
+# Just the getUserData entry of the UserDataRegistry ABI, so these tests need no compiled artifact
+GET_USER_DATA_ABI = [{
+    'type': 'function',
+    'name': 'getUserData',
+    'stateMutability': 'view',
+    'inputs': [{'name': '_user', 'type': 'address'}],
+    'outputs': [
+        {'name': 'imageReference', 'type': 'string'},
+        {'name': 'timestamp', 'type': 'uint256'},
+        {'name': 'exists', 'type': 'bool'},
+    ],
+}]
+
+# The UserDataRegistry interface, for tests that compare against web3 or decode logs without an artifact
+REGISTRY_ABI = [
+    {'type': 'constructor', 'inputs': [{'name': '_authorizedUsers', 'type': 'address[]'}], 'stateMutability': 'nonpayable'},
+    {'type': 'function', 'name': 'updateUserData', 'inputs': [{'name': '_imageReference', 'type': 'string'}], 'outputs': [], 'stateMutability': 'nonpayable'},
+    {'type': 'function', 'name': 'getUserData', 'inputs': [{'name': '_user', 'type': 'address'}], 'outputs': [{'name': 'imageReference', 'type': 'string'}, {'name': 'timestamp', 'type': 'uint256'}, {'name': 'exists', 'type': 'bool'}], 'stateMutability': 'view'},
+    {'type': 'function', 'name': 'isAuthorized', 'inputs': [{'name': '_user', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'bool'}], 'stateMutability': 'view'},
+    {'type': 'function', 'name': 'authorizeUser', 'inputs': [{'name': '_user', 'type': 'address'}], 'outputs': [], 'stateMutability': 'nonpayable'},
+    {'type': 'function', 'name': 'deauthorizeUser', 'inputs': [{'name': '_user', 'type': 'address'}], 'outputs': [], 'stateMutability': 'nonpayable'},
+    {'type': 'function', 'name': 'getUsersData', 'inputs': [{'name': '_users', 'type': 'address[]'}], 'outputs': [{'name': 'imageReferences', 'type': 'string[]'}, {'name': 'timestamps', 'type': 'uint256[]'}, {'name': 'dataExists', 'type': 'bool[]'}], 'stateMutability': 'view'},
+    {'type': 'event', 'name': 'UserDataUpdated', 'anonymous': False, 'inputs': [{'name': 'user', 'type': 'address', 'indexed': True}, {'name': 'imageReference', 'type': 'string', 'indexed': False}, {'name': 'timestamp', 'type': 'uint256', 'indexed': False}]},
+    {'type': 'event', 'name': 'UserAuthorized', 'anonymous': False, 'inputs': [{'name': 'user', 'type': 'address', 'indexed': True}]},
+    {'type': 'event', 'name': 'UserDeauthorized', 'anonymous': False, 'inputs': [{'name': 'user', 'type': 'address', 'indexed': True}]},
+    {'type': 'function', 'name': 'authorizeUsers', 'stateMutability': 'nonpayable', 'inputs': [{'name': '_users', 'type': 'address[]'}], 'outputs': []},
+    {'type': 'function', 'name': 'deauthorizeUsers', 'stateMutability': 'nonpayable', 'inputs': [{'name': '_users', 'type': 'address[]'}], 'outputs': []},
+]
+
+MULTICALL_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
+
+class RegistryLogMixin:
+    """Builds raw registry logs, as eth_getLogs and receipts return them, decoded with REGISTRY_ABI"""
+    def patch_encoder(self):
+        self.encoder = CalldataEncoder(REGISTRY_ABI)
+        patcher = mock.patch('apps.contract.indexer.get_encoder', return_value=self.encoder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def log(self, address, event, wallet, block, log_index=0, tx_hash=None, image_reference='', timestamp=1700000000):
+        data = '0x'
+        if event == RegistryEvent.EVENT_USER_DATA_UPDATED:
+            data = '0x' + encode(['string', 'uint256'], [image_reference, timestamp]).hex()
+        return {
+            'address': address,
+            'topics': [self.encoder.event_topic(event), '0x' + '00' * 12 + wallet.lower()[2:]],
+            'data': data,
+            'blockNumber': hex(block),
+            'transactionHash': tx_hash or '0x' + f'{block:02x}{log_index:02x}'.rjust(64, '0'),
+            'logIndex': hex(log_index),
+        }
+
+
+class FakeMulticallEth:
+    """Answers aggregate3 eth_calls from a {(target, calldata): return_data} map"""
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def call(self, transaction):
+        data = bytes.fromhex(transaction['data'][2:])
+        assert data[:4] == AGGREGATE3_SELECTOR
+        (calls,) = decode(['(address,bool,bytes)[]'], data[4:])
+        self.calls.append(calls)
+
+        results = []
+        for target, _, calldata in calls:
+            return_data = self.responses.get((target.lower(), calldata))
+            results.append((return_data is not None, return_data or b''))
+        return encode(['(bool,bytes)[]'], [results])
+
+
+class CalldataEncoderTests(SimpleTestCase):
+    """Local encoding must match web3's contract encoder byte for byte"""
+    def setUp(self):
+        self.encoder = CalldataEncoder(REGISTRY_ABI, '0x6080604052')
+        w3 = Web3()
+        self.contract = w3.eth.contract(address='0x' + '11' * 20, abi=REGISTRY_ABI)
+        self.factory = w3.eth.contract(abi=REGISTRY_ABI, bytecode='0x6080604052')
+        self.addresses = [Web3.to_checksum_address(f'0x{i:040x}') for i in range(1, 40)]
+
+    def test_update_user_data_matches_web3(self):
+        for image_reference in ['', 'ipfs://image', 'ipfs://' + 'x' * 100, 'ünïcödé ✓']:
+            self.assertEqual(
+                self.encoder.encode_function('updateUserData', [image_reference]),
+                self.contract.encode_abi('updateUserData', args=[image_reference])
+            )
+
+    def test_address_functions_match_web3(self):
+        for name, args in [
+            ('getUserData', [self.addresses[0]]),
+            ('isAuthorized', [self.addresses[1]]),
+            ('authorizeUsers', [self.addresses]),
+            ('deauthorizeUsers', [self.addresses[:1]]),
+            ('getUsersData', [[]]),
+        ]:
+            self.assertEqual(self.encoder.encode_function(name, args), self.contract.encode_abi(name, args=args), name)
+
+    def test_constructor_matches_web3(self):
+        for whitelist in [[], self.addresses[:1], self.addresses]:
+            self.assertEqual(self.encoder.encode_constructor([whitelist]), self.factory._encode_constructor_data(whitelist))
+
+    def test_selector(self):
+        self.assertEqual(self.encoder.selector('updateUserData', 1), '0x' + UPDATE_USER_DATA_SELECTOR.removeprefix('0x'))
+
+    def test_decode_function_result(self):
+        data = encode(['string', 'uint256', 'bool'], ['ipfs://image', 1700000000, True])
+        self.assertEqual(self.encoder.decode_function_result('getUserData', 1, data), ('ipfs://image', 1700000000, True))
+
+    def test_decode_log(self):
+        log = {
+            'topics': [self.encoder.event_topic('UserDataUpdated'), '0x' + '00' * 12 + 'ab' * 20],
+            'data': '0x' + encode(['string', 'uint256'], ['ipfs://image', 1700000000]).hex(),
+        }
+        self.assertEqual(self.encoder.decode_log(log), ('UserDataUpdated', {
+            'user': '0x' + 'ab' * 20, 'imageReference': 'ipfs://image', 'timestamp': 1700000000,
+        }))
+        self.assertIsNone(self.encoder.decode_log({'topics': ['0x' + '00' * 32], 'data': '0x'}))
+
+
+@override_settings(CONTRACT_RUNTIME_COMPILE=False)
+class ArtifactVerifyTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.store = ArtifactStore(precompiled_dir=self.directory.name)
+        for path in source_paths():
+            with open(path, 'rb') as file:
+                source_hash = hash_source(file.read())
+            self.write(os.path.splitext(os.path.basename(path))[0], source_hash)
+
+    def write(self, contract_name, source_hash):
+        with open(os.path.join(self.directory.name, f'{contract_name}.json'), 'w') as file:
+            json.dump({'contractName': contract_name, 'sourceHash': source_hash, 'compilerVersion': SOLC_VERSION, 'abi': [], 'bin': ''}, file)
+
+    def test_up_to_date_artifacts_pass(self):
+        self.store.verify()
+
+    def test_missing_artifact_refuses_to_start(self):
+        os.remove(os.path.join(self.directory.name, 'Multicall3.json'))
+        with self.assertRaisesRegex(ImproperlyConfigured, r'Multicall3: missing[\s\S]*compile_contracts'):
+            self.store.verify()
+
+    def test_stale_artifact_refuses_to_start(self):
+        self.write('UserDataRegistry', 'old-source')
+        with self.assertRaisesRegex(ImproperlyConfigured, 'UserDataRegistry: source changed'):
+            self.store.verify()
+
+    @override_settings(CONTRACT_RUNTIME_COMPILE=True)
+    def test_runtime_compile_skips_check(self):
+        os.remove(os.path.join(self.directory.name, 'Multicall3.json'))
+        self.store.verify()
+
+
+@override_settings(CONTRACT_RUNTIME_COMPILE=False)
+class ShippedArtifactTests(SimpleTestCase):
+    """The artifacts committed under CONTRACT_PRECOMPILED_DIR must serve every contract without solc"""
+    def setUp(self):
+        if not os.path.isdir(settings.CONTRACT_PRECOMPILED_DIR):
+            self.skipTest(f"{settings.CONTRACT_PRECOMPILED_DIR} has not been built; run 'manage.py compile_contracts'")
+
+    def test_shipped_artifacts_are_up_to_date(self):
+        self.assertEqual(stale_artifacts(settings.CONTRACT_PRECOMPILED_DIR), [])
+
+    def test_shipped_artifacts_load_without_compiling(self):
+        store = ArtifactStore()
+        store.verify()
+        with mock.patch('apps.contract.artifacts.compile_source_file', side_effect=AssertionError('solc was invoked')):
+            for path in source_paths():
+                artifact = store.get(os.path.splitext(os.path.basename(path))[0])
+                self.assertTrue(artifact['abi'])
+                self.assertTrue(artifact['bin'])
+
+
+@override_settings(
+    WEB3_HEALTH_BACKGROUND=False, WEB3_HEALTH_TTL=30, WEB3_HEALTH_FAILURE_THRESHOLD=3, WEB3_HEALTH_OPEN_SECONDS=30
+)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        clock = mock.patch('apps.contract.health.time.monotonic', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.monitor = HealthMonitor()
+        # Probes only happen when the test asks for them
+        self.monitor.probe = mock.Mock(side_effect=lambda network: self.monitor.record_failure(network, ConnectionError('down')))
+
+    def open_circuit(self):
+        for _ in range(3):
+            self.monitor.record_failure('local', ConnectionError('down'))
+        self.assertEqual(self.monitor.get_state('local').state, ProviderHealth.OPEN)
+
+    def test_failures_below_threshold_keep_circuit_closed(self):
+        self.monitor.record_failure('local', ConnectionError('down'))
+        self.monitor.record_failure('local', ConnectionError('down'))
+        self.assertEqual(self.monitor.check('local').state, ProviderHealth.CLOSED)
+        self.monitor.probe.assert_not_called()
+
+    def test_open_circuit_fails_fast(self):
+        self.open_circuit()
+        self.now += 10
+        with self.assertRaises(ProviderUnavailable):
+            self.monitor.check('local')
+        self.monitor.probe.assert_not_called()
+
+    def test_failed_probe_while_open_restarts_cool_down(self):
+        self.open_circuit()
+        self.now += 25
+        self.monitor.record_failure('local', ConnectionError('still down'))
+        self.now += 25
+        # 50s after opening, but only 25s after the last failed probe
+        with self.assertRaises(ProviderUnavailable):
+            self.monitor.check('local')
+        self.assertEqual(self.monitor.get_state('local').state, ProviderHealth.OPEN)
+
+    def test_half_open_failure_reopens(self):
+        self.open_circuit()
+        self.now += 31
+        # The inline probe fails while half open
+        with self.assertRaises(ProviderUnavailable):
+            self.monitor.check('local')
+        self.assertEqual(self.monitor.probe.call_count, 1)
+        self.assertEqual(self.monitor.get_state('local').state, ProviderHealth.OPEN)
+
+    def test_failure_details_do_not_leak_the_provider_url(self):
+        url = 'https://mainnet.infura.io/v3/secret-key'
+        with override_settings(WEB3_PROVIDER_URLS={'local': url}), self.assertLogs('apps.contract.health') as logs:
+            for _ in range(3):
+                self.monitor.record_failure('local', requests.HTTPError(f'401 Client Error for url: {url}'))
+            with self.assertRaises(ProviderUnavailable) as raised:
+                self.monitor.check('local')
+
+        self.assertEqual(self.monitor.snapshot()['local']['last_error'], 'HTTPError')
+        self.assertNotIn('secret-key', str(raised.exception))
+        self.assertNotIn('secret-key', '\n'.join(logs.output))
+
+    def test_half_open_success_closes(self):
+        self.open_circuit()
+        self.now += 31
+        self.monitor.probe.side_effect = lambda network: self.monitor.record_success(network, 5, 100)
+        health = self.monitor.check('local')
+        self.assertEqual(health.state, ProviderHealth.CLOSED)
+        self.assertEqual(health.consecutive_failures, 0)
+        self.assertEqual(health.block_number, 100)
+
+
+@override_settings(GAS_ESTIMATE_BUFFER=1.1)
+class UpdateGasLearningTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='member@example.com', wallet_address='0x' + 'ab' * 20)
+        self.registry = UserDataRegistry.objects.create(
+            name='Registry', admin=self.user, network='local', address='0x' + '11' * 20, deployed=True
+        )
+
+    def test_metamask_update_learns_gas_from_receipt(self):
+        # ConfirmUpdateUserDataView records no code hash; the tracker looks it up
+        pending_tx = PendingTransaction.objects.create(
+            registry=self.registry,
+            network='local',
+            kind=PendingTransaction.KIND_UPDATE_USER_DATA,
+            transaction_hash='0x' + '01' * 32,
+            payload={'wallet_address': self.user.wallet_address, 'image_reference': 'ipfs://image', 'overwrite': False},
+        )
+        receipt = {'blockNumber': '0x10', 'gasUsed': hex(50000), 'status': '0x1', 'logs': []}
+
+        outer_blocks = len(connection.atomic_blocks)
+        lookup_blocks = []
+
+        def get_code_hash(address):
+            lookup_blocks.append(len(connection.atomic_blocks))
+            return '0xcode'
+
+        with mock.patch('apps.contract.tracker.RegistryDeploymentService') as service:
+            service.return_value.get_code_hash.side_effect = get_code_hash
+            self.assertTrue(ReceiptTracker().settle(pending_tx, receipt))
+
+        service.return_value.get_code_hash.assert_called_once_with(self.registry.address)
+        # The RPC ran before settle() opened its transaction
+        self.assertEqual(lookup_blocks, [outer_blocks])
+        self.assertEqual(gas_estimates.get('0xcode', UPDATE_USER_DATA_SELECTOR, 'ipfs://image', False), 55000)
+
+    def test_transaction_settled_elsewhere_is_not_applied_again(self):
+        pending_tx = PendingTransaction.objects.create(
+            registry=self.registry,
+            network='local',
+            kind=PendingTransaction.KIND_UPDATE_USER_DATA,
+            transaction_hash='0x' + '02' * 32,
+            payload={'wallet_address': self.user.wallet_address, 'image_reference': 'ipfs://image', 'overwrite': False, 'code_hash': '0xcode'},
+        )
+        # Another tracker process settled it after this one fetched the receipt
+        PendingTransaction.objects.filter(pk=pending_tx.pk).update(status=PendingTransaction.STATUS_CONFIRMED)
+        receipt = {'blockNumber': '0x10', 'gasUsed': hex(50000), 'status': '0x1', 'logs': []}
+
+        with mock.patch('apps.contract.tracker.event_indexer') as indexer:
+            self.assertFalse(ReceiptTracker().settle(pending_tx, receipt))
+
+        indexer.ingest_logs.assert_not_called()
+        self.assertIsNone(gas_estimates.get('0xcode', UPDATE_USER_DATA_SELECTOR, 'ipfs://image', False))
+
+
+class ProviderHealthViewTests(TestCase):
+    def setUp(self):
+        self.monitor = HealthMonitor()
+        self.monitor.record_success('local', 5, 100)
+        patcher = mock.patch('apps.contract.views.provider_health', self.monitor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cache_stats_are_only_shown_to_staff(self):
+        data = self.client.get(reverse('provider_health')).json()
+        self.assertTrue(data['healthy'])
+        self.assertEqual(data['networks']['local']['block_number'], 100)
+        self.assertNotIn('contract_cache', data)
+        self.assertNotIn('user_data_cache', data)
+
+        staff = User.objects.create(email='staff@example.com', wallet_address='0x' + 'cd' * 20, is_staff=True)
+        self.client.force_login(staff)
+        data = self.client.get(reverse('provider_health')).json()
+        self.assertIn('contract_cache', data)
+        self.assertIn('user_data_cache', data)
+
+
+@override_settings(WEB3_HEALTH_BACKGROUND=False, WEB3_HEALTH_TTL=30)
+class AsyncHealthTests(SimpleTestCase):
+    def setUp(self):
+        self.monitor = HealthMonitor()
+        self.probe_loops = []
+
+        def probe(network):
+            try:
+                asyncio.get_running_loop()
+                self.probe_loops.append('event loop')
+            except RuntimeError:
+                self.probe_loops.append('worker thread')
+            self.monitor.record_success(network, 1, 10)
+        self.monitor.probe = mock.Mock(side_effect=probe)
+
+    def test_inline_probe_runs_off_the_event_loop(self):
+        health = async_to_sync(self.monitor.acheck)('local')
+        self.assertEqual(self.probe_loops, ['worker thread'])
+        self.assertEqual(health.state, ProviderHealth.CLOSED)
+
+    def test_fresh_state_is_not_probed(self):
+        self.monitor.record_success('local', 1, 10)
+        async_to_sync(self.monitor.acheck)('local')
+        self.monitor.probe.assert_not_called()
+
+    def test_service_is_not_built_while_circuit_is_open(self):
+        for _ in range(settings.WEB3_HEALTH_FAILURE_THRESHOLD):
+            self.monitor.record_failure('local', ConnectionError('down'))
+        with mock.patch('apps.contract.async_services.provider_health', self.monitor):
+            with self.assertRaises(ProviderUnavailable):
+                async_to_sync(AsyncRegistryDeploymentService.create)('local')
+
+
+class AsyncClientTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='member@example.com', username='member', wallet_address='0x' + 'ab' * 20)
+        self.registry = UserDataRegistry.objects.create(name='Registry', admin=self.user, network='local')
+        self.url = reverse('async_prepare_update_data', args=[self.registry.pk])
+
+    def test_sessions_are_shared_per_loop_and_closed(self):
+        registry = AsyncWeb3ClientRegistry()
+
+        async def use():
+            client = registry.get('local')
+            self.assertIs(registry.get('local'), client)
+            session = client.provider._request_session_manager.session
+            await registry.aclose()
+            return session
+        self.assertTrue(async_to_sync(use)().closed)
+
+    def test_wsgi_request_closes_its_loop_sessions(self):
+        self.client.force_login(self.user)
+        with mock.patch('apps.contract.views.async_web3_clients.aclose', new_callable=mock.AsyncMock) as aclose:
+            response = self.client.post(self.url, '{}', content_type='application/json')
+        self.assertEqual(response.json()['error'], 'Registry not deployed yet')
+        aclose.assert_awaited_once()
+
+    async def test_asgi_request_keeps_sessions(self):
+        await self.async_client.aforce_login(self.user)
+        with mock.patch('apps.contract.views.async_web3_clients.aclose', new_callable=mock.AsyncMock) as aclose:
+            response = await self.async_client.post(self.url, '{}', content_type='application/json')
+        self.assertEqual(response.json()['error'], 'Registry not deployed yet')
+        aclose.assert_not_awaited()
+
+
+@override_settings(RECEIPT_TRACKER_DROP_AFTER=3600, NONCE_GAP_GRACE=60)
+class ReceiptTrackerTests(RegistryLogMixin, TestCase):
+    def setUp(self):
+        self.patch_encoder()
+        self.admin = User.objects.create(email='admin@example.com', username='admin', wallet_address='0x' + 'ad' * 20)
+        self.registry = UserDataRegistry.objects.create(
+            name='Registry', admin=self.admin, network='local', address='0x' + '11' * 20, deployed=True
+        )
+        self.wallets = [Web3.to_checksum_address(f'0x{i:040x}') for i in range(1, 4)]
+        self.receipts = {}
+
+        web3 = mock.patch('apps.contract.tracker.get_web3')
+        web3.start()
+        self.addCleanup(web3.stop)
+        batch = mock.patch(
+            'apps.contract.tracker.batch_request',
+            side_effect=lambda w3, calls: [self.receipts.get(params[0]) for method, params in calls]
+        )
+        self.batch_request = batch.start()
+        self.addCleanup(batch.stop)
+
+    def pending(self, kind, number, **fields):
+        return PendingTransaction.objects.create(
+            registry=fields.pop('registry', self.registry),
+            network='local',
+            kind=kind,
+            transaction_hash='0x' + f'{number:064x}',
+            **fields
+        )
+
+    def receipt(self, pending_tx, logs=(), status=1, block=20, **fields):
+        self.receipts[pending_tx.transaction_hash] = {
+            'blockNumber': hex(block), 'gasUsed': hex(21000), 'status': hex(status), 'logs': list(logs), **fields
+        }
+
+    def test_confirmed_batch_applies_member_rows(self):
+        pending_tx = self.pending(PendingTransaction.KIND_AUTHORIZE_USERS, 1, payload={'addresses': self.wallets})
+        self.receipt(pending_tx, [self.log(self.registry.address, 'UserAuthorized', wallet, 20, index) for index, wallet in enumerate(self.wallets)])
+
+        self.assertEqual(ReceiptTracker().poll_once(), 1)
+
+        pending_tx.refresh_from_db()
+        self.assertEqual(pending_tx.status, PendingTransaction.STATUS_CONFIRMED)
+        self.assertEqual((pending_tx.block_number, pending_tx.gas_used), (20, 21000))
+        self.assertIsNotNone(pending_tx.confirmed_at)
+        members = self.registry.users.order_by('wallet_address')
+        self.assertEqual([member.wallet_address for member in members], [wallet.lower() for wallet in self.wallets])
+        self.assertTrue(all(member.is_authorized and member.indexed_block == 20 for member in members))
+
+    def test_confirmed_revocation_skips_members_with_newer_events(self):
+        revoked, reauthorized = self.wallets[:2]
+        RegistryUser.objects.create(registry=self.registry, wallet_address=revoked, indexed_block=10)
+        # Re-authorized after the revocation was mined; the late receipt must not undo it
+        RegistryUser.objects.create(registry=self.registry, wallet_address=reauthorized, indexed_block=30)
+        cache_key = f'user-data:local:{self.registry.address}:{revoked.lower()}'
+        cache.set(cache_key, {'value': {'exists': True}, 'fetched_at': 0})
+        pending_tx = self.pending(PendingTransaction.KIND_DEAUTHORIZE_USERS, 1, payload={'addresses': [revoked, reauthorized]})
+        self.receipt(pending_tx, [
+            self.log(self.registry.address, 'UserDeauthorized', wallet, 20, index) for index, wallet in enumerate([revoked, reauthorized])
+        ])
+
+        ReceiptTracker().poll_once()
+
+        members = {member.wallet_address: member for member in self.registry.users.all()}
+        self.assertEqual((members[revoked.lower()].is_authorized, members[revoked.lower()].indexed_block), (False, 20))
+        self.assertEqual((members[reauthorized.lower()].is_authorized, members[reauthorized.lower()].indexed_block), (True, 30))
+        self.assertEqual(RegistryEvent.objects.filter(event=RegistryEvent.EVENT_USER_DEAUTHORIZED).count(), 2)
+        self.assertIsNone(cache.get(cache_key))
+
+    def test_reverted_transaction_fails_without_effects(self):
+        pending_tx = self.pending(PendingTransaction.KIND_AUTHORIZE_USERS, 1)
+        self.receipt(pending_tx, [self.log(self.registry.address, 'UserAuthorized', self.wallets[0], 20)], status=0)
+
+        ReceiptTracker().poll_once()
+
+        pending_tx.refresh_from_db()
+        self.assertEqual(pending_tx.status, PendingTransaction.STATUS_FAILED)
+        self.assertEqual(pending_tx.error, 'Transaction reverted')
+        self.assertFalse(self.registry.users.exists())
+
+    def test_deploy_receipt_marks_registry_deployed(self):
+        registry = UserDataRegistry.objects.create(name='New', admin=self.admin, network='local')
+        pending_tx = self.pending(PendingTransaction.KIND_DEPLOY, 1, registry=registry)
+        address = '0x' + '22' * 20
+        self.receipt(pending_tx, [self.log(address, 'UserAuthorized', self.admin.wallet_address, 30)], block=30, contractAddress=address)
+
+        ReceiptTracker().poll_once()
+
+        registry.refresh_from_db()
+        self.assertTrue(registry.deployed)
+        self.assertEqual(registry.address, Web3.to_checksum_address(address))
+        self.assertEqual((registry.deployment_block, registry.transaction_hash), (30, pending_tx.transaction_hash))
+        self.assertEqual(registry.users.get().user, self.admin)
+
+    def test_missing_receipt_is_dropped_after_deadline(self):
+        old = self.pending(PendingTransaction.KIND_AUTHORIZE_USERS, 1, sender=self.admin.wallet_address, nonce=5)
+        recent = self.pending(PendingTransaction.KIND_AUTHORIZE_USERS, 2)
+        PendingTransaction.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(hours=2))
+
+        with mock.patch('apps.contract.tracker.nonce_manager') as nonce_manager:
+            nonce_manager.stuck_before.return_value = timezone.now() - timedelta(minutes=1)
+            self.assertEqual(ReceiptTracker().poll_once(), 1)
+
+        old.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(old.status, PendingTransaction.STATUS_DROPPED)
+        self.assertEqual(recent.status, PendingTransaction.STATUS_PENDING)
+        nonce_manager.release.assert_called_once_with('local', self.admin.wallet_address, 5)
+
+    def test_receipt_errors_leave_transaction_pending(self):
+        pending_tx = self.pending(PendingTransaction.KIND_AUTHORIZE_USERS, 1)
+        self.receipts[pending_tx.transaction_hash] = RPCError({'code': -32000, 'message': 'header not found'})
+
+        self.assertEqual(ReceiptTracker().poll_once(), 0)
+        pending_tx.refresh_from_db()
+        self.assertEqual(pending_tx.status, PendingTransaction.STATUS_PENDING)
+
+    def test_receipts_are_fetched_in_batches(self):
+        for number in range(5):
+            self.pending(PendingTransaction.KIND_AUTHORIZE_USERS, number)
+
+        ReceiptTracker(batch_size=2).poll_once()
+
+        self.assertEqual([len(call.args[1]) for call in self.batch_request.call_args_list], [2, 2, 1])
+
+
+class NonceManagerTests(TestCase):
+    def setUp(self):
+        self.sender = Web3.to_checksum_address('0x' + 'ad' * 20)
+        self.chain = {'latest': 5, 'pending': 7}
+        self.w3 = mock.Mock()
+        self.w3.eth.get_transaction_count.side_effect = lambda address, block: self.chain[block]
+        self.manager = NonceManager()
+        self.registry = UserDataRegistry.objects.create(
+            name='Registry', admin=User.objects.create(email='admin@example.com'), network='local'
+        )
+
+    def cursor(self):
+        return NonceCursor.objects.get(network='local', address=self.sender)
+
+    def track(self, nonce, status=PendingTransaction.STATUS_PENDING):
+        PendingTransaction.objects.create(
+            registry=self.registry, network='local', kind=PendingTransaction.KIND_AUTHORIZE_USERS,
+            transaction_hash='0x' + f'{nonce:064x}', sender=self.sender, nonce=nonce, status=status
+        )
+
+    def test_allocate_seeds_from_pending_count_once(self):
+        self.assertEqual([self.manager.allocate(self.w3, 'local', self.sender) for _ in range(3)], [7, 8, 9])
+        self.w3.eth.get_transaction_count.assert_called_once_with(self.sender, 'pending')
+
+    def test_released_nonces_are_reused_lowest_first(self):
+        for _ in range(4):
+            self.manager.allocate(self.w3, 'local', self.sender)
+        self.manager.release('local', self.sender, 9)
+        self.manager.release('local', self.sender, 8)
+        # Already queued, and never handed out
+        self.manager.release('local', self.sender, 9)
+        self.manager.release('local', self.sender, 11)
+
+        self.assertEqual(self.cursor().gaps, [8, 9])
+        self.assertEqual([self.manager.allocate(self.w3, 'local', self.sender) for _ in range(3)], [8, 9, 11])
+
+    def test_detect_gaps_releases_only_untracked_nonces(self):
+        for _ in range(5):
+            self.manager.allocate(self.w3, 'local', self.sender)
+        self.track(7, PendingTransaction.STATUS_CONFIRMED)
+        self.track(9)
+        self.track(10, PendingTransaction.STATUS_DROPPED)
+
+        # Nonce 11 is stuck: 8 and 10 hold nothing on chain
+        self.assertEqual(self.manager.detect_gaps('local', self.sender, 7, 11), [8, 10])
+        self.assertEqual(self.cursor().gaps, [8, 10])
+
+    def test_resync_drops_mined_gaps_and_catches_up(self):
+        self.manager.allocate(self.w3, 'local', self.sender)
+        NonceCursor.objects.filter(network='local', address=self.sender).update(gaps=[3, 6])
+        self.chain = {'latest': 5, 'pending': 12}
+
+        self.manager.resync(self.w3, 'local', self.sender)
+
+        cursor = self.cursor()
+        self.assertEqual((cursor.next_nonce, cursor.gaps), (12, [6]))
+
+    def test_rejected_send_releases_nonce(self):
+        with self.assertRaises(ValueError):
+            with self.manager.reserve(self.w3, 'local', self.sender) as nonce:
+                raise ValueError('insufficient funds for gas * price + value')
+        self.assertEqual(self.cursor().gaps, [nonce])
+
+    def test_ambiguous_send_keeps_nonce_reserved(self):
+        for error in [requests.exceptions.ReadTimeout('read timed out'), ConnectionResetError('reset'), RequestTimedOut('timeout')]:
+            with self.assertRaises(type(error)):
+                with self.manager.reserve(self.w3, 'local', self.sender):
+                    raise error
+        cursor = self.cursor()
+        self.assertEqual((cursor.next_nonce, cursor.gaps), (10, []))
+
+    def test_nonce_too_low_resyncs(self):
+        with self.assertRaises(ValueError):
+            with self.manager.reserve(self.w3, 'local', self.sender):
+                # Transactions were sent from this key elsewhere
+                self.chain = {'latest': 12, 'pending': 12}
+                raise ValueError('nonce too low')
+        cursor = self.cursor()
+        self.assertEqual((cursor.next_nonce, cursor.gaps), (12, []))
+
+
+class EventIndexerTests(RegistryLogMixin, TestCase):
+    def setUp(self):
+        self.patch_encoder()
+        self.admin = User.objects.create(email='admin@example.com', username='admin', wallet_address='0x' + 'ad' * 20)
+        self.registry = UserDataRegistry.objects.create(
+            name='Registry', admin=self.admin, network='local', address=Web3.to_checksum_address('0x' + '11' * 20), deployed=True
+        )
+        self.wallet = Web3.to_checksum_address('0x' + 'ab' * 20)
+        self.indexer = EventIndexer(block_range=50, confirmations=5)
+
+    def member(self):
+        return self.registry.users.get(wallet_address=self.wallet)
+
+    def test_ingest_applies_events_to_members(self):
+        account = User.objects.create(email='member@example.com', username='member', wallet_address=self.wallet)
+        logs = [
+            self.log(self.registry.address, 'UserDataUpdated', self.wallet, 11, image_reference='ipfs://image'),
+            self.log(self.registry.address, 'UserAuthorized', self.wallet, 10),
+            # Another contract's log is ignored
+            self.log('0x' + '99' * 20, 'UserDeauthorized', self.wallet, 12),
+        ]
+
+        self.assertEqual(self.indexer.ingest_logs('local', logs), 2)
+
+        member = self.member()
+        self.assertEqual(member.user, account)
+        self.assertTrue(member.is_authorized)
+        self.assertEqual((member.image_reference, member.indexed_block), ('ipfs://image', 11))
+        self.assertEqual(member.last_updated.timestamp(), 1700000000)
+        self.assertEqual(list(self.registry.events.order_by('block_number').values_list('event', flat=True)), ['UserAuthorized', 'UserDataUpdated'])
+
+    def test_events_apply_in_block_and_log_order(self):
+        self.indexer.ingest_logs('local', [
+            self.log(self.registry.address, 'UserDeauthorized', self.wallet, 10, log_index=1),
+            self.log(self.registry.address, 'UserAuthorized', self.wallet, 10, log_index=0),
+        ])
+        self.assertFalse(self.member().is_authorized)
+
+    def test_older_event_does_not_overwrite_newer_state(self):
+        self.indexer.ingest_logs('local', [self.log(self.registry.address, 'UserDeauthorized', self.wallet, 20)])
+        # A late receipt or backfill delivers an older authorization
+        self.indexer.ingest_logs('local', [self.log(self.registry.address, 'UserAuthorized', self.wallet, 15)])
+
+        member = self.member()
+        self.assertFalse(member.is_authorized)
+        self.assertEqual(member.indexed_block, 20)
+        self.assertEqual(self.registry.events.count(), 2)
+
+    def test_reingested_event_does_not_undo_a_later_event_in_the_same_block(self):
+        authorized = self.log(self.registry.address, 'UserAuthorized', self.wallet, 10, log_index=0)
+        self.indexer.ingest_logs('local', [authorized, self.log(self.registry.address, 'UserDeauthorized', self.wallet, 10, log_index=1)])
+        # The range is read again, or a receipt redelivers only the earlier log
+        self.indexer.ingest_logs('local', [authorized])
+
+        member = self.member()
+        self.assertFalse(member.is_authorized)
+        self.assertEqual((member.indexed_block, member.indexed_log_index), (10, 1))
+
+    def test_earlier_log_in_the_same_block_arriving_late_is_skipped(self):
+        self.indexer.ingest_logs('local', [self.log(self.registry.address, 'UserDeauthorized', self.wallet, 10, log_index=3)])
+        self.indexer.ingest_logs('local', [self.log(self.registry.address, 'UserAuthorized', self.wallet, 10, log_index=1)])
+        self.assertFalse(self.member().is_authorized)
+        self.assertEqual(self.registry.events.count(), 2)
+
+    def test_duplicate_logs_are_stored_once(self):
+        logs = [self.log(self.registry.address, 'UserAuthorized', self.wallet, 10)]
+        self.indexer.ingest_logs('local', logs)
+        self.indexer.ingest_logs('local', logs)
+        self.assertEqual(self.registry.events.count(), 1)
+        self.assertEqual(self.registry.users.count(), 1)
+
+    def test_index_network_checkpoints_each_range(self):
+        IndexerCheckpoint.objects.create(network='local', last_block=0)
+        ranges = []
+
+        def get_logs(w3, addresses, from_block, to_block):
+            ranges.append((from_block, to_block))
+            if from_block == 101:
+                raise RPCError({'code': -32000, 'message': 'provider down'})
+            return [self.log(self.registry.address, 'UserAuthorized', self.wallet, from_block)]
+
+        w3 = mock.Mock()
+        w3.eth.block_number = 155
+        with mock.patch('apps.contract.indexer.get_web3', return_value=w3), \
+                mock.patch.object(self.indexer, 'get_logs', side_effect=get_logs):
+            with self.assertRaises(RPCError):
+                self.indexer.index_network('local')
+
+        # Safe head is 150; the failed third range leaves the checkpoint after the second
+        self.assertEqual(ranges, [(1, 50), (51, 100), (101, 150)])
+        self.assertEqual(IndexerCheckpoint.objects.get(network='local').last_block, 100)
+        self.assertEqual(self.member().indexed_block, 51)
+
+    def test_index_network_without_checkpoint_starts_at_head(self):
+        w3 = mock.Mock()
+        w3.eth.block_number = 1005
+        with mock.patch('apps.contract.indexer.get_web3', return_value=w3), \
+                mock.patch.object(self.indexer, 'get_logs', return_value=[]) as get_logs:
+            self.indexer.index_network('local')
+
+        get_logs.assert_called_once_with(w3, [self.registry.address.lower()], 1000, 1000)
+        self.assertEqual(IndexerCheckpoint.objects.get(network='local').last_block, 1000)
+
+
+class EventBackfillTests(TestCase):
+    def setUp(self):
+        self.backfill = EventBackfill(workers=1, segment_size=100, retries=2, backoff=1)
+        self.address = '0x' + '11' * 20
+        self.ranges = []
+        sleep = mock.patch('apps.contract.backfill.time.sleep')
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def patch_get_logs(self, side_effect):
+        patcher = mock.patch('apps.contract.backfill.event_indexer.get_logs', side_effect=side_effect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def capped_get_logs(self, w3, addresses, from_block, to_block):
+        """A provider that refuses more than 25 blocks and returns one log per block"""
+        self.ranges.append((from_block, to_block))
+        if to_block - from_block + 1 > 25:
+            raise RPCError({'code': -32005, 'message': 'query returned more than 10000 results. Try with this block range'})
+        return [{'blockNumber': block} for block in range(from_block, to_block + 1)]
+
+    def http_error(self, status, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers or {})
+        return requests.exceptions.HTTPError(f'{status} Client Error', response=response)
+
+    def test_range_errors_are_told_apart_from_rate_limits(self):
+        for error in (
+            RPCError({'code': -32005, 'message': 'query returned more than 10000 results'}),
+            ValueError('Log response size exceeded. You can make eth_getLogs requests with up to a 2K block range'),
+            ValueError('exceed maximum block range: 5000'),
+            requests.exceptions.ReadTimeout('timed out'),
+        ):
+            self.assertTrue(is_range_too_large(error), error)
+            self.assertFalse(is_rate_limited(error), error)
+        for error in (
+            self.http_error(429),
+            RPCError({'code': -32005, 'message': 'daily request count exceeded, request rate limited'}),
+            RPCError({'code': 429, 'message': 'Too Many Requests'}),
+            ValueError('Your app has exceeded its compute units per second capacity'),
+        ):
+            self.assertTrue(is_rate_limited(error), error)
+            self.assertFalse(is_range_too_large(error), error)
+
+    def test_fetch_logs_halves_refused_ranges(self):
+        self.patch_get_logs(self.capped_get_logs)
+
+        logs, request_count = self.backfill.fetch_logs(None, self.address, 0, 99)
+
+        self.assertEqual([log['blockNumber'] for log in logs], list(range(100)))
+        # 0-99, 0-49, 50-99 refused; four 25-block ranges answered
+        self.assertEqual(request_count, 7)
+        self.assertEqual(self.ranges, [(0, 99), (0, 49), (0, 24), (25, 49), (50, 99), (50, 74), (75, 99)])
+        self.sleep.assert_not_called()
+
+    def test_fetch_logs_does_not_split_a_single_block(self):
+        self.patch_get_logs(RPCError({'code': -32005, 'message': 'query returned more than 10000 results'}))
+
+        with self.assertRaises(RPCError):
+            self.backfill.fetch_logs(None, self.address, 7, 7)
+
+    def test_rate_limit_backs_off_without_splitting(self):
+        responses = [self.http_error(429), RPCError({'code': -32005, 'message': 'request rate limited'}), [{'blockNumber': 3}]]
+        self.patch_get_logs(responses)
+
+        logs, request_count = self.backfill.fetch_logs(None, self.address, 0, 99)
+
+        self.assertEqual(logs, [{'blockNumber': 3}])
+        self.assertEqual(request_count, 3)
+        self.assertEqual([call.args[0] for call in self.sleep.call_args_list], [1, 2])
+
+    def test_rate_limit_honours_retry_after_then_gives_up(self):
+        self.patch_get_logs(self.http_error(429, {'Retry-After': '7'}))
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.backfill.fetch_logs(None, self.address, 0, 99)
+        self.assertEqual([call.args[0] for call in self.sleep.call_args_list], [7.0, 7.0])
+
+    def test_deployment_block_bisects_when_receipt_is_missing(self):
+        w3 = mock.Mock()
+        w3.eth.get_transaction_receipt.side_effect = TransactionNotFound('not found')
+        w3.eth.get_code.side_effect = lambda address, block: b'\x60\x80' if block >= 37 else b''
+        admin = User.objects.create(email='admin@example.com', username='admin', wallet_address='0x' + 'ad' * 20)
+        registry = UserDataRegistry.objects.create(
+            name='Registry', admin=admin, network='local', address=Web3.to_checksum_address(self.address),
+            transaction_hash='0x' + 'ee' * 32, deployed=True
+        )
+
+        self.assertEqual(self.backfill.find_deployment_block(w3, registry, 1000), 37)
+
+        with mock.patch('apps.contract.backfill.get_web3', return_value=w3), \
+                mock.patch('apps.contract.backfill.event_indexer.safe_head', return_value=250):
+            self.assertEqual(self.backfill.plan(registry), 3)
+        registry.refresh_from_db()
+        self.assertEqual(registry.deployment_block, 37)
+        self.assertEqual(
+            list(BackfillSegment.objects.order_by('from_block').values_list('from_block', 'to_block')),
+            [(37, 136), (137, 236), (237, 250)]
+        )
+
+
+class UserDataCacheTests(RegistryLogMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.patch_encoder()
+        self.user_data_cache = UserDataCache()
+        self.wallet = Web3.to_checksum_address('0x' + 'ab' * 20)
+        self.user = User.objects.create(email='member@example.com', username='member', wallet_address=self.wallet)
+        self.registry = UserDataRegistry.objects.create(
+            name='Registry', admin=self.user, network='local', address=Web3.to_checksum_address('0x' + '11' * 20), deployed=True
+        )
+        RegistryUser.objects.create(registry=self.registry, user=self.user, wallet_address=self.wallet, indexed_block=10)
+
+    def cached(self):
+        return self.user_data_cache.get('local', self.registry.address, self.wallet)
+
+    def test_reads_are_keyed_case_insensitively_and_counted(self):
+        self.assertIsNone(self.cached())
+        self.user_data_cache.set('local', self.registry.address.lower(), self.wallet.lower(), {'exists': True})
+
+        self.assertEqual(self.cached(), {'exists': True})
+        self.assertIsNone(self.user_data_cache.get('sepolia', self.registry.address, self.wallet))
+        stats = self.user_data_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (1, 2, 0.3333))
+
+    def test_invalidate_many_skips_registries_without_address(self):
+        self.user_data_cache.set('local', self.registry.address, self.wallet, {'exists': True})
+
+        self.user_data_cache.invalidate_many([('local', None, self.wallet), ('local', self.registry.address, self.wallet)])
+
+        self.assertIsNone(self.cached())
+        self.assertEqual(self.user_data_cache.stats()['invalidations'], 1)
+
+    def test_submitted_update_keeps_cache_until_mined(self):
+        self.user_data_cache.set('local', self.registry.address, self.wallet, {'image_reference': 'ipfs://old'})
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            reverse('confirm_update_data', args=[self.registry.pk]),
+            json.dumps({'transaction_hash': '0x' + 'cd' * 32, 'image_reference': 'ipfs://new'}),
+            content_type='application/json'
+        )
+
+        self.assertTrue(response.json()['success'])
+        # Still pending: the chain returns the old value, so the cached read stands
+        self.assertEqual(self.cached(), {'image_reference': 'ipfs://old'})
+
+        log = self.log(self.registry.address, 'UserDataUpdated', self.wallet, 12, image_reference='ipfs://new')
+        EventIndexer().ingest_logs('local', [log])
+
+        self.assertIsNone(self.cached())
+        self.assertEqual(self.registry.users.get().image_reference, 'ipfs://new')
+
+
+class SendBatchesTests(TestCase):
+    def setUp(self):
+        self.account = Account.create()
+        self.w3 = mock.Mock()
+        self.w3.eth.account = Account
+        self.w3.eth.get_transaction_count.return_value = 5
+        for patcher in (
+            mock.patch('apps.contract.services.get_web3', return_value=self.w3),
+            mock.patch('apps.contract.services.provider_health'),
+            mock.patch.object(RegistryDeploymentService, 'encoder', new_callable=mock.PropertyMock, return_value=CalldataEncoder(REGISTRY_ABI)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.service = RegistryDeploymentService(network='local')
+        self.service._fetch_transaction_params = mock.Mock(return_value=(10 ** 9, 0, 1337))
+        self.registry_address = '0x' + '11' * 20
+        self.addresses = [Web3.to_checksum_address(f'0x{index:040x}') for index in range(1, 6)]
+
+    def send(self, *responses):
+        with mock.patch('apps.contract.services.batch_request', side_effect=list(responses)) as batch_request:
+            result = self.service.authorize_users(
+                self.registry_address, self.account.address, self.account.key, self.addresses, chunk_size=2
+            )
+        return result, batch_request
+
+    def gaps(self):
+        return NonceCursor.objects.get(network='local', address=self.account.address).gaps
+
+    def test_chunks_are_sent_in_one_batch_with_consecutive_nonces(self):
+        result, batch_request = self.send(['0x01', '0x02', '0x03'])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(batch_request.call_count, 1)
+        self.assertEqual([sent['nonce'] for sent in result['transactions']], [5, 6, 7])
+        self.assertEqual([sent['addresses'] for sent in result['transactions']], [self.addresses[0:2], self.addresses[2:4], self.addresses[4:]])
+
+    def test_rejected_middle_chunk_is_resent_with_its_nonce(self):
+        rejected = RPCError({'code': -32000, 'message': 'txpool is full'})
+        result, batch_request = self.send(['0x01', rejected, '0x03'], ['0x02'])
+
+        self.assertEqual(result['errors'], [])
+        self.assertEqual([sent['nonce'] for sent in result['transactions']], [5, 6, 7])
+        # The identical signed transaction is re-sent, so it keeps nonce 6
+        first_calls, retry_calls = [call.args[1] for call in batch_request.call_args_list]
+        self.assertEqual(retry_calls, [first_calls[1]])
+        self.assertEqual(self.gaps(), [])
+
+    def test_chunk_rejected_twice_releases_its_nonce(self):
+        rejected = RPCError({'code': -32000, 'message': 'insufficient funds for gas * price + value'})
+        result, _ = self.send(['0x01', rejected, '0x03'], [rejected])
+
+        self.assertEqual([sent['nonce'] for sent in result['transactions']], [5, 7])
+        self.assertEqual(result['errors'], [{'addresses': self.addresses[2:4], 'error': str(rejected)}])
+        # The next allocation reuses nonce 6, which lets nonce 7 be mined
+        self.assertEqual(self.gaps(), [6])
+
+    def test_ambiguous_resend_keeps_nonce_reserved(self):
+        rejected = RPCError({'code': -32000, 'message': 'txpool is full'})
+        result, _ = self.send(['0x01', rejected, '0x03'], requests.exceptions.ConnectionError('reset'))
+
+        self.assertEqual(len(result['errors']), 1)
+        self.assertEqual(self.gaps(), [])
+
+    def test_rejected_trailing_chunk_is_not_resent(self):
+        rejected = RPCError({'code': -32000, 'message': 'txpool is full'})
+        result, batch_request = self.send(['0x01', '0x02', rejected])
+
+        self.assertEqual(batch_request.call_count, 1)
+        self.assertEqual(len(result['transactions']), 2)
+        self.assertEqual(self.gaps(), [7])
+
+
+class RegistryUserBatchViewTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(email='admin@example.com', username='admin', wallet_address='0x' + 'ad' * 20)
+        self.registry = UserDataRegistry.objects.create(
+            name='Registry', admin=self.admin, network='local', address='0x' + '11' * 20, deployed=True
+        )
+        self.users = [
+            User.objects.create(email=f'user{index}@example.com', username=f'user{index}', wallet_address=f'0x{index:040x}')
+            for index in range(1, 4)
+        ]
+        self.client.force_login(self.admin)
+        patcher = mock.patch('apps.contract.views.RegistryDeploymentService')
+        self.service = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def sent(self, result_addresses, first_nonce=3):
+        return {
+            'success': True,
+            'transactions': [
+                {'transaction_hash': f'0x{nonce:064x}', 'sender': self.admin.wallet_address, 'nonce': nonce, 'addresses': addresses}
+                for nonce, addresses in enumerate(result_addresses, first_nonce)
+            ],
+            'errors': [],
+        }
+
+    def test_add_users_skips_authorized_members_only(self):
+        authorized, revoked, new = self.users
+        RegistryUser.objects.create(registry=self.registry, user=authorized, wallet_address=authorized.wallet_address)
+        RegistryUser.objects.create(registry=self.registry, user=revoked, wallet_address=revoked.wallet_address, is_authorized=False)
+        self.service.authorize_users.return_value = self.sent([[revoked.wallet_address, new.wallet_address]])
+
+        self.client.post(reverse('registry_add_users', args=[self.registry.pk]), {
+            'users': [user.pk for user in self.users], 'private_key': '0x' + '01' * 32
+        })
+
+        wallets = self.service.authorize_users.call_args.args[3]
+        self.assertEqual(wallets, [revoked.wallet_address, new.wallet_address])
+        pending_tx = PendingTransaction.objects.get()
+        self.assertEqual(pending_tx.kind, PendingTransaction.KIND_AUTHORIZE_USERS)
+        self.assertEqual((pending_tx.nonce, pending_tx.payload), (3, {'addresses': wallets}))
+        # Rows change only when the receipt tracker sees the mined logs
+        self.assertFalse(self.registry.users.get(user=revoked).is_authorized)
+
+    def test_revoke_users_records_one_pending_transaction_per_chunk(self):
+        wallets = [user.wallet_address for user in self.users]
+        self.service.deauthorize_users.return_value = self.sent([wallets[:2], wallets[2:]])
+
+        self.client.post(reverse('registry_revoke_users', args=[self.registry.pk]), {
+            'wallet_addresses': '\n'.join(wallets), 'private_key': '0x' + '01' * 32
+        })
+
+        self.assertEqual(self.service.deauthorize_users.call_args.args[3], wallets)
+        self.assertEqual(
+            list(PendingTransaction.objects.order_by('nonce').values_list('kind', 'nonce')),
+            [(PendingTransaction.KIND_DEAUTHORIZE_USERS, 3), (PendingTransaction.KIND_DEAUTHORIZE_USERS, 4)]
+        )
+
+
+# Three addresses fit the constructor and three fit each authorizeUsers batch
+@override_settings(AUTHORIZE_USERS_MAX_GAS=100, DEPLOY_BASE_GAS=40, AUTHORIZE_USERS_BASE_GAS=40, AUTHORIZE_USERS_GAS_PER_USER=20)
+class DeploymentPlannerTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(email='admin@example.com', username='admin', wallet_address='0x' + 'ad' * 20)
+        self.owner = Web3.to_checksum_address(self.admin.wallet_address)
+        self.registry = UserDataRegistry.objects.create(name='Registry', admin=self.admin, network='local')
+        self.whitelist = [Web3.to_checksum_address(f'0x{index:040x}') for index in range(1, 8)]
+        self.planner = DeploymentPlanner()
+
+    def pending(self, plan, index, status):
+        pending_tx = self.planner.record_batch(plan, index, f'0x{index + 1:064x}', self.admin)
+        pending_tx.status = status
+        pending_tx.save(update_fields=['status'])
+
+    def test_split_whitelist_puts_owner_first_and_sizes_chunks_by_gas(self):
+        self.assertEqual((constructor_chunk_size(), authorize_chunk_size()), (3, 3))
+
+        # Duplicates and the owner's own address are folded into the owner-first list
+        owner, constructor_users, batches = split_whitelist(self.owner.lower(), self.whitelist + [self.whitelist[0], self.owner])
+
+        self.assertEqual(owner, self.owner)
+        self.assertEqual(constructor_users, [self.owner] + self.whitelist[:2])
+        self.assertEqual(batches, [self.whitelist[2:5], self.whitelist[5:]])
+
+    @override_settings(AUTHORIZE_USERS_MAX_GAS=10)
+    def test_chunk_sizes_never_drop_below_one(self):
+        self.assertEqual((constructor_chunk_size(), authorize_chunk_size()), (1, 1))
+
+    def test_outstanding_batches_are_unsent_failed_or_dropped(self):
+        whitelist = [Web3.to_checksum_address(f'0x{index:040x}') for index in range(1, 18)]
+        plan = self.planner.plan(self.registry, self.owner, whitelist)
+        self.assertEqual(len(plan.batches), 5)
+
+        self.pending(plan, 0, PendingTransaction.STATUS_CONFIRMED)
+        self.pending(plan, 1, PendingTransaction.STATUS_PENDING)
+        self.pending(plan, 2, PendingTransaction.STATUS_FAILED)
+        self.pending(plan, 3, PendingTransaction.STATUS_DROPPED)
+
+        self.assertEqual(self.planner.outstanding_batches(plan), [2, 3, 4])
+        progress = self.planner.progress(plan)
+        self.assertEqual((progress['outstanding'], progress['authorized_users']), (3, 3))
+
+    def test_prepare_deployment_with_only_the_rpc_layer_mocked(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        artifact = {'abi': REGISTRY_ABI, 'bin': '0x6080'}
+        # No provider: every RPC goes through the mocked batch_request
+        w3 = Web3()
+        with mock.patch('apps.contract.encoding.artifact_store.get', return_value=artifact), \
+                mock.patch('apps.contract.services.get_web3', return_value=w3), \
+                mock.patch('apps.contract.services.provider_health'), \
+                mock.patch('apps.contract.services.batch_request', return_value=['0x3b9aca00', '0x539', '0x186a0']) as batch_request:
+            result = RegistryDeploymentService(network='local').prepare_registry_deployment(self.owner, self.whitelist)
+
+            self.assertTrue(result['success'], result.get('error'))
+            self.assertEqual(result['constructor_users'], [self.owner] + self.whitelist[:2])
+            self.assertEqual(result['batches'], [self.whitelist[2:5], self.whitelist[5:]])
+            transaction_data = result['transaction_data']
+            self.assertEqual((transaction_data['gas'], transaction_data['gasPrice'], transaction_data['chainId']), (hex(120000), '0x3b9aca00', '0x539'))
+            self.assertEqual(
+                decode(['address[]'], bytes.fromhex(transaction_data['data'][len('0x6080'):]))[0],
+                tuple(address.lower() for address in result['constructor_users'])
+            )
+            self.assertEqual([method for method, _ in batch_request.call_args.args[1]], ['eth_gasPrice', 'eth_chainId', 'eth_estimateGas'])
+
+            # The MetaMask prepare view goes through the same method
+            self.client.force_login(self.admin)
+            session = self.client.session
+            session['whitelist_addresses'] = self.whitelist
+            session.save()
+            response = self.client.post(
+                reverse('prepare_deployment', args=[self.registry.pk]),
+                json.dumps({'wallet_address': self.owner}),
+                content_type='application/json'
+            ).json()
+        self.assertTrue(response['success'], response.get('error'))
+        self.assertEqual(response['plan']['constructor_users'], 3)
+
+    @mock.patch('apps.contract.views.RegistryDeploymentService')
+    def test_deploy_view_adds_only_constructor_users(self, service):
+        service.return_value.prepare_registry_deployment.return_value = {'success': True}
+        self.client.force_login(self.admin)
+        session = self.client.session
+        session['whitelist_addresses'] = self.whitelist
+        session.save()
+
+        self.client.post(reverse('registry_deploy', args=[self.registry.pk]), {
+            'deployed_address': '0x' + '11' * 20, 'tx_hash': '0x' + 'aa' * 32
+        })
+
+        self.assertEqual(service.return_value.prepare_registry_deployment.call_args.args[1], [self.owner] + self.whitelist[:2])
+        self.assertEqual(
+            sorted(self.registry.users.values_list('wallet_address', flat=True)),
+            sorted(address.lower() for address in [self.owner] + self.whitelist[:2])
+        )
+        self.assertEqual(DeploymentPlan.objects.get().batches, [self.whitelist[2:5], self.whitelist[5:]])
+
+    @mock.patch('apps.contract.views.RegistryDeploymentService')
+    def test_check_deployment_adds_only_planned_constructor_users(self, service):
+        plan = self.planner.plan(self.registry, self.owner, self.whitelist)
+        service.return_value.w3.to_checksum_address.side_effect = Web3.to_checksum_address
+        service.return_value.w3.eth.get_code.return_value = b'\x60\x80'
+        self.client.force_login(self.admin)
+        session = self.client.session
+        session['whitelist_addresses'] = self.whitelist
+        session.save()
+
+        response = self.client.post(
+            reverse('check_deployment', args=[self.registry.pk]),
+            json.dumps({'contract_address': '0x' + '11' * 20}),
+            content_type='application/json'
+        )
+
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(self.registry.users.count(), len(plan.constructor_users))
+
+
+class MulticallTests(SimpleTestCase):
+    def test_aggregate3_round_trip(self):
+        target = '0x' + '22' * 20
+        data = encode_aggregate3([(target, '0x1234')])
+        self.assertTrue(data.startswith('0x82ad56cb'))
+
+        (calls,) = decode(['(address,bool,bytes)[]'], bytes.fromhex(data[10:]))
+        self.assertEqual(calls, ((target, True, b'\x12\x34'),))
+
+        encoded = encode(['(bool,bytes)[]'], [[(True, b'\x01'), (False, b'')]])
+        self.assertEqual(decode_aggregate3(encoded), [(True, b'\x01'), (False, b'')])
+
+    def test_aggregate3_chunks_calls(self):
+        targets = ['0x' + f'{i:040x}' for i in range(1, 6)]
+        eth = FakeMulticallEth({(target, b'\xaa'): bytes([i]) for i, target in enumerate(targets)})
+        w3 = mock.Mock(eth=eth)
+
+        results = aggregate3(w3, MULTICALL_ADDRESS, [(target, '0xaa') for target in targets], chunk_size=2)
+
+        self.assertEqual([len(calls) for calls in eth.calls], [2, 2, 1])
+        self.assertEqual(results, [(True, bytes([i])) for i in range(5)])
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        self.wallet = Web3.to_checksum_address('0x' + 'ab' * 20)
+        self.user = User.objects.create(email='member@example.com', wallet_address=self.wallet)
+        self.registries = []
+        for index, network in enumerate(['sepolia', 'sepolia', 'goerli']):
+            registry = UserDataRegistry.objects.create(
+                name=f'Registry {index}',
+                admin=self.user,
+                network=network,
+                address=Web3.to_checksum_address('0x' + f'{index + 1:040x}'),
+                deployed=True,
+            )
+            RegistryUser.objects.create(registry=registry, user=self.user, wallet_address=self.wallet)
+            self.registries.append(registry)
+
+        self.encoder = CalldataEncoder(GET_USER_DATA_ABI)
+        encoder_patch = mock.patch.object(DashboardService, 'encoder', new_callable=mock.PropertyMock, return_value=self.encoder)
+        encoder_patch.start()
+        self.addCleanup(encoder_patch.stop)
+
+    def test_one_multicall_per_network(self):
+        calldata = bytes.fromhex(self.encoder.encode_function('getUserData', [self.wallet])[2:])
+        user_data = encode(['string', 'uint256', 'bool'], ['ipfs://image', 1700000000, True])
+        # The second sepolia registry reverts
+        responses = {(self.registries[0].address.lower(), calldata): user_data, (self.registries[2].address.lower(), calldata): user_data}
+        clients = {'sepolia': mock.Mock(eth=FakeMulticallEth(responses)), 'goerli': mock.Mock(eth=FakeMulticallEth(responses))}
+
+        self.client.force_login(self.user)
+        with mock.patch('apps.contract.dashboard.get_web3', side_effect=clients.get), self.assertNumQueries(3):
+            # session, user, memberships
+            response = self.client.get(reverse('dashboard_data'))
+
+        data = response.json()
+        self.assertEqual([len(client.eth.calls) for client in clients.values()], [1, 1])
+        self.assertEqual(len(clients['sepolia'].eth.calls[0]), 2)
+        self.assertEqual(data['errors'], {})
+
+        by_registry = {entry['registry_id']: entry for entry in data['registries']}
+        self.assertEqual(by_registry[self.registries[0].pk]['onchain']['image_reference'], 'ipfs://image')
+        self.assertIsNone(by_registry[self.registries[1].pk]['onchain'])
+        self.assertTrue(by_registry[self.registries[2].pk]['onchain']['exists'])
+
+    def test_network_failure_is_reported(self):
+        failing = mock.Mock()
+        failing.eth.call.side_effect = ConnectionError('provider down')
+
+        with mock.patch('apps.contract.dashboard.get_web3', return_value=failing):
+            data = DashboardService().get_user_dashboard(self.user)
+
+        self.assertEqual(set(data['errors']), {'sepolia', 'goerli'})
+        self.assertTrue(all(entry['onchain'] is None for entry in data['registries']))
+
+
+class DashboardEthTesterTests(TestCase):
+    """
+    Reads real contracts on an eth-tester chain (eth-tester is in
+    requirements.txt). Uses the shipped artifacts when they are up to date and
+    compiles the sources otherwise, so it only skips where neither is possible.
+    """
+    artifacts = None
+
+    @classmethod
+    def contract_artifacts(cls):
+        if cls.artifacts is None:
+            if not stale_artifacts(artifact_store.precompiled_dir):
+                cls.artifacts = {name: artifact_store.get_precompiled(name) for name in ('UserDataRegistry', 'Multicall3')}
+            else:
+                artifacts = {}
+                for path in source_paths():
+                    artifacts.update(compile_source_file(path))
+                cls.artifacts = artifacts
+        return cls.artifacts
+
+    def setUp(self):
+        try:
+            artifacts = self.contract_artifacts()
+        except Exception as e:
+            self.skipTest(f'solc {SOLC_VERSION} is not available: {e}')
+        self.registry_artifact = artifacts['UserDataRegistry']
+        self.multicall_artifact = artifacts['Multicall3']
+
+        self.w3 = Web3(EthereumTesterProvider())
+        self.accounts = self.w3.eth.accounts
+
+    def deploy(self, artifact, *args):
+        contract = self.w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bin'])
+        tx_hash = contract.constructor(*args).transact({'from': self.accounts[0]})
+        return self.w3.eth.wait_for_transaction_receipt(tx_hash).contractAddress
+
+    def test_dashboard_reads_through_multicall(self):
+        member = self.accounts[1]
+        multicall_address = self.deploy(self.multicall_artifact)
+        addresses = [self.deploy(self.registry_artifact, [member]) for _ in range(3)]
+
+        registry = self.w3.eth.contract(address=addresses[0], abi=self.registry_artifact['abi'])
+        tx_hash = registry.functions.updateUserData('ipfs://on-chain').transact({'from': member})
+        self.w3.eth.wait_for_transaction_receipt(tx_hash)
+
+        user = User.objects.create(email='member@example.com', wallet_address=member)
+        for index, address in enumerate(addresses):
+            registry = UserDataRegistry.objects.create(
+                name=f'Registry {index}', admin=user, network='local', address=address, deployed=True
+            )
+            RegistryUser.objects.create(registry=registry, user=user, wallet_address=member)
+
+        with mock.patch('apps.contract.dashboard.get_web3', return_value=self.w3), \
+                self.settings(MULTICALL3_ADDRESSES={'local': multicall_address}, MULTICALL_CHUNK_SIZE=2):
+            data = DashboardService().get_user_dashboard(user)
+
+        onchain = [entry['onchain'] for entry in data['registries']]
+        self.assertEqual(data['errors'], {})
+        self.assertEqual(onchain[0]['image_reference'], 'ipfs://on-chain')
+        self.assertEqual([entry['exists'] for entry in onchain], [True, False, False])
+
+
+@override_settings(REGISTRY_MEMBERS_PAGE_SIZE=20)
+class RegistryMemberListingTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(email='admin@example.com', username='admin', wallet_address='0x' + 'ad' * 20)
+        self.registry = UserDataRegistry.objects.create(
+            name='Registry', admin=self.admin, network='local', address='0x' + '11' * 20, deployed=True
+        )
+        # Member data is read from the index, so no provider is needed
+        IndexerCheckpoint.objects.create(network='local', last_block=1)
+        RegistryUser.objects.create(registry=self.registry, user=self.admin, wallet_address=self.admin.wallet_address)
+        self.add_members(0, 30)
+
+    def add_members(self, start, count):
+        wallets = [Web3.to_checksum_address(f'0x{i:040x}') for i in range(start + 1, start + count + 1)]
+        users = User.objects.bulk_create([
+            User(email=f'member{i}@example.com', username=f'member{i}', wallet_address=wallet)
+            for i, wallet in enumerate(wallets, start)
+        ])
+        RegistryUser.objects.bulk_create([
+            RegistryUser(registry=self.registry, user=user, wallet_address=user.wallet_address, is_authorized=index % 2 == 0)
+            for index, user in enumerate(users)
+        ])
+
+    def test_detail_queries_do_not_grow_with_members(self):
+        self.client.force_login(self.admin)
+        url = reverse('registry_detail', args=[self.registry.pk])
+
+        # session, user, registry with counts, member page, own membership,
+        # indexer checkpoint, deployment plan, user addition form choices
+        with self.assertNumQueries(8):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['registry_users']), 20)
+        self.assertEqual(response.context['registry'].member_count, 31)
+        self.assertContains(response, 'member5@example.com')
+
+        self.add_members(1000, 200)
+        with self.assertNumQueries(8):
+            response = self.client.get(url, {'after': response.context['next_cursor']})
+        self.assertEqual(len(response.context['registry_users']), 20)
+        self.assertEqual(response.context['registry'].member_count, 231)
+
+    def test_members_api_walks_every_page(self):
+        self.client.force_login(self.admin)
+        url = reverse('registry_members', args=[self.registry.pk])
+
+        seen = []
+        params = {}
+        while True:
+            # session, user, registry with counts, member page
+            with self.assertNumQueries(4):
+                data = self.client.get(url, params).json()
+            seen.extend(member['id'] for member in data['members'])
+            if data['next_cursor'] is None:
+                break
+            params = {'after': data['next_cursor']}
+
+        self.assertEqual(data['member_count'], 31)
+        self.assertEqual(data['authorized_count'], 16)
+        self.assertEqual(seen, list(self.registry.users.order_by('pk').values_list('pk', flat=True)))
+
+    def test_members_api_is_limited_to_admin_and_members(self):
+        url = reverse('registry_members', args=[self.registry.pk])
+        outsider = User.objects.create(email='outsider@example.com', username='outsider', wallet_address='0x' + 'ee' * 20)
+        member = self.registry.users.exclude(user=self.admin).first().user
+
+        self.client.force_login(outsider)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(member)
+        self.assertEqual(self.client.get(url).json()['member_count'], 31)
+
+
+@override_settings(REGISTRY_LIST_PAGE_SIZE=4)
+class RegistryListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='user@example.com', username='user', wallet_address='0x' + 'ab' * 20)
+        other = User.objects.create(email='other@example.com', username='other', wallet_address='0x' + 'cd' * 20)
+        self.registries = []
+        for index in range(10):
+            registry = UserDataRegistry.objects.create(name=f'Registry {index}', admin=self.user if index % 2 else other, network='local')
+            if index % 3 == 0:
+                # Several members, so a join would repeat the row
+                RegistryUser.objects.create(registry=registry, user=self.user, wallet_address=self.user.wallet_address)
+                RegistryUser.objects.create(registry=registry, wallet_address=f'0x{index + 1:040x}')
+            self.registries.append(registry)
+        # Administered (odd) or joined (multiple of 3), newest first
+        self.visible = [registry.pk for index, registry in reversed(list(enumerate(self.registries))) if index % 2 or index % 3 == 0]
+        self.client.force_login(self.user)
+
+    def test_list_data_pages_newest_first_in_three_queries(self):
+        url = reverse('registry_list_data')
+        seen = []
+        params = {}
+        while True:
+            # session, user, one page of registries with counts and status
+            with self.assertNumQueries(3):
+                data = self.client.get(url, params).json()
+            self.assertLessEqual(len(data['registries']), 4)
+            seen.extend((registry['id'], registry['member_count']) for registry in data['registries'])
+            if data['next_cursor'] is None:
+                break
+            params = {'after': data['next_cursor']}
+
+        member_counts = {registry.pk: 2 if index % 3 == 0 else 0 for index, registry in enumerate(self.registries)}
+        self.assertEqual(seen, [(pk, member_counts[pk]) for pk in self.visible])
+
+    def test_only_the_deploy_flow_submits_deployments(self):
+        registry = self.registries[9]
+        response = self.client.get(reverse('registry_detail', args=[registry.pk]))
+        self.assertContains(response, reverse('submit_deployment', args=[registry.pk]), count=1)
+
+    def test_submitted_deployment_lists_as_pending_until_mined(self):
+        registry = self.registries[9]
+        transaction_hash = '0x' + 'aa' * 32
+
+        response = self.client.post(
+            reverse('submit_deployment', args=[registry.pk]),
+            json.dumps({'transaction_hash': transaction_hash}),
+            content_type='application/json'
+        )
+
+        self.assertTrue(response.json()['success'])
+        pending_tx = PendingTransaction.objects.get(transaction_hash=transaction_hash)
+        self.assertEqual((pending_tx.kind, pending_tx.registry, pending_tx.sender), (PendingTransaction.KIND_DEPLOY, registry, self.user.wallet_address))
+        statuses = {entry['id']: entry['deployment_status'] for entry in self.client.get(reverse('registry_list_data')).json()['registries']}
+        self.assertEqual(statuses[registry.pk], 'pending')
+        self.assertEqual(statuses[self.registries[7].pk], 'not_deployed')
+
+        # The receipt tracker got there first; the browser's confirmation still succeeds
+        registry.address, registry.transaction_hash, registry.deployed = '0x' + '11' * 20, transaction_hash, True
+        registry.save()
+        with mock.patch('apps.contract.views.RegistryDeploymentService'):
+            response = self.client.post(
+                reverse('confirm_deployment', args=[registry.pk]),
+                json.dumps({'transaction_hash': transaction_hash, 'contract_address': registry.address}),
+                content_type='application/json'
+            )
+        self.assertEqual(response.json(), {'success': True, 'plan': None})
+
+
+class RegistryUserIndexTests(TestCase):
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plan assertions are written for SQLite')
+        self.user = User.objects.create(email='member@example.com', wallet_address='0x' + 'ab' * 20)
+        self.registry = UserDataRegistry.objects.create(name='Registry', admin=self.user, network='local')
+
+    def assertSearches(self, queryset, table, index, *columns):
+        """The SQLite plan looks rows up through ``index`` on equality with ``columns``"""
+        lookup = ' AND '.join(f'{column}=\\?' for column in columns)
+        self.assertRegex(queryset.explain(), rf'SEARCH {table} USING (COVERING )?INDEX {index} \({lookup}\)')
+
+    def test_membership_by_account_uses_composite_index(self):
+        self.assertSearches(
+            RegistryUser.objects.filter(registry=self.registry, user=self.user),
+            'contract_registryuser', 'contract_ru_registry_user_idx', 'registry_id', 'user_id'
+        )
+
+    def test_registry_list_exists_uses_composite_index(self):
+        memberships = RegistryUser.objects.filter(registry=OuterRef('pk'), user=self.user)
+        self.assertSearches(
+            UserDataRegistry.objects.filter(Exists(memberships)),
+            'U0', 'contract_ru_registry_user_idx', 'registry_id', 'user_id'
+        )
+
+    def test_membership_by_wallet_uses_unique_index(self):
+        self.assertSearches(
+            RegistryUser.objects.filter(registry=self.registry, wallet_address__in=['0x' + 'AB' * 20, '0x' + 'cd' * 20]),
+            'contract_registryuser', r'contract_registryuser_registry_id_wallet_address_\w+_uniq', 'registry_id', 'wallet_address'
+        )
+
+    def test_wallet_case_does_not_duplicate_members(self):
+        materialize_memberships(self.registry, ['0x' + 'ab' * 20])
+        materialize_memberships(self.registry, [Web3.to_checksum_address('0x' + 'ab' * 20)])
+        member = RegistryUser.objects.get(registry=self.registry)
+        self.assertEqual(member.wallet_address, '0x' + 'ab' * 20)
+        self.assertEqual(member.user, self.user)
@@ -0,0 +1,198 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from web3 import Web3
+
+from apps.contract.clients import get_web3
+from apps.contract.gas import gas_estimates
+from apps.contract.indexer import event_indexer
+from apps.contract.models import PendingTransaction
+from apps.contract.nonces import nonce_manager
+from apps.contract.rpc import RPCError, batch_request, to_int
+from apps.contract.services import UPDATE_USER_DATA_SELECTOR, RegistryDeploymentService
+
+logger = logging.getLogger(__name__)
+
+
+class ReceiptTracker:
+    """
+    Polls receipts for every pending transaction in JSON-RPC batches and
+    applies their effects to the database once they are mined, so request
+    handlers never wait on wait_for_transaction_receipt.
+    """
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.RECEIPT_TRACKER_BATCH_SIZE
+        # kind -> callable(pending_tx, receipt) applying a confirmed transaction
+        self.handlers = {
+            PendingTransaction.KIND_DEPLOY: self.apply_deploy,
+            PendingTransaction.KIND_UPDATE_USER_DATA: self.apply_update_user_data,
+            PendingTransaction.KIND_AUTHORIZE_USERS: self.apply_authorize_users,
+            PendingTransaction.KIND_DEAUTHORIZE_USERS: self.apply_deauthorize_users,
+        }
+
+    def poll_once(self, network=None):
+        """Check all pending transactions once; returns the number that left the pending state"""
+        pending = PendingTransaction.objects.filter(status=PendingTransaction.STATUS_PENDING).select_related('registry')
+        if network:
+            pending = pending.filter(network=network)
+
+        by_network = {}
+        for pending_tx in pending.order_by('created_at'):
+            by_network.setdefault(pending_tx.network, []).append(pending_tx)
+
+        settled = 0
+        for tx_network, pending_txs in by_network.items():
+            try:
+                settled += self.poll_network(tx_network, pending_txs)
+            except Exception as e:
+                logger.error(f"Receipt polling failed for {tx_network}: {str(e)}")
+        return settled
+
+    def poll_network(self, network, pending_txs):
+        w3 = get_web3(network)
+        drop_before = timezone.now() - timedelta(seconds=settings.RECEIPT_TRACKER_DROP_AFTER)
+        stuck_before = nonce_manager.stuck_before()
+        # sender -> lowest nonce among its transactions still waiting for a receipt
+        stuck_nonces = {}
+        settled = 0
+
+        for start in range(0, len(pending_txs), self.batch_size):
+            chunk = pending_txs[start:start + self.batch_size]
+            receipts = batch_request(w3, [
+                ('eth_getTransactionReceipt', [pending_tx.transaction_hash]) for pending_tx in chunk
+            ])
+
+            for pending_tx, receipt in zip(chunk, receipts):
+                if isinstance(receipt, RPCError):
+                    logger.warning(f"Receipt lookup failed for {pending_tx.transaction_hash}: {receipt}")
+                elif receipt is None:
+                    if pending_tx.created_at < drop_before:
+                        pending_tx.status = PendingTransaction.STATUS_DROPPED
+                        pending_tx.error = 'No receipt before the tracking deadline'
+                        pending_tx.save(update_fields=['status', 'error', 'updated_at'])
+                        if pending_tx.nonce is not None:
+                            nonce_manager.release(network, pending_tx.sender, pending_tx.nonce)
+                        settled += 1
+                    elif pending_tx.nonce is not None and pending_tx.created_at < stuck_before:
+                        current = stuck_nonces.get(pending_tx.sender)
+                        if current is None or pending_tx.nonce < current:
+                            stuck_nonces[pending_tx.sender] = pending_tx.nonce
+                elif self.settle(pending_tx, receipt):
+                    settled += 1
+
+        if stuck_nonces:
+            self.fill_nonce_gaps(w3, network, stuck_nonces)
+        return settled
+
+    def fill_nonce_gaps(self, w3, network, stuck_nonces):
+        """Release nonces that keep long-pending transactions from being mined"""
+        senders = list(stuck_nonces)
+        mined_nonces = batch_request(w3, [
+            ('eth_getTransactionCount', [sender, 'latest']) for sender in senders
+        ])
+        for sender, mined_nonce in zip(senders, mined_nonces):
+            if isinstance(mined_nonce, RPCError):
+                logger.warning(f"Nonce lookup failed for {sender}: {mined_nonce}")
+                continue
+            gaps = nonce_manager.detect_gaps(network, sender, to_int(mined_nonce), stuck_nonces[sender])
+            if gaps:
+                logger.warning(
+                    f"Nonce gap for {sender} on {network}: {gaps}; later transactions stay queued "
+                    f"until the account's next send reuses them"
+                )
+
+    def settle(self, pending_tx, receipt):
+        """Apply a mined transaction; returns False if another tracker already settled it"""
+        if (
+            to_int(receipt['status']) == 1
+            and pending_tx.kind == PendingTransaction.KIND_UPDATE_USER_DATA
+            and not pending_tx.payload.get('code_hash')
+        ):
+            # Read before the transaction opens so no row lock is held across an RPC round trip
+            pending_tx.payload['code_hash'] = self.code_hash(pending_tx)
+
+        with transaction.atomic():
+            still_pending = PendingTransaction.objects.select_for_update().filter(
+                pk=pending_tx.pk, status=PendingTransaction.STATUS_PENDING
+            ).exists()
+            if not still_pending:
+                return False
+
+            pending_tx.block_number = to_int(receipt['blockNumber'])
+            pending_tx.gas_used = to_int(receipt['gasUsed'])
+            if receipt.get('contractAddress'):
+                pending_tx.contract_address = Web3.to_checksum_address(receipt['contractAddress'])
+
+            if to_int(receipt['status']) == 1:
+                pending_tx.status = PendingTransaction.STATUS_CONFIRMED
+                pending_tx.confirmed_at = timezone.now()
+                handler = self.handlers.get(pending_tx.kind)
+                if handler:
+                    handler(pending_tx, receipt)
+            else:
+                pending_tx.status = PendingTransaction.STATUS_FAILED
+                pending_tx.error = 'Transaction reverted'
+
+            pending_tx.save()
+        return True
+
+    def apply_deploy(self, pending_tx, receipt):
+        registry = pending_tx.registry
+        registry.address = pending_tx.contract_address
+        registry.transaction_hash = pending_tx.transaction_hash
+        registry.deployed = True
+        registry.deployment_date = pending_tx.confirmed_at
+        registry.deployment_block = pending_tx.block_number
+        registry.save()
+
+        # The constructor's UserAuthorized logs create the member rows
+        event_indexer.ingest_logs(pending_tx.network, receipt.get('logs', []))
+
+    def apply_update_user_data(self, pending_tx, receipt):
+        payload = pending_tx.payload
+        # Member data comes from the receipt's UserDataUpdated log
+        event_indexer.ingest_logs(pending_tx.network, receipt.get('logs', []))
+
+        # Feed the real cost back into the gas estimate cache; MetaMask updates
+        # carry no code hash, so settle() looks it up (and caches it) first
+        code_hash = payload.get('code_hash')
+        if code_hash and payload.get('overwrite') is not None:
+            gas_estimates.record(
+                code_hash,
+                UPDATE_USER_DATA_SELECTOR,
+                payload['image_reference'],
+                payload['overwrite'],
+                pending_tx.gas_used
+            )
+
+    def code_hash(self, pending_tx):
+        """Runtime code hash of the transaction's registry, or None when it cannot be read"""
+        try:
+            return RegistryDeploymentService(network=pending_tx.network).get_code_hash(pending_tx.registry.address)
+        except Exception as e:
+            logger.warning(f"Code hash lookup failed for {pending_tx.registry.address}: {str(e)}")
+            return None
+
+    def apply_authorize_users(self, pending_tx, receipt):
+        # One UserAuthorized log per address; the indexer bulk-creates the member rows
+        event_indexer.ingest_logs(pending_tx.network, receipt.get('logs', []))
+
+    def apply_deauthorize_users(self, pending_tx, receipt):
+        # One UserDeauthorized log per address; the indexer skips rows a newer event already set
+        event_indexer.ingest_logs(pending_tx.network, receipt.get('logs', []))
+
+    def run(self, interval=None, network=None):
+        interval = interval or settings.RECEIPT_TRACKER_INTERVAL
+        logger.info(f"Receipt tracker started (every {interval}s)")
+        while True:
+            settled = self.poll_once(network=network)
+            if settled:
+                logger.info(f"Settled {settled} transaction(s)")
+            time.sleep(interval)
+
+
+receipt_tracker = ReceiptTracker()
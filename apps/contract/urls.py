@@ -1,28 +1,56 @@
 from django.urls import path
 from .views import (
     RegistryListView,
+    RegistryListDataView,
     RegistryDetailView,
+    RegistryMembersView,
     CreateRegistryView,
     DeployRegistryView,
     AddRegistryUsersView,
+    RevokeRegistryUsersView,
     UpdateUserDataView,
     PrepareDeploymentView,
+    SubmitDeploymentView,
     ConfirmDeploymentView,
+    DeploymentProgressView,
+    PrepareAuthorizeBatchView,
+    ConfirmAuthorizeBatchView,
     PrepareUpdateUserDataView,
     ConfirmUpdateUserDataView,
-    CheckDeploymentStatusView
+    CheckDeploymentStatusView,
+    TransactionStatusView,
+    DashboardDataView,
+    ProviderHealthView,
+    AsyncPrepareDeploymentView,
+    AsyncPrepareUpdateUserDataView,
+    AsyncCheckDeploymentStatusView
 )
 
 urlpatterns = [
     path('registries/', RegistryListView.as_view(), name='registry_list'),
+    path('registries/data/', RegistryListDataView.as_view(), name='registry_list_data'),
     path('registries/<int:pk>/', RegistryDetailView.as_view(), name='registry_detail'),
+    path('registries/<int:pk>/members/', RegistryMembersView.as_view(), name='registry_members'),
     path('registries/create/', CreateRegistryView.as_view(), name='registry_create'),
     path('registries/<int:pk>/deploy/', DeployRegistryView.as_view(), name='registry_deploy'),
     path('registries/<int:pk>/add-users/', AddRegistryUsersView.as_view(), name='registry_add_users'),
+    path('registries/<int:pk>/revoke-users/', RevokeRegistryUsersView.as_view(), name='registry_revoke_users'),
     path('registries/<int:pk>/update-data/', UpdateUserDataView.as_view(), name='update_user_data'),
     path('registries/<int:pk>/prepare-deployment/', PrepareDeploymentView.as_view(), name='prepare_deployment'),
+    path('registries/<int:pk>/submit-deployment/', SubmitDeploymentView.as_view(), name='submit_deployment'),
     path('registries/<int:pk>/confirm-deployment/', ConfirmDeploymentView.as_view(), name='confirm_deployment'),
+    path('registries/<int:pk>/deployment-progress/', DeploymentProgressView.as_view(), name='deployment_progress'),
+    path('registries/<int:pk>/prepare-authorize-batch/', PrepareAuthorizeBatchView.as_view(), name='prepare_authorize_batch'),
+    path('registries/<int:pk>/confirm-authorize-batch/', ConfirmAuthorizeBatchView.as_view(), name='confirm_authorize_batch'),
     path('registries/<int:pk>/prepare-update-data/', PrepareUpdateUserDataView.as_view(), name='prepare_update_data'),
     path('registries/<int:pk>/confirm-update-data/', ConfirmUpdateUserDataView.as_view(), name='confirm_update_data'),
     path('registries/<int:pk>/check-deployment/', CheckDeploymentStatusView.as_view(), name='check_deployment'),
+    path('transactions/<int:pk>/', TransactionStatusView.as_view(), name='transaction_status'),
+    path('dashboard/data/', DashboardDataView.as_view(), name='dashboard_data'),
+    path('health/', ProviderHealthView.as_view(), name='provider_health'),
+    
+    # Native async endpoints, for deployments served through django_blockchain.asgi
+    path('registries/<int:pk>/async/prepare-deployment/', AsyncPrepareDeploymentView.as_view(), name='async_prepare_deployment'),
+    path('registries/<int:pk>/async/prepare-update-data/', AsyncPrepareUpdateUserDataView.as_view(), name='async_prepare_update_data'),
+    path('registries/<int:pk>/async/check-deployment/', AsyncCheckDeploymentStatusView.as_view(), name='async_check_deployment'),
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.views.generic import ListView, DetailView, CreateView, FormView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy, reverse
@@ -6,14 +6,26 @@ from django.http import JsonResponse, HttpResponseRedirect
 from django.contrib import messages
 from django.utils import timezone
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Case, Count, Exists, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 
-from apps.contract.models import UserDataRegistry, RegistryUser
-from apps.contract.forms import RegistryCreationForm, UserAdditionForm, UserDataUpdateForm
+from apps.contract.models import UserDataRegistry, RegistryUser, PendingTransaction, IndexerCheckpoint, DeploymentPlan
+from apps.contract.forms import RegistryCreationForm, UserAdditionForm, UserDataUpdateForm, UserRevocationForm
 from apps.contract.services import RegistryDeploymentService
-from apps.user.models import User
+from apps.contract.async_services import AsyncRegistryDeploymentService
+from apps.contract.dashboard import dashboard_service
+from apps.contract.deployment import deployment_planner
+from apps.contract.memberships import materialize_memberships
+from apps.contract.health import provider_health
+from apps.contract.clients import async_web3_clients, contract_cache
+from apps.contract.reads import user_data_cache
+from apps.contract.pagination import keyset_page, parse_cursor
 
 import json
+from asgiref.sync import sync_to_async
+from web3 import Web3
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
@@ -26,36 +38,104 @@ class RegistryListView(LoginRequiredMixin, ListView):
     context_object_name = 'registries'
     
     def get_queryset(self):
-        # Show registries where user is admin or member
-        user = self.request.user
-        # Use Q objects to combine the conditions in a single query
-        return UserDataRegistry.objects.filter(
-            Q(admin=user) | Q(users__user=user)
-        ).distinct()
+        # One keyset page, newest first, of registries where user is admin or member
+        registries, self.next_cursor = keyset_page(
+            accessible_registries(self.request.user),
+            after=parse_cursor(self.request.GET.get('after')),
+            page_size=settings.REGISTRY_LIST_PAGE_SIZE,
+            descending=True
+        )
+        return registries
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.next_cursor
+        return context
+
+class RegistryListDataView(LoginRequiredMixin, View):
+    """JSON variant of RegistryListView for dashboards; pass ``after`` from the previous page's next_cursor"""
+    def get(self, request):
+        registries, next_cursor = keyset_page(
+            accessible_registries(request.user),
+            after=parse_cursor(request.GET.get('after')),
+            page_size=settings.REGISTRY_LIST_PAGE_SIZE,
+            descending=True
+        )
+        return JsonResponse({
+            'registries': [
+                {
+                    'id': registry.pk,
+                    'name': registry.name,
+                    'network': registry.network,
+                    'address': registry.address,
+                    'deployment_status': registry.deployment_status,
+                    'member_count': registry.member_count,
+                    'authorized_count': registry.authorized_count,
+                    'is_admin': registry.admin_id == request.user.pk,
+                }
+                for registry in registries
+            ],
+            'next_cursor': next_cursor,
+        })
+
+def accessible_registries(user):
+    """
+    Registries a user administers or belongs to, with member counts and
+    deployment status. Membership is an EXISTS subquery rather than a join,
+    so no DISTINCT is needed however many members a registry has.
+    """
+    memberships = RegistryUser.objects.filter(registry=OuterRef('pk'), user=user)
+    pending_deployments = PendingTransaction.objects.filter(
+        registry=OuterRef('pk'),
+        kind=PendingTransaction.KIND_DEPLOY,
+        status=PendingTransaction.STATUS_PENDING,
+    )
+    return annotate_member_counts(
+        UserDataRegistry.objects.filter(Q(admin=user) | Exists(memberships))
+    ).annotate(
+        deployment_status=Case(
+            When(deployed=True, then=Value('deployed')),
+            When(Exists(pending_deployments), then=Value('pending')),
+            default=Value('not_deployed'),
+        )
+    )
 
 class RegistryDetailView(LoginRequiredMixin, DetailView):
     model = UserDataRegistry
     template_name = 'contract/registry_detail.html'
     context_object_name = 'registry'
     
+    def get_queryset(self):
+        # Admin and member counts come with the registry row
+        return annotate_member_counts(UserDataRegistry.objects.select_related('admin'))
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['registry_users'] = self.object.users.all()
+        
+        # One keyset page of members, with their accounts joined in
+        context['registry_users'], context['next_cursor'] = keyset_page(
+            self.object.users.select_related('user'),
+            after=parse_cursor(self.request.GET.get('after')),
+            page_size=settings.REGISTRY_MEMBERS_PAGE_SIZE
+        )
         
         # Check if current user is admin
-        context['is_admin'] = (self.object.admin == self.request.user)
+        context['is_admin'] = (self.object.admin_id == self.request.user.pk)
         
-        # Check if current user is a member
-        context['is_member'] = self.object.users.filter(user=self.request.user).exists()
+        # The current user's membership, if any, in a single lookup
+        registry_user = self.object.users.filter(user=self.request.user).first()
+        context['is_member'] = registry_user is not None
         
         # Get current user's registry data if they're a member
         if context['is_member'] and self.object.deployed:
-            registry_user = self.object.users.get(user=self.request.user)
-            
             # If user has a wallet address
             if self.request.user.wallet_address:
-                service = RegistryDeploymentService(network=self.object.network)
-                user_data = service.get_user_data(self.object.address, self.request.user.wallet_address)
+                if IndexerCheckpoint.objects.filter(network=self.object.network).exists():
+                    # The event indexer keeps the member row authoritative
+                    user_data = indexed_user_data(registry_user)
+                else:
+                    service = RegistryDeploymentService(network=self.object.network)
+                    user_data = service.get_user_data(self.object.address, self.request.user.wallet_address)
                 context['user_data'] = user_data
                 context['update_form'] = UserDataUpdateForm(initial={
                     'image_reference': user_data.get('image_reference', '')
@@ -64,8 +144,76 @@ class RegistryDetailView(LoginRequiredMixin, DetailView):
         # If admin and registry is deployed, add user addition form
         if context['is_admin'] and self.object.deployed:
             context['user_form'] = UserAdditionForm()
+            
+            # Whitelist batches still to be authorized after a chunked deployment
+            plan = DeploymentPlan.objects.filter(registry=self.object).first()
+            if plan and plan.batches:
+                context['deployment_progress'] = deployment_planner.progress(plan)
+        
+        # ?members=onchain loads the page's member data from the contract in batched calls
+        context['onchain_members'] = (self.request.GET.get('members') == 'onchain' and self.object.deployed)
+        if context['onchain_members']:
+            context['registry_users'] = self.attach_onchain_data(context['registry_users'])
         
         return context
+    
+    def attach_onchain_data(self, registry_users):
+        registry_users = list(registry_users)
+        service = RegistryDeploymentService(network=self.object.network)
+        result = service.get_users_data(self.object.address, [ru.wallet_address for ru in registry_users])
+        if not result['success']:
+            messages.warning(self.request, f'Could not load on-chain member data: {result["error"]}')
+            return registry_users
+        
+        for registry_user in registry_users:
+            registry_user.onchain = result['users'].get(service.w3.to_checksum_address(registry_user.wallet_address))
+        return registry_users
+
+class RegistryMembersView(LoginRequiredMixin, View):
+    """
+    Keyset-paginated JSON listing of a registry's members; pass ``after`` from
+    the previous page's next_cursor. Only the admin and members can list it;
+    anyone else gets a 404.
+    """
+    def get(self, request, pk):
+        is_member = RegistryUser.objects.filter(registry=OuterRef('pk'), user=request.user)
+        registry = get_object_or_404(
+            annotate_member_counts(UserDataRegistry.objects.filter(Q(admin=request.user) | Exists(is_member))),
+            pk=pk
+        )
+        registry_users, next_cursor = keyset_page(
+            registry.users.select_related('user'),
+            after=parse_cursor(request.GET.get('after')),
+            page_size=settings.REGISTRY_MEMBERS_PAGE_SIZE
+        )
+        return JsonResponse({
+            'registry_id': registry.pk,
+            'member_count': registry.member_count,
+            'authorized_count': registry.authorized_count,
+            'members': [
+                {
+                    'id': registry_user.pk,
+                    'wallet_address': registry_user.wallet_address,
+                    'email': registry_user.user.email if registry_user.user else None,
+                    'is_authorized': registry_user.is_authorized,
+                    'image_reference': registry_user.image_reference,
+                    'last_updated': registry_user.last_updated.isoformat() if registry_user.last_updated else None,
+                }
+                for registry_user in registry_users
+            ],
+            'next_cursor': next_cursor,
+        })
+
+def annotate_member_counts(queryset):
+    """Add member_count and authorized_count to a UserDataRegistry queryset, counted per row by subqueries"""
+    return queryset.annotate(
+        member_count=count_members(),
+        authorized_count=count_members(is_authorized=True),
+    )
+
+def count_members(**filters):
+    members = RegistryUser.objects.filter(registry=OuterRef('pk'), **filters).order_by().values('registry')
+    return Coalesce(Subquery(members.annotate(count=Count('pk')).values('count')), 0)
 
 class CreateRegistryView(LoginRequiredMixin, CreateView):
     model = UserDataRegistry
@@ -117,9 +265,11 @@ class DeployRegistryView(LoginRequiredMixin, View):
             # Instead, you should return the transaction data to be signed by MetaMask
             # For demonstration, we'll use our deploy_registry method differently:
             
+            # The constructor only gets what fits the gas budget; the rest is authorized in batches once deployed
+            plan = deployment_planner.plan(registry, request.user.wallet_address, initial_users)
             deployment_data = service.prepare_registry_deployment(
                 request.user.wallet_address,
-                initial_users
+                plan.constructor_users
             )
             
             # Here you would return this data to the browser for MetaMask signing
@@ -127,31 +277,13 @@ class DeployRegistryView(LoginRequiredMixin, View):
             # For simplicity in this demo, let's just create the registry entry:
             if request.POST.get('deployed_address') and request.POST.get('tx_hash'):
                 # In a real app, these would come from MetaMask after user signs
-                registry.address = request.POST.get('deployed_address')
-                registry.transaction_hash = request.POST.get('tx_hash')
-                registry.deployed = True
-                registry.deployment_date = timezone.now()
-                registry.save()
-                
-                # Create admin as first registry user
-                RegistryUser.objects.create(
-                    registry=registry,
-                    user=request.user,
-                    wallet_address=request.user.wallet_address,
-                    is_authorized=True
+                record_confirmed_deployment(
+                    registry,
+                    request.POST.get('deployed_address'),
+                    request.POST.get('tx_hash'),
+                    [request.user.wallet_address] + plan.constructor_users
                 )
                 
-                # Also create entries for whitelist addresses
-                for address in whitelist_addresses:
-                    # Try to find a user with this wallet address
-                    user = User.objects.filter(wallet_address=address).first()
-                    RegistryUser.objects.create(
-                        registry=registry,
-                        user=user,  # May be None if no matching user
-                        wallet_address=address,
-                        is_authorized=True
-                    )
-                
                 messages.success(request, f'Registry deployed successfully!')
             else:
                 messages.error(request, 'Missing deployment data.')
@@ -174,49 +306,107 @@ class AddRegistryUsersView(LoginRequiredMixin, View):
         if form.is_valid():
             users = form.cleaned_data['users']
             
+            # One query for everyone who is already an authorized member; revoked members can be re-authorized
+            member_ids = set(registry.users.filter(user__in=users, is_authorized=True).values_list('user_id', flat=True))
+            
+            wallets = []
+            for user in users:
+                # Check if user has wallet address
+                if not user.wallet_address:
+                    messages.warning(request, f'User {user.email} skipped - no wallet address.')
+                elif user.pk in member_ids:
+                    messages.warning(request, f'User {user.email} is already in the registry.')
+                else:
+                    wallets.append(user.wallet_address)
+            
+            if not wallets:
+                return redirect('registry_detail', pk=pk)
+            
             # Initialize service
             service = RegistryDeploymentService(network=registry.network)
-            contract = service.get_registry_contract(registry.address)
             
             # In a real application, you should never handle private keys like this
             # Use web3 browser wallets like MetaMask instead
             private_key = request.POST.get('private_key')  # This is for demo only!
             
-            with transaction.atomic():
-                for user in users:
-                    # Check if user has wallet address
-                    if not user.wallet_address:
-                        messages.warning(request, f'User {user.email} skipped - no wallet address.')
-                        continue
-                    
-                    # Check if already in registry
-                    if registry.users.filter(user=user).exists():
-                        messages.warning(request, f'User {user.email} is already in the registry.')
-                        continue
-                    
-                    try:
-                        # Add to blockchain
-                        # This would call the authorizeUser function in the contract
-                        # For brevity, we'll skip the actual blockchain call here
-                        # But in a real app, you'd authorize them on-chain first
-                        
-                        # Then add to database
-                        RegistryUser.objects.create(
-                            registry=registry,
-                            user=user,
-                            wallet_address=user.wallet_address,
-                            is_authorized=True
-                        )
-                        
-                        messages.success(request, f'User {user.email} added successfully.')
-                    except Exception as e:
-                        messages.error(request, f'Error adding user {user.email}: {str(e)}')
+            # authorizeUsers in gas-limit sized chunks, all sent at once
+            result = service.authorize_users(registry.address, request.user.wallet_address, private_key, wallets)
+            if 'transactions' not in result:
+                messages.error(request, f'Authorization failed: {result["error"]}')
+                return redirect('registry_detail', pk=pk)
+            
+            # Members are bulk-created by the receipt tracker once each chunk is mined
+            record_address_batches(registry, request.user, PendingTransaction.KIND_AUTHORIZE_USERS, result)
+            
+            authorized = sum(len(sent['addresses']) for sent in result['transactions'])
+            if authorized:
+                messages.success(
+                    request,
+                    f'Authorizing {authorized} user(s) in {len(result["transactions"])} transaction(s); '
+                    f'they will appear once mined.'
+                )
+            for failed in result['errors']:
+                messages.error(request, f'Could not authorize {len(failed["addresses"])} user(s): {failed["error"]}')
             
             return redirect('registry_detail', pk=pk)
         else:
             messages.error(request, 'Invalid form submission.')
             return redirect('registry_detail', pk=pk)
 
+class RevokeRegistryUsersView(LoginRequiredMixin, View):
+    """Revoke many wallets at once with batched deauthorizeUsers transactions"""
+    template_name = 'contract/registry_revoke_users.html'
+    
+    def get(self, request, pk):
+        registry = get_object_or_404(UserDataRegistry, pk=pk, admin=request.user)
+        
+        # Wallets selected through the "Revoke on chain" admin action
+        wallets = request.session.pop('revoke_wallets', [])
+        form = UserRevocationForm(initial={'wallet_addresses': '\n'.join(wallets)})
+        return render(request, self.template_name, {'registry': registry, 'form': form})
+    
+    def post(self, request, pk):
+        registry = get_object_or_404(UserDataRegistry, pk=pk, admin=request.user)
+        
+        if not registry.deployed:
+            messages.error(request, 'Registry must be deployed before revoking users.')
+            return redirect('registry_detail', pk=pk)
+        
+        form = UserRevocationForm(request.POST)
+        if not form.is_valid():
+            return render(request, self.template_name, {'registry': registry, 'form': form})
+        
+        service = RegistryDeploymentService(network=registry.network)
+        
+        # In a real application, you should never handle private keys like this
+        # Use web3 browser wallets like MetaMask instead
+        private_key = request.POST.get('private_key')  # This is for demo only!
+        
+        result = service.deauthorize_users(
+            registry.address,
+            request.user.wallet_address,
+            private_key,
+            form.cleaned_data['wallet_addresses']
+        )
+        if 'transactions' not in result:
+            messages.error(request, f'Revocation failed: {result["error"]}')
+            return render(request, self.template_name, {'registry': registry, 'form': form})
+        
+        # is_authorized is flipped in bulk by the receipt tracker once each chunk is mined
+        record_address_batches(registry, request.user, PendingTransaction.KIND_DEAUTHORIZE_USERS, result)
+        
+        revoked = sum(len(sent['addresses']) for sent in result['transactions'])
+        if revoked:
+            messages.success(
+                request,
+                f'Revoking {revoked} wallet(s) in {len(result["transactions"])} transaction(s); '
+                f'access is removed once they are mined.'
+            )
+        for failed in result['errors']:
+            messages.error(request, f'Could not revoke {len(failed["addresses"])} wallet(s): {failed["error"]}')
+        
+        return redirect('registry_detail', pk=pk)
+
 class UpdateUserDataView(LoginRequiredMixin, View):
     def post(self, request, pk):
         registry = get_object_or_404(UserDataRegistry, pk=pk)
@@ -250,21 +440,40 @@ class UpdateUserDataView(LoginRequiredMixin, View):
             private_key = request.POST.get('private_key')  # This is for demo only!
             
             try:
-                # Update on blockchain
+                overwrite = registry_user.last_updated is not None
+                
+                # Send to the blockchain without waiting for it to be mined
                 update_result = service.update_user_data(
                     registry.address,
                     request.user.wallet_address,
                     private_key,
-                    image_reference
+                    image_reference,
+                    overwrite=overwrite
                 )
                 
                 if update_result['success']:
-                    # Update local cache
-                    registry_user.image_reference = image_reference
-                    registry_user.last_updated = timezone.now()
-                    registry_user.save()
+                    # The receipt tracker updates the member row, and drops the
+                    # cached read, once the transaction is mined
+                    pending_tx = PendingTransaction.objects.create(
+                        registry=registry,
+                        user=request.user,
+                        network=registry.network,
+                        kind=PendingTransaction.KIND_UPDATE_USER_DATA,
+                        transaction_hash=update_result['transaction_hash'],
+                        sender=update_result['sender'],
+                        nonce=update_result['nonce'],
+                        payload={
+                            'wallet_address': registry_user.wallet_address,
+                            'image_reference': image_reference,
+                            'overwrite': overwrite,
+                            'code_hash': update_result.get('code_hash'),
+                        }
+                    )
                     
-                    messages.success(request, 'Your data has been updated successfully.')
+                    messages.success(
+                        request,
+                        f'Your update was submitted (tracking id {pending_tx.pk}) and will appear once it is mined.'
+                    )
                 else:
                     messages.error(request, f'Update failed: {update_result["error"]}')
             
@@ -309,9 +518,12 @@ class PrepareDeploymentView(LoginRequiredMixin, View):
             if whitelist_addresses:
                 initial_users.extend([addr for addr in whitelist_addresses if addr.strip()])
             
+            # The constructor only gets what fits the gas budget; the rest is authorized in batches once deployed
+            plan = deployment_planner.plan(registry, wallet_address, initial_users)
+            
             # Prepare deployment - this can be slow but we've optimized it above
             try:
-                deployment_data = service.prepare_registry_deployment(wallet_address, initial_users)
+                deployment_data = service.prepare_registry_deployment(wallet_address, plan.constructor_users)
             except ValueError as e:
                 logger.error(f"Web3 value error: {str(e)}")
                 return JsonResponse({'success': False, 'error': 'Invalid blockchain data format'})
@@ -319,15 +531,20 @@ class PrepareDeploymentView(LoginRequiredMixin, View):
                 logger.error(f"Blockchain connection error: {str(e)}")
                 return JsonResponse({'success': False, 'error': 'Could not connect to blockchain'})
             
-            # Return the response
-            return JsonResponse(deployment_data)
+            # Return the response, with the plan summary instead of the address lists
+            return JsonResponse(deployment_response(deployment_data, deployment_planner.progress(plan)))
             
         except Exception as e:
             logger.error(f"Error in PrepareDeploymentView: {str(e)}", exc_info=True)
             return JsonResponse({'success': False, 'error': 'An internal error occurred'})
 
 @method_decorator(csrf_exempt, name='dispatch')
-class ConfirmDeploymentView(LoginRequiredMixin, View):
+class SubmitDeploymentView(LoginRequiredMixin, View):
+    """
+    Track a deployment signed in the browser as soon as its hash is known, so
+    the registry lists as pending and the receipt tracker finishes the
+    deployment even if the page is closed before it is mined.
+    """
     def post(self, request, pk):
         try:
             registry = get_object_or_404(UserDataRegistry, pk=pk, admin=request.user)
@@ -335,6 +552,37 @@ class ConfirmDeploymentView(LoginRequiredMixin, View):
             if registry.deployed:
                 return JsonResponse({'success': False, 'error': 'Registry already deployed'})
             
+            data = json.loads(request.body)
+            transaction_hash = data.get('transaction_hash')
+            
+            if not transaction_hash or not transaction_hash.startswith('0x') or len(transaction_hash) != 66:
+                return JsonResponse({'success': False, 'error': 'Invalid transaction hash format'})
+            
+            pending_tx, _ = PendingTransaction.objects.get_or_create(
+                transaction_hash=transaction_hash,
+                defaults={
+                    'registry': registry,
+                    'user': request.user,
+                    'network': registry.network,
+                    'kind': PendingTransaction.KIND_DEPLOY,
+                    'sender': request.user.wallet_address or '',
+                }
+            )
+            if pending_tx.registry_id != registry.pk or pending_tx.kind != PendingTransaction.KIND_DEPLOY:
+                return JsonResponse({'success': False, 'error': 'Transaction is already tracked for something else'})
+            
+            return JsonResponse({'success': True, 'transaction_id': pending_tx.pk})
+            
+        except Exception as e:
+            logger.error(f"Error in SubmitDeploymentView: {str(e)}", exc_info=True)
+            return JsonResponse({'success': False, 'error': 'An internal error occurred'})
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ConfirmDeploymentView(LoginRequiredMixin, View):
+    def post(self, request, pk):
+        try:
+            registry = get_object_or_404(UserDataRegistry, pk=pk, admin=request.user)
+            
             # Parse request body
             data = json.loads(request.body)
             transaction_hash = data.get('transaction_hash')
@@ -346,6 +594,13 @@ class ConfirmDeploymentView(LoginRequiredMixin, View):
             if not transaction_hash.startswith('0x') or len(transaction_hash) != 66:
                 return JsonResponse({'success': False, 'error': 'Invalid transaction hash format'})
             
+            if registry.deployed:
+                # The receipt tracker may have applied a submitted deployment first
+                if registry.transaction_hash == transaction_hash:
+                    plan = DeploymentPlan.objects.filter(registry=registry).first()
+                    return JsonResponse({'success': True, 'plan': deployment_planner.progress(plan) if plan else None})
+                return JsonResponse({'success': False, 'error': 'Registry already deployed'})
+            
             # Convert to checksum address
             try:
                 service = RegistryDeploymentService(network=registry.network)
@@ -355,38 +610,21 @@ class ConfirmDeploymentView(LoginRequiredMixin, View):
                     {'success': False, 'error': f'Invalid contract address: {str(e)}'}
                 )
             
-            # Update registry
-            registry.address = contract_address
-            registry.transaction_hash = transaction_hash
-            registry.deployed = True
-            registry.deployment_date = timezone.now()
-            registry.save()
-            
-            # Create admin user entry
-            RegistryUser.objects.create(
-                registry=registry,
-                user=request.user,
-                wallet_address=request.user.wallet_address,
-                is_authorized=True
+            # Admin plus constructor users; addresses left to planned batches are added by the receipt tracker once mined
+            plan = DeploymentPlan.objects.filter(registry=registry).first()
+            record_confirmed_deployment(
+                registry,
+                contract_address,
+                transaction_hash,
+                [request.user.wallet_address] + constructor_whitelist(request, plan)
             )
             
-            # Add whitelist users
-            whitelist_addresses = request.session.get('whitelist_addresses', [])
-            for address in whitelist_addresses:
-                user = User.objects.filter(wallet_address=address).first()
-                RegistryUser.objects.create(
-                    registry=registry,
-                    user=user,  # May be None
-                    wallet_address=address,
-                    is_authorized=True
-                )
-            
             # Clear session
             if 'whitelist_addresses' in request.session:
                 del request.session['whitelist_addresses']
                 request.session.modified = True
             
-            return JsonResponse({'success': True})
+            return JsonResponse({'success': True, 'plan': deployment_planner.progress(plan) if plan else None})
             
         except Exception as e:
             logger.error(f"Error in ConfirmDeploymentView: {str(e)}", exc_info=True)
@@ -428,7 +666,9 @@ class PrepareUpdateUserDataView(LoginRequiredMixin, View):
                 tx_preparation = service.prepare_update_user_data(
                     registry.address,
                     wallet_address,
-                    image_reference
+                    image_reference,
+                    # A member with a recorded update is overwriting an existing slot
+                    overwrite=registry_user.last_updated is not None
                 )
                 
                 if not tx_preparation['success']:
@@ -469,16 +709,29 @@ class ConfirmUpdateUserDataView(LoginRequiredMixin, View):
                     'error': 'Transaction hash and image reference required'
                 })
             
-            # Update user record in database
+            # The receipt tracker applies the mined UserDataUpdated event; the
+            # client's word is not written to the member row
             try:
                 registry_user = registry.users.get(user=request.user)
-                registry_user.image_reference = image_reference
-                registry_user.last_updated = timezone.now()
-                registry_user.save()
+                pending_tx, _ = PendingTransaction.objects.get_or_create(
+                    transaction_hash=transaction_hash,
+                    defaults={
+                        'registry': registry,
+                        'user': request.user,
+                        'network': registry.network,
+                        'kind': PendingTransaction.KIND_UPDATE_USER_DATA,
+                        'payload': {
+                            'wallet_address': registry_user.wallet_address,
+                            'image_reference': image_reference,
+                            'overwrite': registry_user.last_updated is not None,
+                        },
+                    }
+                )
                 
                 return JsonResponse({
                     'success': True,
-                    'message': 'User data updated successfully'
+                    'message': 'User data update submitted; it will appear once the transaction is mined',
+                    'transaction_id': pending_tx.pk
                 })
                 
             except RegistryUser.DoesNotExist:
@@ -491,6 +744,134 @@ class ConfirmUpdateUserDataView(LoginRequiredMixin, View):
             logger.error(f"Error in ConfirmUpdateUserDataView: {str(e)}", exc_info=True)
             return JsonResponse({'success': False, 'error': 'An internal error occurred'})
 
+class DeploymentProgressView(LoginRequiredMixin, View):
+    """Progress of a registry's deployment plan: constructor members plus each authorizeUsers batch"""
+    def get(self, request, pk):
+        registry = get_object_or_404(UserDataRegistry, pk=pk, admin=request.user)
+        plan = DeploymentPlan.objects.filter(registry=registry).first()
+        if not plan:
+            return JsonResponse({'success': False, 'error': 'Registry has no deployment plan'})
+        return JsonResponse({'success': True, 'plan': deployment_planner.progress(plan)})
+
+@method_decorator(csrf_exempt, name='dispatch')
+class PrepareAuthorizeBatchView(LoginRequiredMixin, View):
+    """MetaMask transaction data for the next outstanding batch of a deployment plan"""
+    def post(self, request, pk):
+        try:
+            registry = get_object_or_404(UserDataRegistry, pk=pk, admin=request.user)
+            plan = DeploymentPlan.objects.filter(registry=registry).first()
+            
+            if not registry.deployed or not plan:
+                return JsonResponse({'success': False, 'error': 'Registry must be deployed with a deployment plan'})
+            
+            # Batches never sent, failed or dropped, so an interrupted flow resumes where it stopped
+            outstanding = deployment_planner.outstanding_batches(plan)
+            if not outstanding:
+                return JsonResponse({'success': True, 'batch': None, 'plan': deployment_planner.progress(plan)})
+            
+            service = RegistryDeploymentService(network=registry.network)
+            batch_data = service.prepare_authorize_users(registry.address, plan.owner_address, plan.batches[outstanding[0]])
+            if batch_data['success']:
+                batch_data['batch'] = outstanding[0]
+                batch_data['size'] = len(plan.batches[outstanding[0]])
+                batch_data['remaining'] = len(outstanding)
+            return JsonResponse(batch_data)
+            
+        except Exception as e:
+            logger.error(f"Error in PrepareAuthorizeBatchView: {str(e)}", exc_info=True)
+            return JsonResponse({'success': False, 'error': 'An internal error occurred'})
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ConfirmAuthorizeBatchView(LoginRequiredMixin, View):
+    """Record the transaction MetaMask sent for a deployment plan batch"""
+    def post(self, request, pk):
+        try:
+            registry = get_object_or_404(UserDataRegistry, pk=pk, admin=request.user)
+            plan = DeploymentPlan.objects.filter(registry=registry).first()
+            if not plan:
+                return JsonResponse({'success': False, 'error': 'Registry has no deployment plan'})
+            
+            data = json.loads(request.body)
+            batch = data.get('batch')
+            transaction_hash = data.get('transaction_hash')
+            
+            if not transaction_hash or not transaction_hash.startswith('0x') or len(transaction_hash) != 66:
+                return JsonResponse({'success': False, 'error': 'Invalid transaction hash format'})
+            
+            if batch not in deployment_planner.outstanding_batches(plan):
+                return JsonResponse({'success': False, 'error': 'Batch is not outstanding'})
+            
+            deployment_planner.record_batch(plan, batch, transaction_hash, request.user)
+            return JsonResponse({'success': True, 'plan': deployment_planner.progress(plan)})
+            
+        except Exception as e:
+            logger.error(f"Error in ConfirmAuthorizeBatchView: {str(e)}", exc_info=True)
+            return JsonResponse({'success': False, 'error': 'An internal error occurred'})
+
+def deployment_response(deployment_data, progress):
+    """A prepare_registry_deployment result for the browser, with the plan summary instead of the address lists"""
+    deployment_data.pop('constructor_users', None)
+    deployment_data.pop('batches', None)
+    if deployment_data['success']:
+        deployment_data['plan'] = progress
+    return deployment_data
+
+def record_address_batches(registry, user, kind, result):
+    """Track each transaction sent by RegistryDeploymentService.send_address_batches"""
+    return PendingTransaction.objects.bulk_create([
+        PendingTransaction(
+            registry=registry,
+            user=user,
+            network=registry.network,
+            kind=kind,
+            transaction_hash=sent['transaction_hash'],
+            sender=sent['sender'],
+            nonce=sent['nonce'],
+            payload={'addresses': sent['addresses']},
+        )
+        for sent in result['transactions']
+    ])
+
+def indexed_user_data(registry_user):
+    """A member's data from the event index, shaped like RegistryDeploymentService.get_user_data"""
+    timestamp = int(registry_user.last_updated.timestamp()) if registry_user.last_updated else 0
+    return {
+        'success': True,
+        **RegistryDeploymentService._format_user_data(registry_user.image_reference or '', timestamp, timestamp > 0)
+    }
+
+def constructor_whitelist(request, plan):
+    """
+    Whitelist addresses the deployment itself authorized: the plan's
+    constructor users, or the session whitelist for a registry deployed
+    without a plan. Planned batches get their members from the receipt tracker.
+    """
+    return plan.constructor_users if plan else request.session.get('whitelist_addresses', [])
+
+def record_confirmed_deployment(registry, contract_address, transaction_hash, wallet_addresses):
+    """Mark a registry as deployed by a confirmed transaction and add its initial members"""
+    with transaction.atomic():
+        registry.address = contract_address
+        registry.transaction_hash = transaction_hash
+        registry.deployed = True
+        registry.deployment_date = timezone.now()
+        registry.save()
+        
+        # One IN query for accounts, one bulk insert for members
+        materialize_memberships(registry, wallet_addresses)
+
+def record_imported_deployment(registry, user, contract_address, whitelist_addresses):
+    """Mark a registry as deployed at an existing address and add any missing members"""
+    with transaction.atomic():
+        registry.address = contract_address
+        registry.deployed = True
+        if not registry.deployment_date:
+            registry.deployment_date = timezone.now()
+        registry.save()
+        
+        # Existing members are skipped by the unique (registry, wallet_address) constraint
+        materialize_memberships(registry, [user.wallet_address] + list(whitelist_addresses))
+
 @method_decorator(csrf_exempt, name='dispatch')
 class CheckDeploymentStatusView(LoginRequiredMixin, View):
     """
@@ -538,39 +919,14 @@ class CheckDeploymentStatusView(LoginRequiredMixin, View):
                             'error': 'Contract exists but you don\'t appear to be authorized'
                         })
                 
-                # Update registry status
-                registry.address = contract_address
-                registry.deployed = True
-                if not registry.deployment_date:
-                    registry.deployment_date = timezone.now()
-                registry.save()
+                # Update registry status and add missing members
+                plan = DeploymentPlan.objects.filter(registry=registry).first()
+                record_imported_deployment(registry, request.user, contract_address, constructor_whitelist(request, plan))
                 
-                # Check if admin user entry exists
-                if not registry.users.filter(user=request.user).exists():
-                    RegistryUser.objects.create(
-                        registry=registry,
-                        user=request.user,
-                        wallet_address=request.user.wallet_address,
-                        is_authorized=True
-                    )
-                
-                # Process whitelist addresses if needed
-                whitelist_addresses = request.session.get('whitelist_addresses', [])
-                if whitelist_addresses:
-                    for address in whitelist_addresses:
-                        if not registry.users.filter(wallet_address=address).exists():
-                            user = User.objects.filter(wallet_address=address).first()
-                            RegistryUser.objects.create(
-                                registry=registry,
-                                user=user,  # May be None
-                                wallet_address=address,
-                                is_authorized=True
-                            )
-                    
-                    # Clear session
-                    if 'whitelist_addresses' in request.session:
-                        del request.session['whitelist_addresses']
-                        request.session.modified = True
+                # Clear session
+                if 'whitelist_addresses' in request.session:
+                    del request.session['whitelist_addresses']
+                    request.session.modified = True
                 
                 return JsonResponse({
                     'success': True,
@@ -587,3 +943,213 @@ class CheckDeploymentStatusView(LoginRequiredMixin, View):
         except Exception as e:
             logger.error(f"Error in CheckDeploymentStatusView: {str(e)}", exc_info=True)
             return JsonResponse({'success': False, 'error': 'An internal error occurred'})
+
+
+class TransactionStatusView(LoginRequiredMixin, View):
+    """Status of a server-sent transaction, as last seen by the receipt tracker"""
+    def get(self, request, pk):
+        pending_tx = get_object_or_404(PendingTransaction, pk=pk, user=request.user)
+        return JsonResponse({
+            'id': pending_tx.pk,
+            'registry_id': pending_tx.registry_id,
+            'kind': pending_tx.kind,
+            'status': pending_tx.status,
+            'transaction_hash': pending_tx.transaction_hash,
+            'block_number': pending_tx.block_number,
+            'gas_used': pending_tx.gas_used,
+            'contract_address': pending_tx.contract_address,
+            'error': pending_tx.error,
+            'created_at': pending_tx.created_at.isoformat(),
+            'confirmed_at': pending_tx.confirmed_at.isoformat() if pending_tx.confirmed_at else None,
+        })
+
+
+class DashboardDataView(LoginRequiredMixin, View):
+    """The current user's data from every registry they belong to, read with one multicall per network"""
+    def get(self, request):
+        return JsonResponse(dashboard_service.get_user_dashboard(request.user))
+
+
+class ProviderHealthView(View):
+    """
+    Reports the cached health and circuit-breaker state of each network's
+    provider. Staff users also get contract instance and user data cache
+    statistics.
+    """
+    def get(self, request):
+        states = provider_health.snapshot()
+        healthy = all(state['state'] != 'open' for state in states.values())
+        data = {'healthy': healthy, 'networks': states}
+        if request.user.is_staff:
+            data['contract_cache'] = contract_cache.stats()
+            data['user_data_cache'] = user_data_cache.stats()
+        return JsonResponse(data, status=200 if healthy else 503)
+
+
+# Async views
+# Native async counterparts of the RPC-bound JSON endpoints. Under the ASGI
+# entry point they await the provider on the event loop instead of holding a
+# worker thread, so one process can keep many requests in flight.
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """LoginRequiredMixin for async views: loads the user without blocking the event loop"""
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        try:
+            return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
+        finally:
+            # Under WSGI every request gets its own event loop, so close that loop's
+            # aiohttp sessions instead of leaking one set per request
+            if not isinstance(request, ASGIRequest):
+                await async_web3_clients.aclose()
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncPrepareDeploymentView(AsyncLoginRequiredMixin, View):
+    async def post(self, request, pk):
+        try:
+            registry = await aget_object_or_404(UserDataRegistry, pk=pk, admin=request.user)
+            
+            if registry.deployed:
+                return JsonResponse({'success': False, 'error': 'Registry already deployed'})
+            
+            data = json.loads(request.body)
+            wallet_address = data.get('wallet_address')
+            
+            if not wallet_address:
+                return JsonResponse({'success': False, 'error': 'Wallet address required'})
+            
+            try:
+                wallet_address = Web3.to_checksum_address(wallet_address)
+            except ValueError as e:
+                return JsonResponse(
+                    {'success': False, 'error': f'Invalid wallet address: {str(e)}'}
+                )
+            
+            # Session access may hit the database, so keep it off the event loop
+            initial_users = [wallet_address]
+            whitelist_addresses = await sync_to_async(request.session.get)('whitelist_addresses', [])
+            if whitelist_addresses:
+                initial_users.extend([addr for addr in whitelist_addresses if addr.strip()])
+            
+            plan = await sync_to_async(deployment_planner.plan)(registry, wallet_address, initial_users)
+            
+            try:
+                service = await AsyncRegistryDeploymentService.create(network=registry.network)
+                deployment_data = await service.prepare_registry_deployment(wallet_address, plan.constructor_users)
+            except ValueError as e:
+                logger.error(f"Web3 value error: {str(e)}")
+                return JsonResponse({'success': False, 'error': 'Invalid blockchain data format'})
+            except Exception as e:
+                logger.error(f"Blockchain connection error: {str(e)}")
+                return JsonResponse({'success': False, 'error': 'Could not connect to blockchain'})
+            
+            progress = await sync_to_async(deployment_planner.progress)(plan)
+            return JsonResponse(deployment_response(deployment_data, progress))
+            
+        except Exception as e:
+            logger.error(f"Error in AsyncPrepareDeploymentView: {str(e)}", exc_info=True)
+            return JsonResponse({'success': False, 'error': 'An internal error occurred'})
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncPrepareUpdateUserDataView(AsyncLoginRequiredMixin, View):
+    async def post(self, request, pk):
+        try:
+            registry = await aget_object_or_404(UserDataRegistry, pk=pk)
+            
+            if not registry.deployed:
+                return JsonResponse({'success': False, 'error': 'Registry not deployed yet'})
+            
+            # Verify user is a member
+            try:
+                registry_user = await registry.users.aget(user=request.user)
+                if not registry_user.is_authorized:
+                    return JsonResponse({'success': False, 'error': 'You are not authorized in this registry'})
+            except RegistryUser.DoesNotExist:
+                return JsonResponse({'success': False, 'error': 'You are not a member of this registry'})
+            
+            data = json.loads(request.body)
+            wallet_address = data.get('wallet_address')
+            image_reference = data.get('image_reference')
+            
+            if not wallet_address:
+                return JsonResponse({'success': False, 'error': 'Wallet address required'})
+            if not image_reference:
+                return JsonResponse({'success': False, 'error': 'Image reference required'})
+            
+            try:
+                service = await AsyncRegistryDeploymentService.create(network=registry.network)
+                tx_preparation = await service.prepare_update_user_data(
+                    registry.address,
+                    wallet_address,
+                    image_reference,
+                    overwrite=registry_user.last_updated is not None
+                )
+                
+                if not tx_preparation['success']:
+                    return JsonResponse({'success': False, 'error': tx_preparation['error']})
+                
+                return JsonResponse({
+                    'success': True,
+                    'transaction_data': tx_preparation['transaction_data']
+                })
+                
+            except ValueError as e:
+                logger.error(f"Web3 value error: {str(e)}")
+                return JsonResponse({'success': False, 'error': 'Invalid blockchain data format'})
+            except Exception as e:
+                logger.error(f"Blockchain connection error: {str(e)}")
+                return JsonResponse({'success': False, 'error': 'Could not connect to blockchain'})
+        
+        except Exception as e:
+            logger.error(f"Error in AsyncPrepareUpdateUserDataView: {str(e)}", exc_info=True)
+            return JsonResponse({'success': False, 'error': 'An internal error occurred'})
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncCheckDeploymentStatusView(AsyncLoginRequiredMixin, View):
+    """
+    Async version of CheckDeploymentStatusView.
+    """
+    async def post(self, request, pk):
+        try:
+            registry = await aget_object_or_404(UserDataRegistry, pk=pk, admin=request.user)
+            
+            data = json.loads(request.body)
+            contract_address = data.get('contract_address')
+            
+            if not contract_address:
+                return JsonResponse({'success': False, 'error': 'Contract address required'})
+            
+            try:
+                service = await AsyncRegistryDeploymentService.create(network=registry.network)
+                verification = await service.verify_registry(contract_address, request.user.wallet_address)
+                if not verification['success']:
+                    return JsonResponse(verification)
+                
+                # Database and session writes stay synchronous, in one worker thread
+                await sync_to_async(self.record_deployment)(request, registry, verification['contract_address'])
+                
+                return JsonResponse({
+                    'success': True,
+                    'message': 'Registry deployment status updated successfully'
+                })
+                
+            except ValueError as e:
+                logger.error(f"Web3 value error: {str(e)}")
+                return JsonResponse({'success': False, 'error': 'Invalid blockchain data format'})
+            except Exception as e:
+                logger.error(f"Blockchain connection error: {str(e)}")
+                return JsonResponse({'success': False, 'error': 'Could not connect to blockchain'})
+            
+        except Exception as e:
+            logger.error(f"Error in AsyncCheckDeploymentStatusView: {str(e)}", exc_info=True)
+            return JsonResponse({'success': False, 'error': 'An internal error occurred'})
+    
+    def record_deployment(self, request, registry, contract_address):
+        plan = DeploymentPlan.objects.filter(registry=registry).first()
+        record_imported_deployment(registry, request.user, contract_address, constructor_whitelist(request, plan))
+        
+        if 'whitelist_addresses' in request.session:
+            del request.session['whitelist_addresses']
+            request.session.modified = True
@@ -6,3 +6,9 @@ class UserConfig(AppConfig):
     name = 'apps.user'
     label = 'user'
     verbose_name = 'User Management'
+
+    def ready(self):
+        from apps.user.nonces import login_nonce_store
+
+        # Wallet login only works when every worker sees the nonces issued by the others
+        login_nonce_store.verify()
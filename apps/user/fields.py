@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class WalletAddressField(models.CharField):
+    """
+    A 0x-prefixed address stored in canonical lowercase form.
+
+    Values are lowercased on the way to the database, both when saving and in
+    lookups, so ``filter(wallet_address=...)`` matches whatever case the
+    client sent and the column's indexes are used for every lookup.
+    """
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', 42)
+        super().__init__(*args, **kwargs)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        return value.lower() if isinstance(value, str) else value
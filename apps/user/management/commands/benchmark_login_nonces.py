@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from web3 import Web3
+
+from apps.user.models import User
+from apps.user.views import GetNonceView
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts statements without keeping them"""
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Issue wallet login nonces through GetNonceView and report throughput and database queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10000)
+        parser.add_argument('--wallets', type=int, default=1000, help='Distinct wallets the requests cycle through')
+
+    def handle(self, *args, **options):
+        wallets = [Web3.to_checksum_address(f'0x{i:040x}') for i in range(1, options['wallets'] + 1)]
+        bodies = [json.dumps({'wallet_address': address}) for address in wallets]
+        factory = RequestFactory()
+        view = GetNonceView.as_view()
+        users_before = User.objects.count()
+
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            start = time.perf_counter()
+            for i in range(options['requests']):
+                request = factory.post('/user/get-nonce/', bodies[i % len(bodies)], content_type='application/json')
+                response = view(request)
+                if response.status_code != 200:
+                    self.stderr.write(f'Request {i} failed: {response.content.decode()}')
+                    return
+            elapsed = time.perf_counter() - start
+
+        users_created = User.objects.count() - users_before
+        self.stdout.write(
+            f'{options["requests"]} nonces in {elapsed * 1000:.1f} ms '
+            f'({options["requests"] / elapsed:.0f}/s)  {queries.count} queries  {users_created} users created'
+        )
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-17 21:41
+
+import apps.user.fields
+from django.db import migrations
+from django.db.models import Count, F
+from django.db.models.functions import Lower
+
+
+def lowercase_wallet_addresses(apps, schema_editor):
+    User = apps.get_model('user', 'User')
+    users = User.objects.exclude(wallet_address=None).annotate(canonical=Lower('wallet_address'))
+
+    # Accounts whose addresses differ only in case would collide on the unique index. The
+    # address stays with the account that signed in most recently; the others reconnect.
+    duplicates = users.values('canonical').annotate(count=Count('pk')).filter(count__gt=1).values_list('canonical', flat=True)
+    for canonical in list(duplicates):
+        pks = list(users.filter(canonical=canonical).order_by(
+            F('last_login').desc(nulls_last=True), 'pk'
+        ).values_list('pk', flat=True))
+        User.objects.filter(pk__in=pks[1:]).update(wallet_address=None)
+
+    User.objects.exclude(wallet_address=None).update(wallet_address=Lower('wallet_address'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='wallet_address',
+            field=apps.user.fields.WalletAddressField(blank=True, max_length=42, null=True, unique=True, verbose_name='wallet address'),
+        ),
+        migrations.RunPython(lowercase_wallet_addresses, migrations.RunPython.noop),
+    ]
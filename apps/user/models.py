@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 
+from apps.user.fields import WalletAddressField
+
 class User(AbstractUser):
     """
     Custom user model that extends the default Django user model.
@@ -9,7 +11,8 @@ class User(AbstractUser):
     email = models.EmailField(_('email address'), unique=True)
     first_name = models.CharField(_('first name'), max_length=30, blank=True)
     last_name = models.CharField(_('last name'), max_length=30, blank=True)
-    wallet_address = models.CharField(_('wallet address'), max_length=42, unique=True, blank=True, null=True)
+    # Stored lowercase; see WalletAddressField
+    wallet_address = WalletAddressField(_('wallet address'), unique=True, blank=True, null=True)
     nonce = models.CharField(_('nonce'), max_length=64, blank=True, null=True)
 
     USERNAME_FIELD = 'email'
@@ -0,0 +1,70 @@
+import secrets
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+# Backends whose entries only the issuing process can see
+PER_PROCESS_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+class LoginNonceStore:
+    """
+    One-time wallet login nonces kept in Django's cache instead of on User rows,
+    so issuing one writes nothing to the database and no account is created
+    for an address until it proves ownership with a signature.
+
+    Each nonce has its own key, so a client asking for nonces repeatedly does
+    not invalidate one that another tab is still signing. A nonce expires after
+    LOGIN_NONCE_TTL and is deleted by the first successful consume.
+
+    Nonces live in the LOGIN_NONCE_CACHE alias, which has to be shared by every
+    worker: with a per-process cache, a signature checked by any worker but
+    the issuing one is rejected.
+    """
+    @property
+    def ttl(self):
+        return settings.LOGIN_NONCE_TTL
+
+    @property
+    def cache(self):
+        return caches[settings.LOGIN_NONCE_CACHE]
+
+    def verify(self):
+        """
+        Refuse to run with DEBUG off on a cache only one process can see.
+        Called from AppConfig.ready() so a misconfigured worker never boots.
+        """
+        if settings.DEBUG:
+            return
+        backend = settings.CACHES.get(settings.LOGIN_NONCE_CACHE, {}).get('BACKEND')
+        if backend is None:
+            raise ImproperlyConfigured(f"LOGIN_NONCE_CACHE '{settings.LOGIN_NONCE_CACHE}' is not in CACHES.")
+        if backend in PER_PROCESS_CACHE_BACKENDS:
+            raise ImproperlyConfigured(
+                f"Wallet login nonces need a cache shared by every worker, but CACHES['{settings.LOGIN_NONCE_CACHE}'] "
+                f'uses {backend}. Set LOGIN_NONCE_CACHE_BACKEND (or DJANGO_CACHE_BACKEND) to Redis, Memcached '
+                'or the database cache.'
+            )
+
+    def cache_key(self, wallet_address, nonce):
+        return f'login-nonce:{wallet_address.lower()}:{nonce}'
+
+    def issue(self, wallet_address):
+        nonce = secrets.token_hex(32)
+        self.cache.set(self.cache_key(wallet_address, nonce), True, timeout=self.ttl)
+        return nonce
+
+    def consume(self, wallet_address, nonce):
+        """True exactly once for an issued, unexpired nonce"""
+        key = self.cache_key(wallet_address, nonce)
+        # get() honours expiry; delete() settles concurrent consumers, only one sees True
+        if self.cache.get(key) is None:
+            return False
+        return self.cache.delete(key)
+
+
+login_nonce_store = LoginNonceStore()
@@ -1,3 +1,117 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from eth_account import Account
+from eth_account.messages import encode_defunct
+
+from apps.user.models import User
+from apps.user.nonces import LoginNonceStore
+
+
+class WalletAddressTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='wallet@example.com', wallet_address='0xAbCdEf0123456789aBcDeF0123456789AbCdEf01')
+
+    def test_stored_lowercase(self):
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wallet_address, '0xabcdef0123456789abcdef0123456789abcdef01')
+
+    def test_lookup_ignores_case(self):
+        for address in ['0xABCDEF0123456789ABCDEF0123456789ABCDEF01', '0xabcdef0123456789abcdef0123456789abcdef01']:
+            self.assertEqual(User.objects.get(wallet_address=address), self.user)
+
+    def test_wallet_lookup_uses_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plan assertions are written for SQLite')
+        plan = User.objects.filter(wallet_address='0xABCDEF0123456789ABCDEF0123456789ABCDEF01').explain()
+        self.assertRegex(plan, r'SEARCH user_user USING (COVERING )?INDEX \S+ \(wallet_address=\?\)')
+
+
+class WalletLoginTests(TestCase):
+    def setUp(self):
+        caches['login_nonces'].clear()
+        self.account = Account.create()
+
+    def post(self, name, data):
+        return self.client.post(reverse(name), json.dumps(data), content_type='application/json')
+
+    def sign_in(self, nonce):
+        message = encode_defunct(text=f"Sign this message to login: {nonce}")
+        signature = self.account.sign_message(message).signature.hex()
+        return self.post('verify_signature', {
+            'wallet_address': self.account.address,
+            'signature': signature,
+            'nonce': nonce,
+        })
+
+    def test_nonce_issue_touches_no_database(self):
+        with self.assertNumQueries(0):
+            response = self.post('get_nonce', {'wallet_address': self.account.address})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(User.objects.exists())
+
+    def test_signature_creates_user_and_logs_in(self):
+        nonce = self.post('get_nonce', {'wallet_address': self.account.address}).json()['nonce']
+        response = self.sign_in(nonce)
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(wallet_address=self.account.address)
+        self.assertEqual(int(self.client.session['_auth_user_id']), user.pk)
+
+    def test_nonce_is_single_use(self):
+        nonce = self.post('get_nonce', {'wallet_address': self.account.address}).json()['nonce']
+        self.assertEqual(self.sign_in(nonce).status_code, 200)
+        self.assertEqual(self.sign_in(nonce).status_code, 401)
+
+    def test_unissued_nonce_rejected(self):
+        self.assertEqual(self.sign_in('0' * 64).status_code, 401)
+        self.assertFalse(User.objects.exists())
+
+    def test_second_wallet_gets_its_own_account(self):
+        first = self.account
+        nonce = self.post('get_nonce', {'wallet_address': first.address}).json()['nonce']
+        self.assertEqual(self.sign_in(nonce).status_code, 200)
+
+        self.account = Account.create()
+        nonce = self.post('get_nonce', {'wallet_address': self.account.address}).json()['nonce']
+        self.assertEqual(self.sign_in(nonce).status_code, 200)
+
+        self.assertEqual(
+            sorted(User.objects.values_list('username', flat=True)),
+            sorted([first.address.lower(), self.account.address.lower()])
+        )
+
+    def test_malformed_signature_is_rejected_without_details(self):
+        nonce = self.post('get_nonce', {'wallet_address': self.account.address}).json()['nonce']
+        response = self.post('verify_signature', {'wallet_address': self.account.address, 'signature': '0x1234', 'nonce': nonce})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'error': 'Invalid signature'})
+
+
+class LoginNonceCacheTests(SimpleTestCase):
+    def caches(self, backend):
+        return {
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'login_nonces': {'BACKEND': backend},
+        }
+
+    @override_settings(DEBUG=False)
+    def test_per_process_cache_refused_outside_debug(self):
+        for backend in ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache'):
+            with self.settings(CACHES=self.caches(backend)):
+                with self.assertRaisesMessage(ImproperlyConfigured, 'shared by every worker'):
+                    LoginNonceStore().verify()
+
+    @override_settings(DEBUG=False, LOGIN_NONCE_CACHE='missing')
+    def test_unknown_alias_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            LoginNonceStore().verify()
+
+    def test_shared_cache_or_debug_accepted(self):
+        with self.settings(DEBUG=False, CACHES=self.caches('django.core.cache.backends.redis.RedisCache')):
+            LoginNonceStore().verify()
+        with self.settings(DEBUG=True, CACHES=self.caches('django.core.cache.backends.locmem.LocMemCache')):
+            LoginNonceStore().verify()
@@ -10,13 +10,16 @@ from django.contrib import messages
 
 from .models import User
 from .forms import UserRegistrationForm, UserLoginForm
+from .nonces import login_nonce_store
 
 import json
-import secrets
+import logging
 from eth_account.messages import encode_defunct
 from web3 import Web3
 from web3.auto import w3
 
+logger = logging.getLogger(__name__)
+
 # Traditional Email/Password Authentication Views
 class RegisterView(View):
     template_name = 'user/register.html'
@@ -64,18 +67,11 @@ class GetNonceView(View):
         if not wallet_address:
             return JsonResponse({'error': 'Wallet address is required'}, status=400)
         
-        # Generate a random nonce
-        nonce = secrets.token_hex(32)
-        
-        # Find or create user with this wallet address
-        user, created = User.objects.get_or_create(
-            wallet_address=wallet_address,
-            defaults={'email': f'{wallet_address[:8]}@blockchain.user'}
-        )
+        if not Web3.is_address(wallet_address):
+            return JsonResponse({'error': 'Invalid wallet address'}, status=400)
         
-        # Update user's nonce
-        user.nonce = nonce
-        user.save()
+        # Generate a one-time nonce; it lives in the cache, so nothing is written to the database
+        nonce = login_nonce_store.issue(wallet_address)
         
         # Return nonce to the client for signing
         return JsonResponse({'nonce': nonce})
@@ -86,38 +82,48 @@ class VerifySignatureView(View):
         data = json.loads(request.body)
         wallet_address = data.get('wallet_address')
         signature = data.get('signature')
+        nonce = data.get('nonce')
         
-        if not wallet_address or not signature:
-            return JsonResponse({'error': 'Wallet address and signature are required'}, status=400)
+        if not wallet_address or not signature or not nonce:
+            return JsonResponse({'error': 'Wallet address, signature and nonce are required'}, status=400)
         
         try:
-            # Get the user and their nonce
-            user = User.objects.get(wallet_address=wallet_address)
-            nonce = user.nonce
-            
             # Message to verify
             message = f"Sign this message to login: {nonce}"
             
             # Verify the signature
             message_hash = encode_defunct(text=message)
-            recovered_address = w3.eth.account.recover_message(message_hash, signature=signature)
+            try:
+                recovered_address = w3.eth.account.recover_message(message_hash, signature=signature)
+            except Exception:
+                # Malformed signatures are the client's error, not the server's
+                return JsonResponse({'error': 'Invalid signature'}, status=401)
             
             # Check if recovered address matches
-            if recovered_address.lower() == wallet_address.lower():
-                # Generate a new nonce for next login
-                user.nonce = secrets.token_hex(32)
-                user.save()
-                
-                # Log the user in
-                login(request, user)
-                return JsonResponse({'success': True, 'message': 'Authentication successful'})
-            else:
+            if recovered_address.lower() != wallet_address.lower():
                 return JsonResponse({'error': 'Invalid signature'}, status=401)
+            
+            # Each nonce logs in once; replayed or expired nonces are rejected
+            if not login_nonce_store.consume(wallet_address, nonce):
+                return JsonResponse({'error': 'Nonce expired or already used'}, status=401)
+            
+            # Accounts are only created for wallets that have proven ownership; the
+            # lowercase address doubles as the unique username
+            user, created = User.objects.get_or_create(
+                wallet_address=recovered_address,
+                defaults={
+                    'email': f'{recovered_address.lower()}@blockchain.user',
+                    'username': recovered_address.lower(),
+                }
+            )
+            
+            # Log the user in
+            login(request, user)
+            return JsonResponse({'success': True, 'message': 'Authentication successful'})
                 
-        except User.DoesNotExist:
-            return JsonResponse({'error': 'User not found'}, status=404)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=500)
+            logger.error(f"Error in VerifySignatureView: {str(e)}", exc_info=True)
+            return JsonResponse({'error': 'An internal error occurred'}, status=500)
 
 
 class LogoutView(View):
@@ -0,0 +1,31 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+// Multicall3-compatible aggregator exposing aggregate3 only. Public networks
+// already have the canonical Multicall3 deployed; this is for local chains.
+contract Multicall3 {
+    struct Call3 {
+        address target;
+        bool allowFailure;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    // Run every call and return each result, reverting only if a call that
+    // does not allow failure fails
+    function aggregate3(Call3[] calldata calls) external payable returns (Result[] memory returnData) {
+        uint256 length = calls.length;
+        returnData = new Result[](length);
+
+        for (uint256 i = 0; i < length; i++) {
+            Call3 calldata item = calls[i];
+            (bool success, bytes memory result) = item.target.call(item.callData);
+            require(success || item.allowFailure, "Multicall3: call failed");
+            returnData[i] = Result(success, result);
+        }
+    }
+}
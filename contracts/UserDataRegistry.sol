@@ -68,6 +68,13 @@ contract UserDataRegistry {
         _authorizeUser(_user);
     }
     
+    // Function to authorize many users in one transaction (admin only)
+    function authorizeUsers(address[] calldata _users) external onlyAdmin {
+        for (uint256 i = 0; i < _users.length; i++) {
+            _authorizeUser(_users[i]);
+        }
+    }
+    
     // Internal function to authorize a user
     function _authorizeUser(address _user) internal {
         require(_user != address(0), "Cannot authorize zero address");
@@ -82,6 +89,15 @@ contract UserDataRegistry {
         emit UserDeauthorized(_user);
     }
     
+    // Function to deauthorize many users in one transaction (admin only)
+    function deauthorizeUsers(address[] calldata _users) external onlyAdmin {
+        for (uint256 i = 0; i < _users.length; i++) {
+            require(_users[i] != address(0), "Cannot deauthorize zero address");
+            authorizedUsers[_users[i]] = false;
+            emit UserDeauthorized(_users[i]);
+        }
+    }
+    
     function getUsersData(address[] calldata _users) external view 
         returns (string[] memory imageReferences, uint256[] memory timestamps, bool[] memory dataExists) {
         
@@ -97,6 +97,25 @@ DATABASES = {
 }
 
 
+# Cache
+# Shared chain metadata and read caches live here; point this at Redis or
+# Memcached in production so every worker sees the same entries.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("DJANGO_CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv("DJANGO_CACHE_LOCATION", ''),
+    },
+    # Wallet login nonces: the worker that verifies a signature is rarely the one that
+    # issued the nonce, so this must be shared (Redis, Memcached or the database cache).
+    # With DEBUG off the app refuses to start on a per-process backend.
+    'login_nonces': {
+        'BACKEND': os.getenv("LOGIN_NONCE_CACHE_BACKEND", os.getenv("DJANGO_CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache')),
+        'LOCATION': os.getenv("LOGIN_NONCE_CACHE_LOCATION", os.getenv("DJANGO_CACHE_LOCATION", 'login-nonces')),
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -140,4 +159,109 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 INFURA_API_KEY = os.getenv("INFURA_API_KEY", "36cd48b277fe41a78b3e5864c0790293")
-WEB3_PROVIDER_URL = f'https://sepolia.infura.io/v3/{INFURA_API_KEY}'
\ No newline at end of file
+WEB3_PROVIDER_URL = f'https://sepolia.infura.io/v3/{INFURA_API_KEY}'
+
+# JSON-RPC endpoints per network; anything not listed uses the local development node
+WEB3_PROVIDER_URLS = {
+    'sepolia': WEB3_PROVIDER_URL,
+}
+WEB3_DEFAULT_PROVIDER_URL = os.getenv("WEB3_DEFAULT_PROVIDER_URL", 'http://127.0.0.1:8545')
+
+# Keep-alive connection pool shared by every request/thread talking to a network
+WEB3_POOL_CONNECTIONS = int(os.getenv("WEB3_POOL_CONNECTIONS", 10))
+WEB3_POOL_MAXSIZE = int(os.getenv("WEB3_POOL_MAXSIZE", 20))
+WEB3_REQUEST_TIMEOUT = int(os.getenv("WEB3_REQUEST_TIMEOUT", 30))
+
+# Bound contract instances kept per process (LRU)
+CONTRACT_CACHE_SIZE = int(os.getenv("CONTRACT_CACHE_SIZE", 256))
+
+# Provider health checks: probed in a background thread, cached for a TTL, and
+# a circuit opens after repeated failures so requests fail fast
+WEB3_HEALTH_BACKGROUND = os.getenv("WEB3_HEALTH_BACKGROUND", "true").lower() in ('1', 'true', 'yes')
+WEB3_HEALTH_CHECK_INTERVAL = float(os.getenv("WEB3_HEALTH_CHECK_INTERVAL", 10))
+WEB3_HEALTH_TTL = float(os.getenv("WEB3_HEALTH_TTL", 30))
+WEB3_HEALTH_PROBE_TIMEOUT = float(os.getenv("WEB3_HEALTH_PROBE_TIMEOUT", 3))
+WEB3_HEALTH_FAILURE_THRESHOLD = int(os.getenv("WEB3_HEALTH_FAILURE_THRESHOLD", 3))
+WEB3_HEALTH_OPEN_SECONDS = float(os.getenv("WEB3_HEALTH_OPEN_SECONDS", 30))
+
+# Chain metadata TTLs in seconds. After the TTL a value is still served for the
+# stale window while one background refresh fetches a new one.
+CHAIN_METADATA_TTLS = {
+    'chain_id': int(os.getenv("CHAIN_ID_TTL", 86400)),
+    'gas_price': int(os.getenv("GAS_PRICE_TTL", 5)),
+}
+CHAIN_METADATA_STALE_TTLS = {
+    'chain_id': int(os.getenv("CHAIN_ID_STALE_TTL", 86400)),
+    'gas_price': int(os.getenv("GAS_PRICE_STALE_TTL", 30)),
+}
+
+# Headroom added to gas limits learned from receipts (gasUsed * buffer)
+GAS_ESTIMATE_BUFFER = float(os.getenv("GAS_ESTIMATE_BUFFER", 1.1))
+
+# Addresses per getUsersData eth_call when loading many members at once
+REGISTRY_READ_CHUNK_SIZE = int(os.getenv("REGISTRY_READ_CHUNK_SIZE", 200))
+
+# Members per page on the registry detail page and the member listing API
+REGISTRY_MEMBERS_PAGE_SIZE = int(os.getenv("REGISTRY_MEMBERS_PAGE_SIZE", 50))
+
+# Registries per page on the registry list and its JSON variant
+REGISTRY_LIST_PAGE_SIZE = int(os.getenv("REGISTRY_LIST_PAGE_SIZE", 24))
+
+# authorizeUsers/deauthorizeUsers batches: gas is budgeted per address and chunks are sized to stay under the cap
+AUTHORIZE_USERS_BASE_GAS = int(os.getenv("AUTHORIZE_USERS_BASE_GAS", 60000))
+AUTHORIZE_USERS_GAS_PER_USER = int(os.getenv("AUTHORIZE_USERS_GAS_PER_USER", 30000))
+AUTHORIZE_USERS_MAX_GAS = int(os.getenv("AUTHORIZE_USERS_MAX_GAS", 8000000))
+
+# Gas for deploying UserDataRegistry without any initial users; the constructor's whitelist is
+# capped so the deployment stays under AUTHORIZE_USERS_MAX_GAS and the rest is authorized in batches
+DEPLOY_BASE_GAS = int(os.getenv("DEPLOY_BASE_GAS", 1500000))
+
+# Multicall3 contract used to batch view calls into one eth_call, per network
+MULTICALL3_DEFAULT_ADDRESS = os.getenv("MULTICALL3_DEFAULT_ADDRESS", '0xcA11bde05977b3631167028862bE2a173976CA11')
+MULTICALL3_ADDRESSES = {
+    'sepolia': MULTICALL3_DEFAULT_ADDRESS,
+}
+# Calls per aggregate3 eth_call
+MULTICALL_CHUNK_SIZE = int(os.getenv("MULTICALL_CHUNK_SIZE", 100))
+
+# Seconds a cached getUserData result is served; writes seen by the app invalidate it sooner
+USER_DATA_CACHE_TTL = int(os.getenv("USER_DATA_CACHE_TTL", 60))
+
+# Seconds a wallet login nonce stays valid; nonces live in the cache and are consumed on first use
+LOGIN_NONCE_TTL = int(os.getenv("LOGIN_NONCE_TTL", 300))
+# CACHES alias the nonces are kept in
+LOGIN_NONCE_CACHE = os.getenv("LOGIN_NONCE_CACHE", 'login_nonces')
+
+# Background receipt tracker (`manage.py track_receipts`) for server-sent transactions
+RECEIPT_TRACKER_INTERVAL = float(os.getenv("RECEIPT_TRACKER_INTERVAL", 5))
+RECEIPT_TRACKER_BATCH_SIZE = int(os.getenv("RECEIPT_TRACKER_BATCH_SIZE", 100))
+# Seconds without a receipt before a transaction is marked dropped
+RECEIPT_TRACKER_DROP_AFTER = int(os.getenv("RECEIPT_TRACKER_DROP_AFTER", 3600))
+# Seconds a pending transaction may sit behind a missing nonce before the gap is filled
+NONCE_GAP_GRACE = int(os.getenv("NONCE_GAP_GRACE", 60))
+
+# Registry event indexer (`manage.py index_events`)
+EVENT_INDEXER_INTERVAL = float(os.getenv("EVENT_INDEXER_INTERVAL", 5))
+# Blocks per eth_getLogs request; providers commonly cap this range
+EVENT_INDEXER_BLOCK_RANGE = int(os.getenv("EVENT_INDEXER_BLOCK_RANGE", 2000))
+# Blocks behind the head to stay, so short reorgs never reach the index
+EVENT_INDEXER_CONFIRMATIONS = int(os.getenv("EVENT_INDEXER_CONFIRMATIONS", 3))
+
+# Historical backfill (`manage.py backfill_events`)
+EVENT_BACKFILL_WORKERS = int(os.getenv("EVENT_BACKFILL_WORKERS", 8))
+# Blocks per resumable segment; a segment is split further if the provider refuses it
+EVENT_BACKFILL_SEGMENT_SIZE = int(os.getenv("EVENT_BACKFILL_SEGMENT_SIZE", 50000))
+# Retries of a rate-limited eth_getLogs, waiting EVENT_BACKFILL_BACKOFF seconds doubled per attempt
+EVENT_BACKFILL_RETRIES = int(os.getenv("EVENT_BACKFILL_RETRIES", 5))
+EVENT_BACKFILL_BACKOFF = float(os.getenv("EVENT_BACKFILL_BACKOFF", 1))
+
+# Precompiled contract artifacts built by `manage.py compile_contracts` and shipped with the app
+CONTRACT_PRECOMPILED_DIR = os.getenv("CONTRACT_PRECOMPILED_DIR", os.path.join(BASE_DIR, 'apps', 'contract', 'compiled'))
+
+# Allow compiling contracts whose source no longer matches the shipped artifacts.
+# Keep this off in production so workers never need solc or network access; with it
+# off the app refuses to start until every artifact has been built and shipped.
+CONTRACT_RUNTIME_COMPILE = os.getenv("CONTRACT_RUNTIME_COMPILE", str(DEBUG)).lower() in ('1', 'true', 'yes')
+
+# Runtime compile cache, keyed by source hash and solc version
+CONTRACT_ARTIFACT_CACHE_DIR = os.getenv("CONTRACT_ARTIFACT_CACHE_DIR", os.path.join(BASE_DIR, '.artifacts'))